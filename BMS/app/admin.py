@@ -1,16 +1,294 @@
-from sqladmin import Admin, ModelView
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqladmin import Admin, BaseView, ModelView, action, expose
+from sqladmin.models import ModelViewMeta
+from sqladmin.pagination import PageControl, Pagination
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
+from starlette.datastructures import URL
+from starlette.requests import Request
+from starlette.responses import RedirectResponse, Response
+
+from app.core.cache import entity_cache
+from app.core.config import settings
 from app.core.database import engine
+from app.core.sharding import shard_of
+from app.utils import bulk_admin
+from app.utils.admin_queries import contains, estimate_count, keyset_page
+from app.utils.bulk_admin import bulk_jobs
 
 from app.models.user import User
 from app.models.team import Team
-from app.models.task import Task
+from app.models.task import Task, TaskStatus
+from app.models.archive import TaskArchive
 from app.models.comment import Comment
 from app.models.evaluation import Evaluation
 from app.models.meeting import Meeting
+from app.models.slow_query import SlowQuery
+
+
+# -------------------------------------------------------------------
+# Списки больших таблиц: keyset-пагинация и оценка числа строк
+# -------------------------------------------------------------------
+
+@dataclass
+class EstimatedPagination(Pagination):
+    """Пагинация с возможной оценкой count: номер страницы не обрезается по count."""
+    estimated: bool = False
+
+    def __post_init__(self) -> None:
+        if not self.estimated:
+            super().__post_init__()
+
+
+@dataclass
+class KeysetPagination(EstimatedPagination):
+    """Страницы «назад/вперёд» по курсорам before/after вместо номеров."""
+    first_key: Any = None
+    last_key: Any = None
+    previous_exists: bool = False
+    next_exists: bool = False
+
+    def __post_init__(self) -> None:
+        pass
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_exists
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_exists
+
+    def resize(self, page_size: int) -> "KeysetPagination":
+        # Смена размера страницы начинает список сначала
+        return replace(self, page=1, page_controls=[])
+
+    def add_pagination_urls(self, base_url: URL) -> None:
+        base = base_url.remove_query_params(["after", "before", "page"])
+        if self.previous_exists:
+            url = base.include_query_params(before=self.first_key, page=max(self.page - 1, 1))
+            self.page_controls.append(PageControl(number=self.page - 1, url=str(url)))
+        self.page_controls.append(PageControl(number=self.page, url=str(base_url)))
+        if self.next_exists:
+            url = base.include_query_params(after=self.last_key, page=self.page + 1)
+            self.page_controls.append(PageControl(number=self.page + 1, url=str(url)))
+
+
+class LargeTableView(ModelView):
+    """
+    Список без полного COUNT(*) и OFFSET:
+      - при сортировке по первичному ключу (по умолчанию — новые сверху)
+        страницы выбираются по курсорам ?after=/?before=;
+      - при другой сортировке — обычный OFFSET;
+      - число строк — оценка планировщика, если она больше
+        ADMIN_EXACT_COUNT_THRESHOLD (см. app/utils/admin_queries.py);
+      - поиск — ILIKE по колонке без CAST, с trigram-индексом на PostgreSQL.
+    """
+    page_size_options = [25, 50, 100]
+
+    def _keyset_order(self, request: Request) -> Optional[bool]:
+        """Направление keyset-обхода (True — по убыванию) или None, если сортировка не по PK."""
+        sort_by = request.query_params.get("sortBy")
+        if sort_by:
+            sort_fields = [(sort_by, request.query_params.get("sort", "asc") == "desc")]
+        else:
+            sort_fields = self._get_default_sort()
+        if len(sort_fields) != 1 or len(self.pk_columns) != 1:
+            return None
+        field, descending = sort_fields[0]
+        if self._get_prop_name(field) != self.pk_columns[0].key:
+            return None
+        return descending
+
+    def _cursor(self, request: Request, name: str) -> Any:
+        value = request.query_params.get(name)
+        if value is None:
+            return None
+        try:
+            return self.pk_columns[0].type.python_type(value)
+        except (TypeError, ValueError):
+            return None
+
+    def search_query(self, stmt, term: str):
+        if any("." in field for field in self._search_fields):
+            return super().search_query(stmt, term)
+        columns = [getattr(self.model, field) for field in self._search_fields]
+        return stmt.filter(or_(*(contains(column, term) for column in columns)))
+
+    async def list(self, request: Request) -> Pagination:
+        page = self.validate_page_number(request.query_params.get("page"), 1)
+        page_size = self.validate_page_number(request.query_params.get("pageSize"), 0)
+        page_size = min(page_size or self.page_size, max(self.page_size_options))
+        search = request.query_params.get("search", None)
+
+        stmt = self.list_query(request)
+        for relation in self._list_relations:
+            stmt = stmt.options(selectinload(relation))
+        if search:
+            stmt = self.search_query(stmt=stmt, term=search)
+
+        descending = self._keyset_order(request)
+        async with self.session_maker(expire_on_commit=False) as session:
+            count, estimated = await estimate_count(session, stmt, settings.ADMIN_EXACT_COUNT_THRESHOLD)
+
+            if descending is None:
+                stmt = self.sort_query(stmt, request).limit(page_size).offset((page - 1) * page_size)
+                rows = list((await session.execute(stmt)).scalars().unique())
+                return EstimatedPagination(
+                    rows=rows, page=page, page_size=page_size, count=count, estimated=estimated
+                )
+
+            key = self.pk_columns[0]
+            rows, previous_exists, next_exists = await keyset_page(
+                session, stmt, getattr(self.model, key.key), page_size, descending,
+                after=self._cursor(request, "after"), before=self._cursor(request, "before"),
+            )
+        if not previous_exists:
+            page = 1
+        return KeysetPagination(
+            rows=rows,
+            page=page,
+            page_size=page_size,
+            count=count,
+            estimated=estimated,
+            first_key=getattr(rows[0], key.key) if rows else None,
+            last_key=getattr(rows[-1], key.key) if rows else None,
+            previous_exists=previous_exists,
+            next_exists=next_exists,
+        )
+
+
+# -------------------------------------------------------------------
+# Массовые действия (см. app/utils/bulk_admin.py)
+# -------------------------------------------------------------------
+
+TEMPLATES_DIR = Path(__file__).parent / "templates" / "admin"
+
+# (подпись задания, id строк, операция над пачкой, сброс кэша)
+BulkPlan = Tuple[str, List[int], bulk_admin.Apply, bulk_admin.Invalidate]
+
+
+class BulkActionView(ModelView):
+    """
+    Общий порядок массового действия: форма параметров → проверка →
+    фоновое задание → страница прогресса. Лишние строки не отбрасываются
+    молча: выбор больше ADMIN_BULK_MAX_ROWS отклоняется.
+    """
+
+    @staticmethod
+    def _selected_ids(request: Request) -> List[int]:
+        pks = request.query_params.get("pks", "")
+        try:
+            return [int(pk) for pk in pks.split(",") if pk]
+        except ValueError:
+            return []
+
+    async def _bulk(
+        self,
+        request: Request,
+        action_name: str,
+        title: str,
+        fields: List[Dict[str, Any]],
+        plan: Callable[[Dict[str, Optional[str]], List[int]], Awaitable[BulkPlan]],
+        require_selection: bool = True,
+    ) -> Response:
+        pks = self._selected_ids(request)
+        values = {field["name"]: request.query_params.get(field["name"]) for field in fields}
+        error = None
+
+        if request.query_params.get("confirm"):
+            try:
+                if require_selection and not pks:
+                    raise ValueError("Не выбрано ни одной строки")
+                if len(pks) > settings.ADMIN_BULK_MAX_ROWS:
+                    raise ValueError(
+                        f"Выбрано {len(pks)} строк, за одно действие — не больше {settings.ADMIN_BULK_MAX_ROWS}"
+                    )
+                label, ids, apply, invalidate = await plan(values, pks)
+                if not ids:
+                    raise ValueError("Нет строк для изменения")
+            except ValueError as exc:
+                error = str(exc)
+            else:
+                job = bulk_jobs.start(action_name, label, ids, apply, invalidate, self.session_maker)
+                url = request.url_for("admin:bulk_jobs").include_query_params(job=job.id)
+                return RedirectResponse(str(url), status_code=302)
+
+        context = {
+            "title": title,
+            "action_url": request.url.path,
+            "pks": pks,
+            "fields": [
+                {**field, "value": field.get("value") if values[field["name"]] is None else values[field["name"]]}
+                for field in fields
+            ],
+            "error": error,
+            "max_rows": settings.ADMIN_BULK_MAX_ROWS,
+            "back_url": request.url_for("admin:list", identity=self.identity),
+        }
+        return await self.templates.TemplateResponse(request, "bulk_form.html", context)
+
+
+class BulkJobsView(BaseView):
+    name = "Массовые действия"
+    icon = "fa-solid fa-list-check"
 
+    @expose("/bulk-jobs", identity="bulk_jobs")
+    async def bulk_jobs_page(self, request: Request) -> Response:
+        jobs = bulk_jobs.recent()
+        selected = request.query_params.get("job", "")
+        context = {
+            "jobs": jobs,
+            "running": any(job.state == "running" for job in jobs),
+            "selected": int(selected) if selected.isdigit() else None,
+        }
+        return await self.templates.TemplateResponse(request, "bulk_jobs.html", context)
 
-class UserAdmin(ModelView, model=User):
+
+# -------------------------------------------------------------------
+# Сброс кэша сущностей после правок в админке
+# -------------------------------------------------------------------
+
+class AbstractModelViewMeta(ModelViewMeta, ABCMeta):
+    """
+    Метакласс представлений с абстрактными методами: представление модели
+    (model=...) без их реализации не создаётся — ошибка при импорте
+    app.admin, а не после коммита правки в админке.
+    """
+
+    def __new__(mcls, name, bases, attrs, **kwargs):
+        cls = super().__new__(mcls, name, bases, attrs, **kwargs)
+        if kwargs.get("model") is not None and cls.__abstractmethods__:
+            missing = ", ".join(sorted(cls.__abstractmethods__))
+            raise TypeError(f"{name}: не реализованы абстрактные методы {missing}")
+        return cls
+
+
+class CacheInvalidatingView(ModelView, metaclass=AbstractModelViewMeta):
+    """
+    Создание, правка или удаление записи сбрасывает связанные снимки в entity_cache.
+    Админка работает с основной БД: ключи задач и встреч — shard=shard_of(engine).
+    """
+
+    @abstractmethod
+    async def invalidate_cache(self, model) -> None:
+        ...
+
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await self.invalidate_cache(model)
+
+    async def after_model_delete(self, model, request) -> None:
+        await self.invalidate_cache(model)
+
+
+class UserAdmin(LargeTableView, BulkActionView, CacheInvalidatingView, model=User):
     column_list = [User.id, User.email, User.role, User.team_id, User.is_active]
+    column_default_sort = ("id", True)
     column_searchable_list = [User.email]
     form_excluded_columns = [
         "hashed_password",
@@ -21,14 +299,53 @@ class UserAdmin(ModelView, model=User):
         "meetings",
     ]
 
+    async def invalidate_cache(self, model) -> None:
+        # Прежняя команда неизвестна — сбрасываем все команды
+        await entity_cache.invalidate_member(model.id, model.team_id)
+        await entity_cache.invalidate_kind("team")
+
+    @action("deactivate", "Деактивировать", add_in_detail=False)
+    async def bulk_deactivate(self, request: Request) -> Response:
+        async def plan(values, pks) -> BulkPlan:
+            return (
+                f"Деактивация пользователей ({len(pks)})", pks,
+                bulk_admin.deactivate_users, bulk_admin.invalidate_users,
+            )
+
+        return await self._bulk(request, "users.deactivate", "Деактивировать пользователей", [], plan)
+
+    @action("move-team", "Перевести в команду", add_in_detail=False)
+    async def bulk_move_team(self, request: Request) -> Response:
+        async def plan(values, pks) -> BulkPlan:
+            raw = (values["team_id"] or "").strip()
+            team_id = None
+            if raw:
+                if not raw.isdigit():
+                    raise ValueError("ID команды должен быть числом")
+                team_id = int(raw)
+                async with self.session_maker() as db:
+                    if await db.get(Team, team_id) is None:
+                        raise ValueError(f"Команда {team_id} не найдена")
+            target = f"команду {team_id}" if team_id else "без команды"
+            return (
+                f"Перевод пользователей ({len(pks)}) в {target}", pks,
+                *bulk_admin.move_users(team_id),
+            )
+
+        fields = [{"name": "team_id", "label": "ID команды (пусто — убрать из команды)", "type": "number"}]
+        return await self._bulk(request, "users.move_team", "Перевести пользователей в команду", fields, plan)
 
-class TeamAdmin(ModelView, model=Team):
+
+class TeamAdmin(CacheInvalidatingView, model=Team):
     column_list = [Team.id, Team.name, Team.invite_code, Team.admin_id]
     column_searchable_list = [Team.name]
     form_excluded_columns = ["members"]
 
+    async def invalidate_cache(self, model) -> None:
+        await entity_cache.invalidate("team", model.id)
+
 
-class TaskAdmin(ModelView, model=Task):
+class TaskAdmin(LargeTableView, BulkActionView, CacheInvalidatingView, model=Task):
     column_list = [
         Task.id,
         Task.title,
@@ -37,11 +354,71 @@ class TaskAdmin(ModelView, model=Task):
         Task.assignee_id,
         Task.deadline,
     ]
+    column_default_sort = ("id", True)
+    column_searchable_list = [Task.title]
     column_filters = [Task.status]
     form_excluded_columns = ["comments", "evaluations"]
 
+    async def invalidate_cache(self, model) -> None:
+        await entity_cache.invalidate("task", model.id, shard=shard_of(engine))
+
+    @action("set-status", "Сменить статус", add_in_detail=False)
+    async def bulk_set_status(self, request: Request) -> Response:
+        async def plan(values, pks) -> BulkPlan:
+            try:
+                status = TaskStatus[values["status"] or ""]
+            except KeyError:
+                raise ValueError("Неизвестный статус")
+            return (
+                f"Статус {status.value} для задач ({len(pks)})", pks,
+                bulk_admin.set_task_status(status), bulk_admin.invalidate_tasks,
+            )
+
+        fields = [{
+            "name": "status", "label": "Новый статус",
+            "options": [(status.name, status.value) for status in TaskStatus],
+        }]
+        return await self._bulk(request, "tasks.set_status", "Сменить статус задач", fields, plan)
 
-class CommentAdmin(ModelView, model=Comment):
+    @action("reassign", "Переназначить", add_in_detail=False)
+    async def bulk_reassign(self, request: Request) -> Response:
+        async def plan(values, pks) -> BulkPlan:
+            raw = (values["assignee_id"] or "").strip()
+            if not raw.isdigit():
+                raise ValueError("Укажите ID исполнителя")
+            async with self.session_maker() as db:
+                assignee = await db.get(User, int(raw))
+            if assignee is None or not assignee.is_active:
+                raise ValueError(f"Активный пользователь {raw} не найден")
+            return (
+                f"Переназначение задач ({len(pks)}) на {assignee.email}", pks,
+                bulk_admin.reassign_tasks(assignee.id), bulk_admin.invalidate_tasks,
+            )
+
+        fields = [{"name": "assignee_id", "label": "ID нового исполнителя", "type": "number"}]
+        return await self._bulk(request, "tasks.reassign", "Переназначить задачи", fields, plan)
+
+
+class TaskArchiveAdmin(LargeTableView, model=TaskArchive):
+    """Задачи, перенесённые в архив (app/utils/archival.py): только просмотр и поиск."""
+    name = "Архив задач"
+    name_plural = "Архив задач"
+    can_create = False
+    can_edit = False
+    can_delete = False
+    column_list = [
+        TaskArchive.id,
+        TaskArchive.title,
+        TaskArchive.status,
+        TaskArchive.creator_id,
+        TaskArchive.assignee_id,
+        TaskArchive.archived_at,
+    ]
+    column_default_sort = ("id", True)
+    column_searchable_list = [TaskArchive.title]
+
+
+class CommentAdmin(LargeTableView, CacheInvalidatingView, model=Comment):
     column_list = [
         Comment.id,
         Comment.text,
@@ -49,9 +426,13 @@ class CommentAdmin(ModelView, model=Comment):
         Comment.task_id,
         Comment.created_at,
     ]
+    column_default_sort = ("id", True)
 
+    async def invalidate_cache(self, model) -> None:
+        await entity_cache.invalidate("task", model.task_id, shard=shard_of(engine))
 
-class EvaluationAdmin(ModelView, model=Evaluation):
+
+class EvaluationAdmin(LargeTableView, CacheInvalidatingView, model=Evaluation):
     column_list = [
         Evaluation.id,
         Evaluation.score,
@@ -59,9 +440,13 @@ class EvaluationAdmin(ModelView, model=Evaluation):
         Evaluation.task_id,
         Evaluation.created_at,
     ]
+    column_default_sort = ("id", True)
+
+    async def invalidate_cache(self, model) -> None:
+        await entity_cache.invalidate("task", model.task_id, shard=shard_of(engine))
 
 
-class MeetingAdmin(ModelView, model=Meeting):
+class MeetingAdmin(LargeTableView, BulkActionView, CacheInvalidatingView, model=Meeting):
     column_list = [
         Meeting.id,
         Meeting.title,
@@ -69,14 +454,70 @@ class MeetingAdmin(ModelView, model=Meeting):
         Meeting.start_time,
         Meeting.end_time,
     ]
+    column_default_sort = ("id", True)
+    column_searchable_list = [Meeting.title]
     form_excluded_columns = ["participants"]
 
+    async def invalidate_cache(self, model) -> None:
+        await entity_cache.invalidate("meeting", model.id, shard=shard_of(engine))
+
+    @action("delete-old", "Удалить прошедшие", add_in_detail=False)
+    async def bulk_delete_old(self, request: Request) -> Response:
+        async def plan(values, pks) -> BulkPlan:
+            raw = (values["days"] or "").strip()
+            if not raw.isdigit():
+                raise ValueError("Укажите число дней")
+            cutoff = datetime.utcnow() - timedelta(days=int(raw))
+            async with self.session_maker() as db:
+                ids = await bulk_admin.ended_meeting_ids(db, cutoff, settings.ADMIN_BULK_MAX_ROWS, among=pks)
+            scope = f"из выбранных ({len(pks)})" if pks else "все"
+            return (
+                f"Удаление встреч, закончившихся более {raw} дн. назад: {scope}, {len(ids)}", ids,
+                bulk_admin.delete_meetings, bulk_admin.invalidate_meetings,
+            )
+
+        # Без выбора удаляются все прошедшие встречи (не больше ADMIN_BULK_MAX_ROWS за раз)
+        fields = [{"name": "days", "label": "Закончились более N дней назад", "type": "number", "value": "90"}]
+        return await self._bulk(
+            request, "meetings.delete_old", "Удалить прошедшие встречи", fields, plan, require_selection=False
+        )
+
+
+class SlowQueryAdmin(LargeTableView, model=SlowQuery):
+    name_plural = "Slow queries"
+    can_create = False
+    can_edit = False
+    column_list = [
+        SlowQuery.id,
+        SlowQuery.created_at,
+        SlowQuery.duration_ms,
+        SlowQuery.route,
+        SlowQuery.statement,
+    ]
+    column_details_list = [
+        SlowQuery.id,
+        SlowQuery.created_at,
+        SlowQuery.duration_ms,
+        SlowQuery.route,
+        SlowQuery.statement,
+        SlowQuery.parameters,
+        SlowQuery.explain,
+    ]
+    column_searchable_list = [SlowQuery.route]
+    column_sortable_list = [SlowQuery.created_at, SlowQuery.duration_ms]
+    # id растёт вместе с created_at: порядок тот же, но страницы по курсору
+    column_default_sort = ("id", True)
+
 
 def setup_admin(app):
-    admin = Admin(app, engine)
+    admin = Admin(app, engine, templates_dir=str(TEMPLATES_DIR))
     admin.add_view(UserAdmin)
     admin.add_view(TeamAdmin)
     admin.add_view(TaskAdmin)
+    admin.add_view(TaskArchiveAdmin)
     admin.add_view(MeetingAdmin)
     admin.add_view(CommentAdmin)
     admin.add_view(EvaluationAdmin)
+    admin.add_view(SlowQueryAdmin)
+    admin.add_view(BulkJobsView)
+    return admin
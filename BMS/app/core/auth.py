@@ -1,4 +1,6 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, WebSocket
 from fastapi_users import BaseUserManager, FastAPIUsers, IntegerIDMixin
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
@@ -72,3 +74,21 @@ fastapi_users = FastAPIUsers[User, int](
 current_user = fastapi_users.current_user()
 current_active_user = fastapi_users.current_user(active=True)
 current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+
+async def websocket_user(
+    websocket: WebSocket,
+    user_manager: UserManager = Depends(get_user_manager),
+) -> Optional[User]:
+    """
+    Пользователь WebSocket-соединения по JWT из параметра ?token=
+    (браузер не передаёт заголовок Authorization при открытии сокета).
+    Сессия БД закрывается сразу: соединение живёт долго и не должно
+    держать соединение из пула.
+    """
+    token = websocket.query_params.get("token")
+    try:
+        user = await get_jwt_strategy().read_token(token, user_manager) if token else None
+    finally:
+        await user_manager.user_db.session.close()
+    return user if user is not None and user.is_active else None
@@ -0,0 +1,308 @@
+"""
+Кэш сущностей для get_*_or_404 (команды, пользователи, встречи, задачи).
+
+Проверки прав на каждом запросе заново читают одни и те же строки
+команды и задачи вместе со связями. Кэш хранит отсоединённый снимок
+объекта (с уже загруженными связями) и на попадании прикрепляет его
+к сессии запроса через merge(load=False) — без SQL. Вызывающий код
+получает обычный persistent-объект своей сессии: его можно менять
+и коммитить, снимок в кэше при этом не меняется.
+
+Бэкенды:
+  - LRUCache — в процессе: TTL и вытеснение самых старых по числу записей;
+  - ExternalCache — вне процесса: значения сериализуются pickle и уходят
+    в клиент с интерфейсом redis.asyncio (get/set(ex=)/delete/incr);
+    LocalCacheClient — его локальная замена для разработки и тестов.
+
+Инвалидация — write-through: вьюсеты после commit вызывают invalidate()
+для изменённых сущностей. Сброс виден только процессам с тем же
+бэкендом: LRUCache у каждого воркера свой, поэтому он годится лишь для
+одного процесса, а при нескольких воркерах нужен общий ExternalCache
+(is_shared, проверяется при запуске app.utils.server). По умолчанию кэш
+выключен. Данные для записи из снимка не берутся: пути записи читают
+сущность из БД в своей транзакции (cached=False в app/utils/services.py). Задача в кэше содержит автора и исполнителя
+(их team_id участвует в проверках прав), поэтому смена команды или роли
+пользователя сбрасывает все задачи разом через поколение пространства
+ключей (invalidate_member).
+
+Задачи и встречи получают id из последовательности своей базы, поэтому
+при шардировании одинаковые id встречаются на разных шардах: в ключ входит
+номер шарда (shard=, см. sharding.shard_of), и get() и invalidate() для
+задач и встреч вызываются с ним. У пользователей и команд id глобальные.
+"""
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import ENTITY_CACHE_EVICTIONS, ENTITY_CACHE_HITS, ENTITY_CACHE_MISSES
+
+
+T = TypeVar("T")
+
+
+def _kind(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+# -------------------------------------------------------------------
+# Бэкенды
+# -------------------------------------------------------------------
+
+class CacheBackend(ABC):
+    """Хранилище снимков: ключ -> объект с TTL, плюс счётчики поколений."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump_generation(self, namespace: str) -> int:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+class LRUCache(CacheBackend):
+    """
+    Кэш в памяти процесса. Снимок снимается при записи (копия через pickle),
+    поэтому изменения объекта в сессии запроса в кэш не попадают.
+    Поколения хранятся отдельно от записей и не вытесняются.
+    """
+
+    def __init__(self, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            ENTITY_CACHE_EVICTIONS.labels(_kind(key), "expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (self.clock() + ttl, pickle.loads(pickle.dumps(value)))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            ENTITY_CACHE_EVICTIONS.labels(_kind(evicted), "size").inc()
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    async def bump_generation(self, namespace: str) -> int:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        return self._generations[namespace]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+
+class LocalCacheClient:
+    """
+    Локальная замена внешнего сервера кэша с подмножеством API redis.asyncio.
+    Хранит байты, поэтому ведёт себя как настоящий внешний кэш:
+    каждое чтение возвращает новую копию объекта.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, name: str) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[name]
+            return None
+        return value
+
+    async def set(self, name: str, value: bytes, ex: Optional[float] = None) -> None:
+        self._data[name] = (self.clock() + ex if ex else None, value)
+
+    async def delete(self, *names: str) -> int:
+        return sum(self._data.pop(name, None) is not None for name in names)
+
+    async def incr(self, name: str) -> int:
+        value = int((await self.get(name)) or 0) + 1
+        self._data[name] = (None, str(value).encode())
+        return value
+
+    async def flushdb(self) -> None:
+        self._data.clear()
+
+
+class ExternalCache(CacheBackend):
+    """
+    Кэш вне процесса: общий для всех воркеров, переживает перезапуск.
+    client — redis.asyncio.Redis или LocalCacheClient. Вытеснением
+    управляет сам сервер (maxmemory-policy), поэтому счётчик вытеснений
+    здесь не ведётся.
+    """
+
+    def __init__(self, client, prefix: str = "bms:entity:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, round(ttl)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def generation(self, namespace: str) -> int:
+        return int((await self.client.get(f"{self.prefix}gen:{namespace}")) or 0)
+
+    async def bump_generation(self, namespace: str) -> int:
+        return await self.client.incr(f"{self.prefix}gen:{namespace}")
+
+    async def clear(self) -> None:
+        await self.client.flushdb()
+
+
+# -------------------------------------------------------------------
+# Кэш сущностей
+# -------------------------------------------------------------------
+
+class EntityCache:
+    """
+    Обёртка над бэкендом для загрузчиков get_*_or_404.
+    Промахи (None) не кэшируются: 404 всегда проверяется по БД.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    @staticmethod
+    def _format_key(kind: str, generation: int, entity_id: int, shard: Optional[int]) -> str:
+        return f"{kind}:{generation}:{'' if shard is None else shard}:{entity_id}"
+
+    async def _key(self, kind: str, entity_id: int, shard: Optional[int] = None) -> str:
+        return self._format_key(kind, await self.backend.generation(kind), entity_id, shard)
+
+    async def get(
+        self,
+        db: AsyncSession,
+        kind: str,
+        entity_id: int,
+        load: Callable[[], Awaitable[Optional[T]]],
+        shard: Optional[int] = None,
+    ) -> Optional[T]:
+        """Объект из кэша, прикреплённый к db, или результат load()."""
+        if not self.enabled:
+            return await load()
+
+        key = await self._key(kind, entity_id, shard)
+        snapshot = await self.backend.get(key)
+        if snapshot is not None:
+            ENTITY_CACHE_HITS.labels(kind).inc()
+            return await db.merge(snapshot, load=False)
+
+        ENTITY_CACHE_MISSES.labels(kind).inc()
+        entity = await load()
+        if entity is not None:
+            await self.backend.set(key, entity, self.ttl)
+        return entity
+
+    async def invalidate(self, kind: str, *entity_ids: Optional[int], shard: Optional[int] = None) -> None:
+        """Удалить снимки сущностей после изменения (вызывать после commit)."""
+        if not self.enabled:
+            return
+        ids = [entity_id for entity_id in entity_ids if entity_id is not None]
+        if ids:
+            generation = await self.backend.generation(kind)
+            await self.backend.delete(*(self._format_key(kind, generation, entity_id, shard) for entity_id in ids))
+
+    async def invalidate_kind(self, kind: str) -> None:
+        """Сбросить все снимки вида: старые ключи просто перестают читаться."""
+        if self.enabled:
+            await self.backend.bump_generation(kind)
+
+    async def invalidate_member(self, user_id: Optional[int], *team_ids: Optional[int]) -> None:
+        """Пользователь сменил команду или роль: сбросить его, его команды и задачи."""
+        await self.invalidate("user", user_id)
+        await self.invalidate("team", *team_ids)
+        await self.invalidate_kind("task")
+
+    async def clear(self) -> None:
+        if self.backend is not None:
+            await self.backend.clear()
+
+
+def is_shared(config=settings) -> bool:
+    """
+    Видят ли все процессы одни и те же снимки и их сброс: кэш выключен
+    или external с ENTITY_CACHE_URL. Иначе несколько воркеров отдают
+    устаревшие снимки до ENTITY_CACHE_TTL после записи в другом процессе.
+    """
+    backend_name = config.ENTITY_CACHE_BACKEND
+    return backend_name == "off" or (backend_name == "external" and bool(config.ENTITY_CACHE_URL))
+
+
+def build_entity_cache(config=settings, client=None) -> EntityCache:
+    """
+    Кэш по ENTITY_CACHE_BACKEND: off (по умолчанию), external или memory.
+    Для external передайте client или задайте ENTITY_CACHE_URL
+    (нужен пакет redis); без них используется LocalCacheClient.
+    """
+    backend_name = config.ENTITY_CACHE_BACKEND
+    if backend_name == "off":
+        return EntityCache(None)
+    if backend_name == "external":
+        if client is None and config.ENTITY_CACHE_URL:
+            import redis.asyncio as redis
+
+            client = redis.from_url(config.ENTITY_CACHE_URL)
+        return EntityCache(ExternalCache(client or LocalCacheClient()), config.ENTITY_CACHE_TTL)
+    if backend_name == "memory":
+        return EntityCache(LRUCache(config.ENTITY_CACHE_MAX_ENTRIES), config.ENTITY_CACHE_TTL)
+    raise ValueError(f"Неизвестный бэкенд кэша: {backend_name}")
+
+
+entity_cache = build_entity_cache()
@@ -1,4 +1,6 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -28,6 +30,119 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     JWT_LIFETIME_SECONDS: int = 3600
 
+    # --- Движок и пул соединений ---
+    # None означает «взять значение из профиля MODE» (см. app/core/database.py)
+    DB_ECHO: Optional[bool] = None
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_POOL_PRE_PING: Optional[bool] = None
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+
+    # --- Реплика для чтения ---
+    # Полный URL реплики; если не задан, чтение идёт с основной БД
+    DB_REPLICA_URL: Optional[str] = None
+    # Сколько секунд после записи клиент читает с основной БД
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # --- Шардирование данных команд ---
+    # URL шардов через запятую; если не заданы, все данные в основной БД
+    DB_SHARD_URLS: Optional[str] = None
+    # Сколько секунд процесс кэширует размещение команды по шардам
+    DB_SHARD_PLACEMENT_TTL: float = 30.0
+
+    # --- Кэш сущностей get_*_or_404 ---
+    # off — выключен; external — общий внешний кэш (ENTITY_CACHE_URL);
+    # memory — LRU в процессе: только если API — один процесс и больше
+    # никто (админка, outbox-воркер, массовые задания) не пишет в БД
+    ENTITY_CACHE_BACKEND: str = "off"
+    # redis://... для external; без него — LocalCacheClient в процессе
+    ENTITY_CACHE_URL: Optional[str] = None
+    ENTITY_CACHE_TTL: float = 30.0
+    ENTITY_CACHE_MAX_ENTRIES: int = 10_000
+
+    # --- Outbox и диспетчер доменных событий ---
+    # Запускать диспетчер внутри приложения (иначе — python -m app.utils.outbox_worker)
+    OUTBOX_DISPATCHER_IN_APP: bool = False
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    # URL вебхуков через запятую; «local» — локальная заглушка вместо HTTP
+    OUTBOX_WEBHOOK_URLS: Optional[str] = None
+    # off или local (индекс в памяти процесса диспетчера)
+    OUTBOX_SEARCH_INDEX: str = "off"
+
+    # --- Push-канал изменений календаря (WebSocket /calendar/ws) ---
+    CALENDAR_PUSH_ENABLED: bool = True
+    CALENDAR_PUSH_MAX_CONNECTIONS: int = 50_000
+    CALENDAR_PUSH_MAX_PER_USER: int = 5
+    # Сколько разных дат копится на соединение до замены на resync
+    CALENDAR_PUSH_MAX_PENDING_DATES: int = 31
+    CALENDAR_PUSH_SEND_TIMEOUT: float = 5.0
+    # Как часто воркер читает новые события outbox
+    CALENDAR_PUSH_POLL_INTERVAL: float = 1.0
+
+    # --- Статистика SQL по запросам (Server-Timing, детектор N+1) ---
+    SQL_STATS_ENABLED: bool = True
+    SQL_WARN_STATEMENTS: int = 50
+    SQL_WARN_REPEATED: int = 10
+    SQL_WARN_DB_MS: float = 500.0
+
+    # --- Метрики Prometheus (/metrics) ---
+    METRICS_ENABLED: bool = True
+    # Каталог multiprocess-метрик при нескольких воркерах (очищается при запуске);
+    # по умолчанию — временный каталог
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+
+    # --- Журнал медленных запросов (выключен по умолчанию) ---
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_MS: float = 200.0
+    # Доля медленных SELECT, для которых снимается EXPLAIN (только PostgreSQL)
+    SLOW_QUERY_EXPLAIN_SAMPLE: float = 0.1
+
+    # --- Архивация выполненных задач ---
+    ARCHIVE_DONE_TASKS_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 1000
+
+    # --- Списки админки ---
+    # Если планировщик оценивает выборку в большее число строк, админка
+    # показывает оценку вместо точного COUNT(*) (только PostgreSQL)
+    ADMIN_EXACT_COUNT_THRESHOLD: int = 10_000
+    # Массовые действия: предел строк на задание и размер пачки UPDATE/DELETE
+    ADMIN_BULK_MAX_ROWS: int = 10_000
+    ADMIN_BULK_BATCH_SIZE: int = 1000
+    # Подключать /admin; None — по MODE: везде, кроме PROD (в проде админка
+    # поднимается отдельным инстансом с ADMIN_ENABLED=true)
+    ADMIN_ENABLED: Optional[bool] = None
+
+    # --- Продакшн-сервер (python -m app.utils.server) ---
+    # Число воркеров; None — по квоте CPU контейнера (не больше SERVER_MAX_WORKERS)
+    SERVER_WORKERS: Optional[int] = None
+    SERVER_MAX_WORKERS: int = 16
+    # Keep-alive дольше простоя соединения на балансировщике, иначе он
+    # отправляет запрос в соединение, которое воркер уже закрывает
+    SERVER_KEEPALIVE_TIMEOUT: int = 75
+    SERVER_BACKLOG: int = 2048
+    # Сколько секунд после SIGTERM дожидаться начатых запросов
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_ACCESS_LOG: bool = False
+    # Прогрев пулов и подготовка горячих запросов до приёма трафика
+    SERVER_WARMUP: bool = True
+    SERVER_WARMUP_CONNECTIONS: int = 5
+    SERVER_WARMUP_TIMEOUT: float = 10.0
+
+    # --- Проверки /healthz и /readyz ---
+    # Таймаут проверочного SELECT 1 к каждой БД
+    HEALTH_DB_TIMEOUT: float = 1.0
+    # Доля занятых соединений пула (с overflow), начиная с которой воркер не готов
+    HEALTH_POOL_SATURATION: float = 0.9
+    # Задержка цикла событий, начиная с которой воркер не готов, и период замера
+    HEALTH_MAX_LOOP_LAG: float = 0.5
+    HEALTH_LOOP_LAG_INTERVAL: float = 0.5
+    # Очередь outbox встроенного диспетчера; None — только показывать
+    HEALTH_MAX_OUTBOX_BACKLOG: Optional[int] = None
+
     @property
     def DATABASE_URL_asyncpg(self) -> str:
         """Формирование URL для подключения к БД через asyncpg."""
@@ -36,6 +151,32 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def DATABASE_URL_replica(self) -> str:
+        """URL реплики для чтения (по умолчанию совпадает с основной БД)."""
+        return self.DB_REPLICA_URL or self.DATABASE_URL_asyncpg
+
+    @property
+    def DATABASE_URLS_shards(self) -> List[str]:
+        """Список URL шардов (пустой, если шардирование выключено)."""
+        if not self.DB_SHARD_URLS:
+            return []
+        return [url.strip() for url in self.DB_SHARD_URLS.split(",") if url.strip()]
+
+    @property
+    def OUTBOX_WEBHOOK_URLS_list(self) -> List[str]:
+        """Список URL вебхуков (пустой, если вебхуки выключены)."""
+        if not self.OUTBOX_WEBHOOK_URLS:
+            return []
+        return [url.strip() for url in self.OUTBOX_WEBHOOK_URLS.split(",") if url.strip()]
+
+    @property
+    def ADMIN_ENABLED_effective(self) -> bool:
+        """Подключать ли админку с учётом MODE."""
+        if self.ADMIN_ENABLED is not None:
+            return self.ADMIN_ENABLED
+        return self.MODE.upper() != "PROD"
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -43,4 +184,31 @@ class Settings(BaseSettings):
 # Глобальный экземпляр настроек
 # -------------------------------------------------------------------
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Настройки процесса; .env читается при первом вызове."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Прокси к get_settings(): импорт app.core.config не читает .env и не
+    падает без него — настройки создаются при первом обращении к атрибуту.
+    Запись атрибутов (monkeypatch в тестах) уходит в сам экземпляр.
+    """
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+    def __delattr__(self, name):
+        delattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings = _LazySettings()
@@ -1,19 +1,179 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import time
+import weakref
+from typing import Any, Dict
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
 
 
+# -------------------------------------------------------------------
+# Профили движка по режиму работы (MODE)
+# -------------------------------------------------------------------
+
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "DEV": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_cache_size": 100,
+    },
+    "TEST": {
+        "echo": False,
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_timeout": 10.0,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "statement_cache_size": 100,
+    },
+    "PROD": {
+        "echo": False,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10.0,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 500,
+    },
+}
+
+# Соответствие полей Settings ключам профиля
+_SETTINGS_OVERRIDES = {
+    "DB_ECHO": "echo",
+    "DB_POOL_SIZE": "pool_size",
+    "DB_MAX_OVERFLOW": "max_overflow",
+    "DB_POOL_TIMEOUT": "pool_timeout",
+    "DB_POOL_RECYCLE": "pool_recycle",
+    "DB_POOL_PRE_PING": "pool_pre_ping",
+    "DB_STATEMENT_CACHE_SIZE": "statement_cache_size",
+}
+
+
+def get_engine_profile(config=settings) -> Dict[str, Any]:
+    """
+    Профиль движка для текущего MODE с учётом явных переопределений
+    из переменных окружения (DB_POOL_SIZE, DB_ECHO и т.д.).
+    Неизвестный MODE трактуется как DEV.
+    """
+    profile = dict(ENGINE_PROFILES.get(config.MODE.upper(), ENGINE_PROFILES["DEV"]))
+    for field, key in _SETTINGS_OVERRIDES.items():
+        value = getattr(config, field, None)
+        if value is not None:
+            profile[key] = value
+    return profile
+
+
+def create_db_engine(url: str, profile: Dict[str, Any]) -> AsyncEngine:
+    """
+    Создать асинхронный движок по профилю.
+    Параметры пула применяются только к драйверам с QueuePool,
+    кэш подготовленных выражений — только к asyncpg.
+    """
+    kwargs: Dict[str, Any] = {
+        "echo": profile["echo"],
+        "future": True,  # Совместимость с SQLAlchemy 2.x
+    }
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        kwargs.update(
+            pool_size=profile["pool_size"],
+            max_overflow=profile["max_overflow"],
+            pool_timeout=profile["pool_timeout"],
+            pool_recycle=profile["pool_recycle"],
+            pool_pre_ping=profile["pool_pre_ping"],
+        )
+    if parsed.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {
+            "prepared_statement_cache_size": profile["statement_cache_size"],
+        }
+
+    new_engine = create_async_engine(url, **kwargs)
+    attach_pool_counters(new_engine)
+    return new_engine
+
+
+# -------------------------------------------------------------------
+# Счётчики пула соединений
+# -------------------------------------------------------------------
+
+class PoolCounters:
+    """Накопительные счётчики событий пула одного движка."""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+
+
+_pool_counters: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def attach_pool_counters(async_engine: AsyncEngine) -> PoolCounters:
+    """Подписаться на события пула движка (повторный вызов безопасен)."""
+    sync_engine = async_engine.sync_engine
+    if sync_engine in _pool_counters:
+        return _pool_counters[sync_engine]
+
+    counters = PoolCounters()
+    _pool_counters[sync_engine] = counters
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        counters.connects += 1
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        counters.checkouts += 1
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        counters.checkins += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exc):
+        counters.invalidations += 1
+
+    return counters
+
+
+def get_pool_stats(async_engine: AsyncEngine) -> Dict[str, Any]:
+    """
+    Снимок состояния пула: размер, занятые/свободные соединения,
+    текущий overflow и накопительные счётчики событий.
+    """
+    pool = async_engine.sync_engine.pool
+    counters = attach_pool_counters(async_engine)
+
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        stats[name] = method() if callable(method) else None
+
+    stats.update(
+        connects_total=counters.connects,
+        checkouts_total=counters.checkouts,
+        checkins_total=counters.checkins,
+        invalidations_total=counters.invalidations,
+    )
+    return stats
+
+
 # -------------------------------------------------------------------
 # Инициализация SQLAlchemy
 # -------------------------------------------------------------------
 
 # --- Движок PostgreSQL ---
-engine = create_async_engine(
-    settings.DATABASE_URL_asyncpg,
-    echo=True,
-    future=True,  # Совместимость с SQLAlchemy 2.x
-)
+engine = create_db_engine(settings.DATABASE_URL_asyncpg, get_engine_profile())
 
 # --- Фабрика асинхронных сессий ---
 AsyncSessionLocal = sessionmaker(
@@ -22,6 +182,18 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+# --- Реплика для чтения ---
+if settings.DB_REPLICA_URL:
+    replica_engine = create_db_engine(settings.DATABASE_URL_replica, get_engine_profile())
+else:
+    replica_engine = engine
+
+ReplicaSessionLocal = sessionmaker(
+    bind=replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 # --- Базовый класс моделей ---
 Base = declarative_base()
 
@@ -34,3 +206,36 @@ async def get_async_session() -> AsyncSession:
     """Асинхронная сессия для внедрения зависимостей."""
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# -------------------------------------------------------------------
+# Маршрутизация чтения между основной БД и репликой
+# -------------------------------------------------------------------
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Cookie с моментом (unix time), до которого клиент читает с основной БД
+READ_YOUR_WRITES_COOKIE = "bms_rw_until"
+
+
+def wants_primary(request: Request) -> bool:
+    """
+    Нужно ли обслуживать чтение с основной БД:
+    небезопасный метод или клиент недавно что-то записал.
+    """
+    if request.method not in SAFE_METHODS:
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """
+    Сессия для эндпоинтов только на чтение: реплика,
+    если клиент не находится в окне read-your-writes.
+    """
+    factory = AsyncSessionLocal if wants_primary(request) else ReplicaSessionLocal
+    async with factory() as session:
+        yield session
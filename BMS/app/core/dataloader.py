@@ -0,0 +1,171 @@
+"""
+Пакетная загрузка пользователей и команд в пределах запроса (DataLoader).
+
+Вызовы load(id), сделанные в одном «такте» цикла событий (например,
+через asyncio.gather или load_many), собираются и выполняются одним
+запросом WHERE id IN (...). Результаты запоминаются до конца запроса:
+повторный load того же id не обращается к БД. Объекты, уже лежащие
+в identity map сессии (например, текущий пользователь после
+аутентификации), берутся оттуда без SQL.
+
+Загрузчики привязаны к сессии (db.info), а сессия живёт ровно один
+запрос, поэтому отдельная зависимость FastAPI не нужна:
+
+    users = await loaders_for(db).users.load_many([creator_id, assignee_id])
+
+Все пакеты одного запроса выполняет одна задача по очереди, так что
+AsyncSession не используется конкурентно. Сами вызывающие корутины
+не должны параллельно с load() выполнять свои запросы на той же сессии.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
+
+from app.models.team import Team
+from app.models.user import User
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Загрузчик одного вида сущностей; пакеты отправляет LoaderGroup."""
+
+    def __init__(self, group: "LoaderGroup", batch_load: BatchLoadFn):
+        self.group = group
+        self.batch_load = batch_load
+        self._results: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._pending: List[K] = []
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """Future со значением по ключу (None, если строки нет)."""
+        future = self._results.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._results[key] = future
+            self._pending.append(key)
+            self.group.schedule()
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """Словарь найденных значений по ключам (отсутствующие не попадают)."""
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def prime(self, key: K, value: V) -> None:
+        """Положить уже загруженное значение, чтобы не запрашивать его снова."""
+        future = self._results.get(key)
+        if future is None or (future.done() and future.result() is None):
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._results[key] = future
+
+    def clear(self, key: K) -> None:
+        """Забыть значение (после изменения строки в этом же запросе)."""
+        if key not in self._pending:
+            self._results.pop(key, None)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    async def dispatch(self) -> None:
+        keys, self._pending = self._pending, []
+        if not keys:
+            return
+        try:
+            found = await self.batch_load(keys)
+        except Exception as exc:
+            for key in keys:
+                self._results.pop(key).set_exception(exc)
+            return
+        for key in keys:
+            self._results[key].set_result(found.get(key))
+
+
+class LoaderGroup:
+    """Общий диспетчер загрузчиков одной сессии."""
+
+    def __init__(self):
+        self.loaders: List[DataLoader] = []
+        self._flush: Optional[asyncio.Task] = None
+
+    def add(self, batch_load: BatchLoadFn) -> DataLoader:
+        loader = DataLoader(self, batch_load)
+        self.loaders.append(loader)
+        return loader
+
+    def schedule(self) -> None:
+        if self._flush is None:
+            self._flush = asyncio.get_running_loop().create_task(self._flush_all())
+
+    async def _flush_all(self) -> None:
+        try:
+            # Пакет закрывается на следующем такте: все load() текущего такта в нём
+            await asyncio.sleep(0)
+            while any(loader.has_pending for loader in self.loaders):
+                for loader in self.loaders:
+                    await loader.dispatch()
+        finally:
+            self._flush = None
+
+
+# -------------------------------------------------------------------
+# Загрузчики пользователей и команд
+# -------------------------------------------------------------------
+
+class RequestLoaders(LoaderGroup):
+    """
+    users — User по id; teams — Team по id вместе с участниками.
+    Участники загруженной команды сразу попадают в users.
+    Команды загружаются раньше пользователей, чтобы праймить их.
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__()
+        self.db = db
+        self.teams: DataLoader[int, Team] = self.add(self._load_teams)
+        self.users: DataLoader[int, User] = self.add(self._load_users)
+
+    def _in_session(self, model, ids: List[int]) -> Dict[int, Any]:
+        identity_map = self.db.sync_session.identity_map
+        found = {}
+        for entity_id in ids:
+            obj = identity_map.get(identity_key(model, entity_id))
+            if obj is not None:
+                found[entity_id] = obj
+        return found
+
+    async def _load_users(self, ids: List[int]) -> Dict[int, User]:
+        found = self._in_session(User, ids)
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing:
+            result = await self.db.execute(select(User).where(User.id.in_(missing)))
+            found.update((user.id, user) for user in result.scalars())
+        return found
+
+    async def _load_teams(self, ids: List[int]) -> Dict[int, Team]:
+        result = await self.db.execute(
+            select(Team).options(selectinload(Team.members)).where(Team.id.in_(ids))
+        )
+        found = {team.id: team for team in result.scalars()}
+        for team in found.values():
+            for member in team.members:
+                self.users.prime(member.id, member)
+        return found
+
+
+def loaders_for(db: AsyncSession) -> RequestLoaders:
+    """Загрузчики сессии (создаются при первом обращении)."""
+    loaders = db.info.get("loaders")
+    if loaders is None:
+        loaders = db.info["loaders"] = RequestLoaders(db)
+    return loaders
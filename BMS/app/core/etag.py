@@ -0,0 +1,55 @@
+"""
+Условные GET: слабые ETag и ответ 304 Not Modified.
+
+ETag считается не по телу ответа, а по «версии» данных: одному
+агрегирующему запросу (число строк, сумма id, сумма version,
+max(updated_at)), см. fetch_*_version в app.utils.read_queries.
+Если клиент прислал If-None-Match с тем же тегом, эндпоинт отвечает 304,
+не загружая и не сериализуя сами данные.
+
+Версия считается до выборки данных: если между запросами данные
+изменились, клиент получит более новое тело со старым тегом
+и просто перезапросит его в следующий раз — устаревший 304 невозможен.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+
+# Клиент обязан перепроверять ответ, но может хранить его у себя
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """Слабый ETag из значений версии (кортежи, числа, даты)."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли If-None-Match с тегом (слабое сравнение, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    expected = _opaque(etag)
+    return any(_opaque(tag) == expected for tag in header.split(","))
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Проставить ETag и Cache-Control в ответ."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    """Пустой ответ 304 с тем же тегом."""
+    return with_etag(Response(status_code=304), etag)
@@ -0,0 +1,169 @@
+"""
+Проверки живости и готовности воркера (/healthz, /readyz).
+
+/healthz отвечает, пока цикл событий обслуживает запросы, и ничего
+не проверяет. /readyz решает, слать ли воркеру трафик, и отвечает 503,
+если хотя бы одна проверка не пройдена:
+  - пул каждой БД занят меньше чем на HEALTH_POOL_SATURATION;
+  - SELECT 1 к каждой БД укладывается в HEALTH_DB_TIMEOUT (при
+    исчерпанном пуле не выполняется — он встал бы в ту же очередь);
+  - задержка цикла событий (LoopLagMonitor) не больше HEALTH_MAX_LOOP_LAG;
+  - очередь встроенного диспетчера outbox не больше
+    HEALTH_MAX_OUTBOX_BACKLOG (если задан; иначе только показывается).
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.database import get_pool_stats
+from app.core.metrics import EVENT_LOOP_LAG
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Задержка цикла событий
+# -------------------------------------------------------------------
+
+class LoopLagMonitor:
+    """
+    Засыпает на interval секунд и замеряет, насколько позже проснулся:
+    столько же ждут готовые к выполнению запросы. lag — максимум за
+    последние window секунд, чтобы редкий опрос /readyz не пропускал
+    короткие блокировки цикла.
+    """
+
+    def __init__(self, interval: float = 0.5, window: float = 5.0):
+        self.interval = interval
+        self._samples: Deque[float] = deque(maxlen=max(1, round(window / interval)))
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lag(self) -> Optional[float]:
+        return max(self._samples) if self._samples else None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            sample = max(0.0, loop.time() - started - self.interval)
+            self._samples.append(sample)
+            EVENT_LOOP_LAG.set(sample)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# -------------------------------------------------------------------
+# Базы данных
+# -------------------------------------------------------------------
+
+def health_engines() -> Dict[str, AsyncEngine]:
+    """Проверяемые движки по именам: primary, replica, shard<N>."""
+    from app.core.database import engine, replica_engine
+    from app.core.sharding import shard_router
+
+    engines = {"primary": engine}
+    if replica_engine is not engine:
+        engines["replica"] = replica_engine
+    for index, shard_engine in enumerate(shard_router.engines):
+        if all(shard_engine is not known for known in engines.values()):
+            engines[f"shard{index}"] = shard_engine
+    return engines
+
+
+def pool_usage(async_engine: AsyncEngine) -> dict:
+    """
+    Занятые соединения, ёмкость пула (size + max_overflow) и их доля.
+    Для пулов без ограничения (StaticPool, NullPool, max_overflow=-1)
+    ёмкость и доля — None.
+    """
+    stats = get_pool_stats(async_engine)
+    max_overflow = getattr(async_engine.sync_engine.pool, "_max_overflow", None)
+    capacity = None
+    if stats["size"] is not None and max_overflow is not None and max_overflow >= 0:
+        capacity = stats["size"] + max_overflow
+    checkedout = stats["checkedout"]
+    return {
+        "checkedout": checkedout,
+        "capacity": capacity,
+        "saturation": round(checkedout / capacity, 3) if capacity and checkedout is not None else None,
+    }
+
+
+async def check_database(async_engine: AsyncEngine, config=settings) -> dict:
+    """Пул и SELECT 1 с таймаутом для одного движка."""
+    pool = pool_usage(async_engine)
+    result = {"ok": True, "pool": pool}
+    if pool["saturation"] is not None and pool["saturation"] >= config.HEALTH_POOL_SATURATION:
+        result.update(ok=False, error="pool saturated")
+        return result
+
+    async def ping() -> None:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping(), config.HEALTH_DB_TIMEOUT)
+    except Exception as exc:
+        result.update(ok=False, error="timeout" if isinstance(exc, asyncio.TimeoutError) else repr(exc))
+    else:
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+# -------------------------------------------------------------------
+# Готовность
+# -------------------------------------------------------------------
+
+async def check_readiness(
+    config=settings,
+    engines: Optional[Dict[str, AsyncEngine]] = None,
+    loop_monitor: Optional[LoopLagMonitor] = None,
+    dispatcher=None,
+) -> Tuple[bool, dict]:
+    """(готов ли воркер, отчёт по проверкам)."""
+    engines = health_engines() if engines is None else engines
+    results = await asyncio.gather(*(check_database(e, config) for e in engines.values()))
+    checks: Dict[str, dict] = {"databases": dict(zip(engines, results))}
+    ready = all(result["ok"] for result in results)
+
+    lag = loop_monitor.lag if loop_monitor is not None else None
+    lag_ok = lag is None or lag <= config.HEALTH_MAX_LOOP_LAG
+    checks["event_loop"] = {"ok": lag_ok, "lag_ms": None if lag is None else round(lag * 1000, 1)}
+    ready = ready and lag_ok
+
+    if dispatcher is not None:
+        try:
+            backlog = await asyncio.wait_for(dispatcher.pending(), config.HEALTH_DB_TIMEOUT)
+        except Exception as exc:
+            # Очередь — вспомогательный показатель: его недоступность трафик не снимает
+            checks["outbox"] = {"ok": True, "backlog": None, "error": repr(exc)}
+        else:
+            limit = config.HEALTH_MAX_OUTBOX_BACKLOG
+            backlog_ok = limit is None or backlog <= limit
+            checks["outbox"] = {"ok": backlog_ok, "backlog": backlog}
+            ready = ready and backlog_ok
+
+    if not ready:
+        logger.warning("readyz: воркер не готов: %s", checks)
+    return ready, {"status": "ready" if ready else "unavailable", "checks": checks}
@@ -0,0 +1,186 @@
+"""
+Метрики Prometheus.
+
+Один процесс — значения в памяти, /metrics отдаёт REGISTRY.
+Несколько воркеров (app.utils.server) — multiprocess-режим prometheus_client:
+лаунчер задаёт PROMETHEUS_MULTIPROC_DIR до импорта приложения, каждый
+воркер пишет значения в свои файлы каталога, а render_metrics() собирает
+их через MultiProcessCollector — любой воркер отдаёт сумму по всем.
+Состояние пулов (PoolCollector) снимается в момент опроса, поэтому
+в этом режиме оно только отвечающего воркера и помечено его pid.
+"""
+import os
+from typing import Iterable
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.database import get_pool_stats
+
+
+# -------------------------------------------------------------------
+# Реестр метрик приложения
+# -------------------------------------------------------------------
+
+REGISTRY = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "bms_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=REGISTRY,
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "bms_http_requests_in_flight",
+    "Количество обрабатываемых в данный момент запросов",
+    ["method"],
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+MEETING_CONFLICT_REJECTIONS = Counter(
+    "bms_meeting_conflict_rejections",
+    "Отказы check_time_conflicts из-за пересечения встреч",
+    registry=REGISTRY,
+)
+
+ENTITY_CACHE_HITS = Counter(
+    "bms_entity_cache_hits",
+    "Попадания в кэш сущностей get_*_or_404",
+    ["kind"],
+    registry=REGISTRY,
+)
+
+ENTITY_CACHE_MISSES = Counter(
+    "bms_entity_cache_misses",
+    "Промахи кэша сущностей (чтение из БД)",
+    ["kind"],
+    registry=REGISTRY,
+)
+
+ENTITY_CACHE_EVICTIONS = Counter(
+    "bms_entity_cache_evictions",
+    "Вытеснения из кэша сущностей в процессе: по размеру или по TTL",
+    ["kind", "reason"],
+    registry=REGISTRY,
+)
+
+OUTBOX_DELIVERED = Counter(
+    "bms_outbox_delivered",
+    "События outbox, принятые потребителем",
+    ["consumer"],
+    registry=REGISTRY,
+)
+
+OUTBOX_FAILED = Counter(
+    "bms_outbox_failed",
+    "События outbox, которые потребитель не принял (будут повторены)",
+    ["consumer"],
+    registry=REGISTRY,
+)
+
+CALENDAR_PUSH_CONNECTIONS = Gauge(
+    "bms_calendar_push_connections",
+    "Открытые WebSocket-соединения канала изменений календаря",
+    registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+
+CALENDAR_PUSH_MESSAGES = Counter(
+    "bms_calendar_push_messages",
+    "Отправленные по WebSocket уведомления: invalidate или resync",
+    ["type"],
+    registry=REGISTRY,
+)
+
+ADMIN_BULK_ROWS = Counter(
+    "bms_admin_bulk_rows",
+    "Строки, изменённые массовыми действиями админки",
+    ["action"],
+    registry=REGISTRY,
+)
+
+EVENT_LOOP_LAG = Gauge(
+    "bms_event_loop_lag_seconds",
+    "Задержка цикла событий воркера (последний замер LoopLagMonitor)",
+    registry=REGISTRY,
+    multiprocess_mode="livemax",
+)
+
+# Метка маршрута для запросов, не попавших ни в один роут
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# -------------------------------------------------------------------
+# Состояние пулов соединений
+# -------------------------------------------------------------------
+
+class PoolCollector(Collector):
+    """
+    Снимает состояние пулов основной БД, реплики и шардов в момент опроса.
+    with_pid добавляет метку pid (multiprocess-режим: пулы у каждого воркера свои).
+    """
+
+    FIELDS = ("size", "checkedin", "checkedout", "overflow")
+
+    def __init__(self, with_pid: bool = False):
+        self.with_pid = with_pid
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        # health импортирует метрики — импорт здесь, а не в модуле
+        from app.core.health import health_engines
+
+        snapshots = {name: get_pool_stats(eng) for name, eng in health_engines().items()}
+        labels = ["database", "pid"] if self.with_pid else ["database"]
+        extra = [str(os.getpid())] if self.with_pid else []
+
+        for field in self.FIELDS:
+            family = GaugeMetricFamily(
+                f"bms_db_pool_{field}",
+                f"Пул соединений: {field}",
+                labels=labels,
+            )
+            for name, stats in snapshots.items():
+                if stats[field] is not None:
+                    family.add_metric([name, *extra], stats[field])
+            yield family
+
+        checkouts = CounterMetricFamily(
+            "bms_db_pool_checkouts",
+            "Накопительное число выдач соединений из пула",
+            labels=labels,
+        )
+        for name, stats in snapshots.items():
+            checkouts.add_metric([name, *extra], stats["checkouts_total"])
+        yield checkouts
+
+
+REGISTRY.register(PoolCollector())
+
+
+# -------------------------------------------------------------------
+# Несколько воркеров
+# -------------------------------------------------------------------
+
+def multiprocess_dir() -> str:
+    """Каталог multiprocess-режима или пустая строка (один процесс)."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+
+
+def render_metrics() -> bytes:
+    """Текст для /metrics: свой REGISTRY или сумма по всем воркерам."""
+    if not multiprocess_dir():
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(PoolCollector(with_pid=True))
+    return generate_latest(registry)
+
+
+def mark_worker_stopped() -> None:
+    """При остановке воркера: его live-датчики больше не учитываются."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(os.getpid())
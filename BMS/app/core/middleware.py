@@ -0,0 +1,118 @@
+import logging
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.database import READ_YOUR_WRITES_COOKIE, SAFE_METHODS
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, UNMATCHED_ROUTE
+from app.core.slow_queries import bind_request_scope
+from app.core.sql_stats import start_request_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Read-your-writes для маршрутизации на реплику
+# -------------------------------------------------------------------
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    После успешного запроса на запись выставляет cookie,
+    по которой get_read_session ещё некоторое время
+    направляет чтения этого клиента на основную БД.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        if request.method not in SAFE_METHODS and response.status_code < 400 and window > 0:
+            response.set_cookie(
+                READ_YOUR_WRITES_COOKIE,
+                f"{time.time() + window:.3f}",
+                max_age=int(window) + 1,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+
+# -------------------------------------------------------------------
+# Статистика SQL по запросам
+# -------------------------------------------------------------------
+
+class SqlStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Считает SQL-выражения и время БД для каждого запроса,
+    отдаёт их в заголовке Server-Timing и пишет предупреждение
+    при превышении порогов (много запросов, повторяющиеся формы — N+1).
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = start_request_stats()
+        started = time.perf_counter()
+        response = await call_next(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        response.headers["Server-Timing"] = f"{stats.server_timing()}, app;dur={total_ms:.2f}"
+
+        repeated = stats.repeated(settings.SQL_WARN_REPEATED)
+        if (
+            stats.count >= settings.SQL_WARN_STATEMENTS
+            or stats.total_ms >= settings.SQL_WARN_DB_MS
+            or repeated
+        ):
+            logger.warning(
+                "%s %s: %d SQL statements, %.1f ms in DB; repeated shapes: %s",
+                request.method,
+                request.url.path,
+                stats.count,
+                stats.total_ms,
+                [(shape[:120], n) for shape, n in repeated[:3]],
+            )
+        return response
+
+
+# -------------------------------------------------------------------
+# Метрики Prometheus
+# -------------------------------------------------------------------
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Гистограмма задержек по шаблону маршрута и статусу
+    и gauge запросов в обработке.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        in_flight = REQUESTS_IN_FLIGHT.labels(request.method)
+        in_flight.inc()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            in_flight.dec()
+            # Шаблон пути (/tasks/{task_id}), а не сам путь — ограниченная кардинальность
+            route = request.scope.get("route")
+            REQUEST_LATENCY.labels(
+                request.method,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+# -------------------------------------------------------------------
+# Журнал медленных запросов
+# -------------------------------------------------------------------
+
+class SlowQueryContextMiddleware(BaseHTTPMiddleware):
+    """Привязывает SQL-запросы к маршруту для журнала медленных запросов."""
+
+    async def dispatch(self, request: Request, call_next):
+        bind_request_scope(request.scope)
+        return await call_next(request)
@@ -0,0 +1,289 @@
+"""
+Transactional outbox и пакетный диспетчер доменных событий.
+
+Вьюсеты не выполняют побочные эффекты (вебхуки, индексация, сброс
+внешних кэшей) внутри запроса. Вместо этого emit() добавляет строку
+outbox_events в ту же транзакцию, что и само изменение: событие
+появляется тогда и только тогда, когда зафиксированы данные.
+
+OutboxDispatcher вычитывает очередь пачками и отдаёт события
+зарегистрированным потребителям. Доставка — «хотя бы один раз»:
+событие помечается обработанным только после успеха всех потребителей,
+при ошибке оно повторяется с экспоненциальной отсрочкой, поэтому
+потребители обязаны быть идемпотентными (ключ — OutboxEvent.id).
+Пачка забирается короткой транзакцией с арендой (available_at сдвигается
+вперёд), доставляется без открытой транзакции и отмечается второй
+транзакцией: медленный потребитель не держит блокировки строк и
+соединение с базой.
+После OUTBOX_MAX_ATTEMPTS неудач событие остаётся в таблице
+(attempts, last_error) и больше не выбирается.
+
+Диспетчер работает отдельным процессом (python -m app.utils.outbox_worker)
+или фоновой задачей приложения (OUTBOX_DISPATCHER_IN_APP) и обходит
+все шарды: строки outbox лежат рядом с данными своей команды.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional, Sequence
+
+import orjson
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import OUTBOX_DELIVERED, OUTBOX_FAILED
+from app.core.serialization import dumps
+from app.models.outbox import OutboxEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Запись событий
+# -------------------------------------------------------------------
+
+def emit(db: AsyncSession, topic: str, aggregate_id: int, payload: Optional[dict] = None) -> OutboxEvent:
+    """
+    Добавить событие в текущую транзакцию db (до commit).
+    payload приводится к JSON: даты и перечисления становятся строками.
+    """
+    event = OutboxEvent(topic=topic, aggregate_id=aggregate_id, payload=orjson.loads(dumps(payload or {})))
+    db.add(event)
+    return event
+
+
+# -------------------------------------------------------------------
+# Потребители
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Consumer:
+    """
+    Потребитель событий: handle получает пачку событий нужных тем.
+    topics — точные имена («task.updated») или префиксы («task.*»);
+    пустое множество означает все темы.
+    """
+    name: str
+    handle: Callable[[List[OutboxEvent]], Awaitable[None]]
+    topics: FrozenSet[str] = frozenset()
+    timeout: float = 10.0
+
+    def accepts(self, topic: str) -> bool:
+        if not self.topics:
+            return True
+        return topic in self.topics or f"{topic.split('.', 1)[0]}.*" in self.topics
+
+
+# -------------------------------------------------------------------
+# Диспетчер
+# -------------------------------------------------------------------
+
+class OutboxDispatcher:
+    """Вычитывает outbox_events всех баз пачками и раздаёт потребителям."""
+
+    def __init__(
+        self,
+        session_factories: Sequence[sessionmaker],
+        consumers: Sequence[Consumer] = (),
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10,
+        retry_base: float = 2.0,
+        lease: Optional[float] = None,
+    ):
+        self.session_factories = list(session_factories)
+        self.consumers: List[Consumer] = list(consumers)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        # Аренда пачки: дольше худшего случая доставки (потребители вызываются по очереди)
+        self._lease = lease
+        self._stopping = asyncio.Event()
+
+    def register(self, consumer: Consumer) -> None:
+        self.consumers.append(consumer)
+
+    @property
+    def lease(self) -> timedelta:
+        if self._lease is not None:
+            return timedelta(seconds=self._lease)
+        return timedelta(seconds=sum(consumer.timeout for consumer in self.consumers) + 30)
+
+    def _retry_delay(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.retry_base ** attempts, 3600))
+
+    async def _deliver(self, events: List[OutboxEvent]) -> Dict[int, str]:
+        """Раздать пачку потребителям; вернуть ошибки по id событий."""
+        errors: Dict[int, str] = {}
+        for consumer in self.consumers:
+            selected = [event for event in events if consumer.accepts(event.topic)]
+            if not selected:
+                continue
+            try:
+                await asyncio.wait_for(consumer.handle(selected), consumer.timeout)
+            except Exception as exc:
+                OUTBOX_FAILED.labels(consumer.name).inc(len(selected))
+                logger.warning("outbox: потребитель %s не принял %d событий: %r", consumer.name, len(selected), exc)
+                for event in selected:
+                    errors.setdefault(event.id, f"{consumer.name}: {exc!r}")
+            else:
+                OUTBOX_DELIVERED.labels(consumer.name).inc(len(selected))
+        return errors
+
+    async def _claim(self, factory: sessionmaker, now: datetime) -> List[OutboxEvent]:
+        """
+        Забрать пачку в короткой транзакции: выбранным событиям available_at
+        сдвигается на срок аренды, и после commit другие диспетчеры их не
+        выбирают. Если процесс упадёт во время доставки, события вернутся
+        в очередь по истечении аренды.
+        """
+        async with factory() as db:
+            stmt = (
+                select(OutboxEvent)
+                .where(
+                    OutboxEvent.processed_at.is_(None),
+                    OutboxEvent.available_at <= now,
+                    OutboxEvent.attempts < self.max_attempts,
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+            if db.bind.dialect.name == "postgresql":
+                stmt = stmt.with_for_update(skip_locked=True)
+            events = list((await db.execute(stmt)).scalars())
+            if events:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_([event.id for event in events]))
+                    .values(available_at=now + self.lease)
+                    .execution_options(synchronize_session=False)
+                )
+            db.expunge_all()
+            await db.commit()
+        return events
+
+    async def _acknowledge(self, factory: sessionmaker, events: List[OutboxEvent], errors: Dict[int, str]) -> None:
+        """Отметить доставленные и отложить неудачные — вторая короткая транзакция."""
+        done_at = datetime.utcnow()
+        delivered = [event.id for event in events if event.id not in errors]
+        async with factory() as db:
+            if delivered:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(delivered))
+                    .values(processed_at=done_at)
+                    .execution_options(synchronize_session=False)
+                )
+            for event in events:
+                error = errors.get(event.id)
+                if error is None:
+                    continue
+                attempts = event.attempts + 1
+                # Аренда могла истечь, и событие уже доставил другой диспетчер
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == event.id, OutboxEvent.processed_at.is_(None))
+                    .values(
+                        attempts=attempts,
+                        last_error=error[:2000],
+                        available_at=done_at + self._retry_delay(attempts),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+
+    async def drain_batch(self, factory: sessionmaker, shard: Optional[int] = None) -> int:
+        """
+        Обработать одну пачку из базы factory: забрать её (_claim), раздать
+        потребителям без открытой транзакции и отметить результат
+        (_acknowledge). Строки при выборке блокируются FOR UPDATE SKIP LOCKED
+        (PostgreSQL), а после commit их держит аренда, поэтому несколько
+        диспетчеров не получают одно и то же событие одновременно. shard
+        проставляется событиям (OutboxEvent.shard) для потребителей.
+        """
+        events = await self._claim(factory, datetime.utcnow())
+        if not events:
+            return 0
+        for event in events:
+            event.shard = shard
+
+        errors = await self._deliver(events)
+        await self._acknowledge(factory, events, errors)
+        return len(events)
+
+    async def drain(self, max_batches: Optional[int] = None) -> int:
+        """Обойти все базы, пока есть готовые события. Возвращает их число."""
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            drained = 0
+            # Номер фабрики — номер шарда (build_dispatcher передаёт shard_router.shards)
+            for shard, factory in enumerate(self.session_factories):
+                drained += await self.drain_batch(factory, shard)
+            batches += 1
+            total += drained
+            if not drained:
+                break
+        return total
+
+    async def pending(self) -> int:
+        """Сколько событий ждут доставки (для мониторинга)."""
+        count = 0
+        for factory in self.session_factories:
+            async with factory() as db:
+                count += await db.scalar(
+                    select(func.count()).select_from(OutboxEvent).where(
+                        OutboxEvent.processed_at.is_(None), OutboxEvent.attempts < self.max_attempts
+                    )
+                )
+        return count
+
+    async def purge(self, older_than: timedelta) -> int:
+        """Удалить доставленные события старше older_than."""
+        cutoff = datetime.utcnow() - older_than
+        removed = 0
+        for factory in self.session_factories:
+            async with factory() as db:
+                result = await db.execute(
+                    delete(OutboxEvent).where(OutboxEvent.processed_at < cutoff)
+                )
+                await db.commit()
+                removed += result.rowcount or 0
+        return removed
+
+    async def run(self) -> None:
+        """Цикл до stop(): пока очередь не пуста — без пауз, иначе опрос раз в poll_interval."""
+        self._stopping.clear()
+        while not self._stopping.is_set():
+            try:
+                drained = await self.drain(max_batches=1)
+            except Exception:
+                logger.exception("outbox: ошибка обработки очереди")
+                drained = 0
+            if not drained:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self) -> None:
+        """Завершить run() после текущей пачки."""
+        self._stopping.set()
+
+
+def build_dispatcher(config=settings, consumers: Optional[Sequence[Consumer]] = None) -> OutboxDispatcher:
+    """Диспетчер по всем шардам (без шардов — только основная БД)."""
+    from app.core.sharding import shard_router
+    from app.utils.outbox_consumers import default_consumers
+
+    return OutboxDispatcher(
+        shard_router.shards,
+        default_consumers(config) if consumers is None else consumers,
+        batch_size=config.OUTBOX_BATCH_SIZE,
+        poll_interval=config.OUTBOX_POLL_INTERVAL,
+        max_attempts=config.OUTBOX_MAX_ATTEMPTS,
+    )
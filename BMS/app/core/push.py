@@ -0,0 +1,305 @@
+"""
+Push-канал изменений календаря (WebSocket /calendar/ws).
+
+Вместо опроса /calendar/daily и /calendar/monthly клиент держит одно
+соединение и получает сообщения
+
+    {"type": "invalidate", "dates": ["2026-10-19", ...]}  — обновить эти дни;
+    {"type": "resync"}                                     — обновить всё.
+
+Источник изменений — outbox_events (app/core/outbox.py): каждый воркер
+читает новые события по возрастанию id (OutboxTail) и рассылает их своим
+соединениям, поэтому уведомления доходят при любом числе воркеров и
+шардов. Задача с дедлайном касается всех участников команд её автора
+и исполнителя, встреча — своих участников.
+
+Память на соединение ограничена: объект со __slots__ и не более
+CALENDAR_PUSH_MAX_PENDING_DATES дат в очереди (при переполнении очередь
+заменяется одним resync). Задача отправки существует, только пока есть
+что отправлять; медленный клиент отключается по CALENDAR_PUSH_SEND_TIMEOUT.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import CALENDAR_PUSH_CONNECTIONS, CALENDAR_PUSH_MESSAGES
+from app.core.serialization import dumps
+from app.models.outbox import OutboxEvent
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Соединения и рассылка
+# -------------------------------------------------------------------
+
+class PushConnection:
+    """Одно WebSocket-соединение и его очередь дат."""
+    __slots__ = ("websocket", "user_id", "dates", "resync", "sending")
+
+    def __init__(self, websocket, user_id: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.dates: Set[str] = set()
+        self.resync = False
+        self.sending = False
+
+
+class CalendarPushHub:
+    """Реестр соединений воркера: user_id → соединения (в порядке открытия)."""
+
+    def __init__(
+        self,
+        max_connections: int = 50_000,
+        max_per_user: int = 5,
+        max_pending_dates: int = 31,
+        send_timeout: float = 5.0,
+    ):
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.max_pending_dates = max_pending_dates
+        self.send_timeout = send_timeout
+        self._by_user: Dict[int, Dict[PushConnection, None]] = {}
+        self._count = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def register(self, websocket, user_id: int) -> Optional[PushConnection]:
+        """
+        Зарегистрировать принятое соединение. None — воркер заполнен.
+        Сверх max_per_user закрывается самое старое соединение пользователя.
+        """
+        if self._count >= self.max_connections:
+            return None
+        connections = self._by_user.get(user_id, {})
+        if len(connections) >= self.max_per_user:
+            oldest = next(iter(connections))
+            self.unregister(oldest)
+            self._spawn(self._close(oldest))
+        connection = PushConnection(websocket, user_id)
+        self._by_user.setdefault(user_id, {})[connection] = None
+        self._count += 1
+        CALENDAR_PUSH_CONNECTIONS.inc()
+        return connection
+
+    def unregister(self, connection: PushConnection) -> None:
+        connections = self._by_user.get(connection.user_id)
+        if connections is None or connections.pop(connection, False) is False:
+            return
+        if not connections:
+            del self._by_user[connection.user_id]
+        self._count -= 1
+        CALENDAR_PUSH_CONNECTIONS.dec()
+
+    def notify(self, user_ids: Iterable[int], dates: Iterable[str]) -> int:
+        """Поставить даты в очередь соединений пользователей. Возвращает число соединений."""
+        dates = set(dates)
+        if not dates:
+            return 0
+        notified = 0
+        for user_id in set(user_ids):
+            for connection in self._by_user.get(user_id, ()):
+                if not connection.resync:
+                    connection.dates |= dates
+                    if len(connection.dates) > self.max_pending_dates:
+                        connection.dates.clear()
+                        connection.resync = True
+                if not connection.sending:
+                    connection.sending = True
+                    self._spawn(self._flush(connection))
+                notified += 1
+        return notified
+
+    async def _flush(self, connection: PushConnection) -> None:
+        try:
+            while connection.resync or connection.dates:
+                if connection.resync:
+                    message = {"type": "resync"}
+                else:
+                    message = {"type": "invalidate", "dates": sorted(connection.dates)}
+                connection.dates.clear()
+                connection.resync = False
+                await asyncio.wait_for(
+                    connection.websocket.send_text(dumps(message).decode()), self.send_timeout
+                )
+                CALENDAR_PUSH_MESSAGES.labels(message["type"]).inc()
+        except Exception as exc:
+            logger.info("calendar push: отключаем пользователя %s: %r", connection.user_id, exc)
+            self.unregister(connection)
+            await self._close(connection)
+        finally:
+            connection.sending = False
+
+    @staticmethod
+    async def _close(connection: PushConnection, code: int = 1000) -> None:
+        try:
+            await connection.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close_all(self) -> None:
+        """Закрыть все соединения (остановка воркера)."""
+        connections = [c for by_user in self._by_user.values() for c in by_user]
+        for connection in connections:
+            self.unregister(connection)
+        await asyncio.gather(*(self._close(c, 1001) for c in connections))
+
+
+# -------------------------------------------------------------------
+# События outbox → адресаты и даты
+# -------------------------------------------------------------------
+
+def _day(value: Optional[str]) -> Optional[str]:
+    return datetime.fromisoformat(value).date().isoformat() if value else None
+
+
+def calendar_change(topic: str, payload: dict) -> Optional[Tuple[Set[int], Set[int], Set[str]]]:
+    """
+    (пользователи, команды, даты) изменения календаря или None,
+    если событие календарь не затрагивает.
+    """
+    kind = topic.split(".", 1)[0]
+    if kind == "task":
+        dates = {_day(payload.get("deadline")), _day(payload.get("previous_deadline"))} - {None}
+        return (set(), set(payload.get("team_ids", ())), dates) if dates else None
+    if kind == "meeting":
+        dates = {_day(payload.get("start_time")), _day(payload.get("previous_start_time"))} - {None}
+        users = set(payload.get("participants", ())) | set(payload.get("previous_participants", ()))
+        return (users, set(), dates) if dates else None
+    return None
+
+
+class OutboxTail:
+    """
+    Чтение новых событий outbox без их пометки (доставкой занимается
+    OutboxDispatcher). Курсор — последний прочитанный id в каждой базе.
+    Id выдаются до commit, поэтому событие с меньшим id может появиться
+    позже: пропуски в последовательности перечитываются gap_timeout секунд.
+    """
+
+    def __init__(
+        self,
+        hub: CalendarPushHub,
+        session_factories: Sequence[sessionmaker],
+        poll_interval: float = 1.0,
+        batch_size: int = 500,
+        gap_timeout: float = 10.0,
+        max_gaps: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.hub = hub
+        self.session_factories = list(session_factories)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.max_gaps = max_gaps
+        self.clock = clock
+        self._cursors: Dict[int, int] = {}
+        self._gaps: Dict[int, Dict[int, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def poll(self) -> int:
+        """Прочитать новые события всех баз и разослать. Возвращает их число."""
+        total = 0
+        for index, factory in enumerate(self.session_factories):
+            async with factory() as db:
+                if index not in self._cursors:
+                    # Подписка начинается с текущего конца очереди
+                    self._cursors[index] = await db.scalar(select(func.coalesce(func.max(OutboxEvent.id), 0)))
+                    self._gaps[index] = {}
+                    continue
+                events = await self._read(db, index)
+                total += len(events)
+                await self._publish(db, events)
+        return total
+
+    async def _read(self, db, index: int) -> List[tuple]:
+        cursor, gaps = self._cursors[index], self._gaps[index]
+        now = self.clock()
+        for event_id in [event_id for event_id, expires in gaps.items() if expires <= now]:
+            del gaps[event_id]
+
+        condition = OutboxEvent.id > cursor
+        if gaps:
+            condition = or_(condition, OutboxEvent.id.in_(list(gaps)))
+        rows = (await db.execute(
+            select(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload)
+            .where(condition)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+        )).all()
+
+        for event_id, _, _ in rows:
+            if event_id <= cursor:
+                gaps.pop(event_id, None)
+                continue
+            for missing in range(cursor + 1, min(event_id, cursor + 1 + self.max_gaps - len(gaps))):
+                gaps[missing] = now + self.gap_timeout
+            cursor = event_id
+        self._cursors[index] = cursor
+        return [(topic, payload) for _, topic, payload in rows]
+
+    async def _publish(self, db, events: List[tuple]) -> None:
+        changes = [change for change in (calendar_change(*event) for event in events) if change]
+        team_ids = set().union(*(teams for _, teams, _ in changes))
+        members: Dict[int, List[int]] = {}
+        if team_ids:
+            for user_id, team_id in await db.execute(
+                select(User.id, User.team_id).where(User.team_id.in_(team_ids))
+            ):
+                members.setdefault(team_id, []).append(user_id)
+        for users, teams, dates in changes:
+            for team_id in teams:
+                users.update(members.get(team_id, ()))
+            self.hub.notify(users, dates)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("calendar push: ошибка чтения outbox")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+calendar_hub = CalendarPushHub(
+    max_connections=settings.CALENDAR_PUSH_MAX_CONNECTIONS,
+    max_per_user=settings.CALENDAR_PUSH_MAX_PER_USER,
+    max_pending_dates=settings.CALENDAR_PUSH_MAX_PENDING_DATES,
+    send_timeout=settings.CALENDAR_PUSH_SEND_TIMEOUT,
+)
+
+
+def build_outbox_tail(hub: CalendarPushHub = calendar_hub, config=settings) -> OutboxTail:
+    """Чтение outbox всех шардов (без шардов — основной БД) для hub."""
+    from app.core.sharding import shard_router
+
+    return OutboxTail(hub, shard_router.shards, poll_interval=config.CALENDAR_PUSH_POLL_INTERVAL)
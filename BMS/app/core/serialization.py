@@ -0,0 +1,112 @@
+"""
+Быстрая сериализация ответов.
+
+  - FastJSONResponse — ответ на orjson, класс ответа по умолчанию;
+  - compile_row_serializer — сериализатор строк Core (кортежей) в dict,
+    собранный один раз под фиксированный список колонок;
+  - rows_response — отдать готовые dict без валидации через Pydantic;
+  - ndjson_chunk / csv_chunk — пачки строк для потоковой выгрузки.
+
+Списочные эндпоинты выбирают колонки через select(Model.a, Model.b, ...)
+и сериализуют строки напрямую; схемы ответа (response_model) остаются
+для документации OpenAPI и одиночных объектов.
+"""
+import csv
+import enum
+import io
+import keyword
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+# Совпадает с выводом Pydantic: UTC как «Z», ключи-числа допустимы
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Сериализовать в JSON (bytes) с опциями приложения."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON-ответ на orjson (datetime, Enum и UUID без jsonable_encoder)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_response(content: Any, status_code: int = 200) -> FastJSONResponse:
+    """
+    Ответ из уже сериализуемых данных. Возврат Response из эндпоинта
+    отключает проверку по response_model, поэтому данные должны
+    совпадать со схемой — за это отвечают сериализаторы ниже.
+    """
+    return FastJSONResponse(content, status_code=status_code)
+
+
+# -------------------------------------------------------------------
+# Предкомпилированные сериализаторы строк
+# -------------------------------------------------------------------
+
+RowSerializer = Callable[[Sequence[Any]], Dict[str, Any]]
+
+
+def compile_row_serializer(fields: Sequence[str], name: str = "serialize_row") -> RowSerializer:
+    """
+    Собрать функцию row -> {"field": row[i], ...} для строк с колонками fields.
+    Код функции генерируется один раз, поэтому на строку остаётся
+    только построение словаря — без zip(), getattr() и валидации.
+    """
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field):
+            raise ValueError(f"Недопустимое имя поля: {field!r}")
+
+    items = ", ".join(f"{field!r}: row[{index}]" for index, field in enumerate(fields))
+    source = f"def {name}(row):\n    return {{{items}}}\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def group_rows(rows: Iterable[Sequence[Any]], serializer: RowSerializer, key_index: int = -1) -> Dict[Any, List[dict]]:
+    """
+    Сгруппировать дочерние строки по ключу (по умолчанию — последняя колонка,
+    например task_id) и сериализовать их. Ключ в вывод не попадает,
+    если serializer собран без него.
+    """
+    grouped: Dict[Any, List[dict]] = {}
+    for row in rows:
+        grouped.setdefault(row[key_index], []).append(serializer(row))
+    return grouped
+
+
+# -------------------------------------------------------------------
+# Потоковые форматы выгрузки
+# -------------------------------------------------------------------
+
+def ndjson_chunk(rows: Iterable[Sequence[Any]], serializer: RowSerializer) -> bytes:
+    """Пачка строк в NDJSON: по одному JSON-объекту на строку."""
+    return b"".join(dumps(serializer(row)) + b"\n" for row in rows)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunk(rows: Iterable[Sequence[Any]], header: Optional[Sequence[str]] = None) -> bytes:
+    """Пачка строк в CSV (UTF-8); header — заголовок для первой пачки."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header is not None:
+        writer.writerow(header)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,446 @@
+"""
+Шардирование данных команд.
+
+Задачи, комментарии, оценки, встречи (и их архивы) команды лежат
+на одном шарде. Основная БД — глобальный каталог: в ней живут
+users, teams и team_shards (номер шарда каждой команды).
+На шардах хранятся копии строк teams/users своих команд
+(справочные данные), чтобы соединения и внешние ключи работали
+локально; источник истины — каталог, копии обновляет sync_team().
+
+Задача или встреча лежит на шарде команды автора, поэтому с
+шардированием её исполнитель и участники — только из той же команды
+(check_same_team_users): на чужом шарде их нет даже справочными копиями,
+а их списки, календарь и проверка пересечений встреч читают свой шард.
+
+Если DB_SHARD_URLS не задан, шард один — основная БД,
+и зависимости ниже ведут себя как get_async_session/get_read_session.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.auth import current_active_user
+from app.core.config import settings
+from app.models.archive import CommentArchive, EvaluationArchive, TaskArchive
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.meeting import Meeting
+from app.models.task import Task
+from app.models.team import Team, TeamShard
+from app.models.user import User, meeting_participants_association
+
+
+class TeamMovingError(Exception):
+    """Команда сейчас переносится между шардами."""
+
+
+# -------------------------------------------------------------------
+# Маршрутизатор шардов
+# -------------------------------------------------------------------
+
+class ShardRouter:
+    """
+    Сопоставляет команде шард и выдаёт сессии на нём.
+    Новая команда размещается на шарде team_id % N при первом обращении,
+    размещение фиксируется в team_shards, поэтому добавление шардов
+    не перемещает существующие команды.
+    """
+
+    def __init__(
+        self,
+        directory: sessionmaker,
+        shards: Optional[List[sessionmaker]] = None,
+        placement_ttl: float = 30.0,
+    ):
+        self.directory = directory
+        self.shards = list(shards) if shards else [directory]
+        self.enabled = bool(shards)
+        self.placement_ttl = placement_ttl
+        # team_id → (номер шарда, заблокирована ли команда, момент чтения)
+        self._placement: Dict[int, Tuple[int, bool, float]] = {}
+
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        """Движки шардов (для инструментирования и health-проверок)."""
+        return [factory.kw["bind"] for factory in self.shards]
+
+    def shard_of(self, bind: Union[AsyncSession, AsyncEngine]) -> Optional[int]:
+        """
+        Номер шарда, с которым работает сессия (или движок); None — каталог.
+        Без шардирования база одна — всегда 0, как у shard_for_team.
+        """
+        if not self.enabled:
+            return 0
+        engine = bind.bind if isinstance(bind, AsyncSession) else bind
+        for index, shard_engine in enumerate(self.engines):
+            if engine is shard_engine:
+                return index
+        return None
+
+    def invalidate(self, team_id: Optional[int] = None) -> None:
+        """Сбросить закэшированное размещение одной команды или всех."""
+        if team_id is None:
+            self._placement.clear()
+        else:
+            self._placement.pop(team_id, None)
+
+    # --- Размещение ---
+
+    async def _load_placement(self, team_id: int) -> Tuple[int, bool]:
+        async with self.directory() as db:
+            row = (await db.execute(
+                select(TeamShard.shard, TeamShard.locked).where(TeamShard.team_id == team_id)
+            )).first()
+            if row is not None:
+                return row.shard, row.locked
+
+            shard = team_id % len(self.shards)
+            db.add(TeamShard(team_id=team_id, shard=shard, locked=False))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Размещение успел записать параллельный запрос
+                await db.rollback()
+                row = (await db.execute(
+                    select(TeamShard.shard, TeamShard.locked).where(TeamShard.team_id == team_id)
+                )).one()
+                return row.shard, row.locked
+            return shard, False
+
+    async def shard_for_team(self, team_id: Optional[int]) -> Optional[int]:
+        """
+        Номер шарда команды; None — пользователь без команды,
+        его запросы обслуживает каталог.
+        """
+        if team_id is None:
+            return None
+        if not self.enabled:
+            return 0
+
+        cached = self._placement.get(team_id)
+        if cached is not None and time.monotonic() - cached[2] < self.placement_ttl:
+            shard, locked = cached[0], cached[1]
+        else:
+            shard, locked = await self._load_placement(team_id)
+            self._placement[team_id] = (shard, locked, time.monotonic())
+
+        if locked:
+            raise TeamMovingError(team_id)
+        return shard
+
+    async def session_for_team(self, team_id: Optional[int]) -> AsyncSession:
+        """Новая сессия на шарде команды (без команды — на каталоге)."""
+        shard = await self.shard_for_team(team_id)
+        factory = self.directory if shard is None else self.shards[shard]
+        return factory()
+
+    # --- Справочные данные на шардах ---
+
+    async def sync_team(self, team_id: int) -> None:
+        """Обновить копии строк команды и её участников на шарде команды."""
+        if not self.enabled:
+            return
+        shard = await self.shard_for_team(team_id)
+        async with self.shards[shard]() as dst:
+            await self._copy_reference(dst, team_id)
+            await dst.commit()
+
+    async def _copy_reference(self, dst: AsyncSession, team_id: int, extra_user_ids: Iterable[int] = ()) -> None:
+        async with self.directory() as src:
+            team = (await src.execute(
+                select(Team.__table__).where(Team.id == team_id)
+            )).mappings().first()
+            if team is None:
+                return
+            users = (await src.execute(
+                select(User.__table__).where(
+                    (User.team_id == team_id) |
+                    (User.id == team["admin_id"]) |
+                    (User.id.in_(list(extra_user_ids)))
+                )
+            )).mappings().all()
+
+        # teams.admin_id и users.team_id ссылаются друг на друга:
+        # сначала пользователи без команды, затем команда, затем привязка
+        for row in users:
+            await _upsert(dst, User.__table__, {**row, "team_id": None})
+        await _upsert(dst, Team.__table__, dict(team))
+
+        member_ids = [row["id"] for row in users if row["team_id"] == team_id]
+        await dst.execute(
+            update(User).where(User.team_id == team_id, User.id.not_in(member_ids)).values(team_id=None)
+        )
+        if member_ids:
+            await dst.execute(update(User).where(User.id.in_(member_ids)).values(team_id=team_id))
+
+    # --- Перенос команды ---
+
+    async def _set_locked(self, team_id: int, locked: bool, shard: Optional[int] = None) -> None:
+        values = {"locked": locked}
+        if shard is not None:
+            values["shard"] = shard
+        async with self.directory() as db:
+            await db.execute(update(TeamShard).where(TeamShard.team_id == team_id).values(**values))
+            await db.commit()
+        self.invalidate(team_id)
+
+    async def move_team(self, team_id: int, target: int) -> int:
+        """
+        Перенести данные команды на шард target. Возвращает число задач.
+
+        Порядок: команда блокируется (запросы к её данным получают 503),
+        затем выдерживается placement_ttl, чтобы все процессы увидели блокировку;
+        строки копируются на target одной транзакцией, удаляются с исходного
+        шарда, каталог переключается и блокировка снимается.
+        Повторный запуск после сбоя безопасен: копирование идемпотентно.
+        """
+        if not self.enabled:
+            raise RuntimeError("Шардирование выключено: DB_SHARD_URLS не задан")
+        if not 0 <= target < len(self.shards):
+            raise ValueError(f"Нет шарда с номером {target}")
+
+        await self._load_placement(team_id)
+        async with self.directory() as db:
+            source = (await db.execute(
+                select(TeamShard.shard).where(TeamShard.team_id == team_id)
+            )).scalar_one()
+            member_ids = list((await db.execute(
+                select(User.id).where(User.team_id == team_id)
+            )).scalars())
+        if source == target:
+            return 0
+
+        await self._set_locked(team_id, True)
+        await asyncio.sleep(self.placement_ttl)
+
+        async with self.shards[source]() as src, self.shards[target]() as dst:
+            plan = await _team_rows(src, member_ids)
+            user_ids = {
+                value
+                for table, rows in plan
+                for row in rows
+                for key, value in row.items()
+                if key in _USER_COLUMNS and value is not None
+            }
+            await self._copy_reference(dst, team_id, user_ids)
+
+            for table, rows in plan:
+                if not rows:
+                    continue
+                if "id" not in rows[0]:
+                    # Участники встреч: ключ составной, просто заменяем набор
+                    await dst.execute(delete(table).where(
+                        table.c.meeting_id.in_({row["meeting_id"] for row in rows})
+                    ))
+                    await dst.execute(insert(table), rows)
+                    continue
+                ids = [row["id"] for row in rows]
+                # Строки с теми же id на target — копия прошлой прерванной попытки
+                # либо конфликт последовательностей, который нельзя молча затереть
+                clash = (await dst.execute(select(table.c.id).where(table.c.id.in_(ids)))).scalars().all()
+                if clash and not await _same_rows(dst, table, rows, clash):
+                    raise RuntimeError(
+                        f"{table.name}: id {sorted(clash)[:10]} уже заняты на шарде {target}"
+                    )
+                if clash:
+                    await dst.execute(delete(table).where(table.c.id.in_(clash)))
+                await dst.execute(insert(table), rows)
+            await dst.commit()
+
+            for table, rows in reversed(plan):
+                if not rows:
+                    continue
+                if "id" in rows[0]:
+                    await src.execute(delete(table).where(table.c.id.in_([row["id"] for row in rows])))
+                else:
+                    meeting_ids = {row["meeting_id"] for row in rows}
+                    await src.execute(delete(table).where(table.c.meeting_id.in_(meeting_ids)))
+            await src.commit()
+
+        await self._set_locked(team_id, False, shard=target)
+        return len(plan[0][1])
+
+
+# Колонки со ссылками на пользователей в переносимых таблицах
+_USER_COLUMNS = frozenset({"creator_id", "assignee_id", "author_id", "evaluator_id", "user_id"})
+
+
+async def _upsert(db: AsyncSession, table, row: dict) -> None:
+    result = await db.execute(update(table).where(table.c.id == row["id"]).values(**row))
+    if not result.rowcount:
+        await db.execute(insert(table).values(**row))
+
+
+async def _same_rows(db: AsyncSession, table, rows: List[dict], ids: List[int]) -> bool:
+    """Совпадают ли строки на шарде с переносимыми (повтор после сбоя)."""
+    existing = {
+        row["id"]: dict(row)
+        for row in (await db.execute(select(table).where(table.c.id.in_(ids)))).mappings()
+    }
+    return all(existing[row["id"]] == dict(row) for row in rows if row["id"] in existing)
+
+
+async def _team_rows(db: AsyncSession, member_ids: List[int]) -> List[Tuple[object, List[dict]]]:
+    """
+    Строки команды на шарде в порядке вставки (родители раньше детей).
+    Команде принадлежат задачи и встречи, созданные её участниками.
+    """
+    async def rows(stmt) -> List[dict]:
+        return [dict(row) for row in (await db.execute(stmt)).mappings()]
+
+    tasks = await rows(select(Task.__table__).where(Task.creator_id.in_(member_ids)))
+    task_ids = [row["id"] for row in tasks]
+    archived = await rows(select(TaskArchive.__table__).where(TaskArchive.creator_id.in_(member_ids)))
+    archived_ids = [row["id"] for row in archived]
+    meetings = await rows(select(Meeting.__table__).where(Meeting.creator_id.in_(member_ids)))
+    meeting_ids = [row["id"] for row in meetings]
+
+    return [
+        (Task.__table__, tasks),
+        (Comment.__table__, await rows(select(Comment.__table__).where(Comment.task_id.in_(task_ids)))),
+        (Evaluation.__table__, await rows(select(Evaluation.__table__).where(Evaluation.task_id.in_(task_ids)))),
+        (TaskArchive.__table__, archived),
+        (CommentArchive.__table__, await rows(
+            select(CommentArchive.__table__).where(CommentArchive.task_id.in_(archived_ids))
+        )),
+        (EvaluationArchive.__table__, await rows(
+            select(EvaluationArchive.__table__).where(EvaluationArchive.task_id.in_(archived_ids))
+        )),
+        (Meeting.__table__, meetings),
+        (meeting_participants_association, await rows(
+            select(meeting_participants_association).where(
+                meeting_participants_association.c.meeting_id.in_(meeting_ids)
+            )
+        )),
+    ]
+
+
+# -------------------------------------------------------------------
+# Инициализация
+# -------------------------------------------------------------------
+
+def build_shard_router(config=settings) -> ShardRouter:
+    """Маршрутизатор по DB_SHARD_URLS; без шардов — только основная БД."""
+    urls = config.DATABASE_URLS_shards
+    if not urls:
+        return ShardRouter(database.AsyncSessionLocal, placement_ttl=config.DB_SHARD_PLACEMENT_TTL)
+
+    profile = database.get_engine_profile(config)
+    shards = [
+        sessionmaker(bind=database.create_db_engine(url, profile), class_=AsyncSession, expire_on_commit=False)
+        for url in urls
+    ]
+    return ShardRouter(database.AsyncSessionLocal, shards, placement_ttl=config.DB_SHARD_PLACEMENT_TTL)
+
+
+shard_router = build_shard_router()
+
+
+def shard_of(bind: Union[AsyncSession, AsyncEngine]) -> Optional[int]:
+    """Номер шарда сессии для ключей entity_cache (см. ShardRouter.shard_of)."""
+    return shard_router.shard_of(bind)
+
+
+# -------------------------------------------------------------------
+# Пользователи из других команд
+# -------------------------------------------------------------------
+
+async def check_same_team_users(current_user: User, user_ids: Iterable[Optional[int]]) -> None:
+    """
+    С шардированием — убедиться, что пользователи user_ids (участники
+    встречи, исполнитель задачи) состоят в команде current_user.
+    Пользователи ищутся в каталоге: 404, если кого-то нет, 400 — если
+    кто-то из другой команды. Без шардирования ничего не проверяет.
+    """
+    if not shard_router.enabled:
+        return
+    ids = {user_id for user_id in user_ids if user_id is not None} - {current_user.id}
+    if not ids:
+        return
+
+    async with shard_router.directory() as db:
+        teams = dict((await db.execute(select(User.id, User.team_id).where(User.id.in_(ids)))).all())
+    if len(teams) != len(ids):
+        raise HTTPException(status_code=404, detail="Один или несколько пользователей не найдены")
+    foreign = sorted(user_id for user_id, team_id in teams.items() if team_id != current_user.team_id)
+    if foreign:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Пользователи с ID {', '.join(map(str, foreign))} не из вашей команды",
+        )
+
+
+# -------------------------------------------------------------------
+# Зависимости FastAPI
+# -------------------------------------------------------------------
+
+async def _team_session(team_id: Optional[int]) -> AsyncSession:
+    try:
+        return await shard_router.session_for_team(team_id)
+    except TeamMovingError:
+        raise HTTPException(status_code=503, detail="Данные команды переносятся, повторите запрос позже")
+
+
+async def get_team_session(current_user: User = Depends(current_active_user)) -> AsyncSession:
+    """Сессия на шарде команды текущего пользователя (для записи)."""
+    if not shard_router.enabled:
+        async with database.AsyncSessionLocal() as session:
+            yield session
+        return
+
+    async with await _team_session(current_user.team_id) as session:
+        yield session
+
+
+async def get_team_read_session(
+    request: Request,
+    current_user: User = Depends(current_active_user),
+) -> AsyncSession:
+    """
+    Сессия для чтения данных команды. Без шардирования —
+    реплика или основная БД по правилам get_read_session.
+    """
+    if not shard_router.enabled:
+        factory = database.AsyncSessionLocal if database.wants_primary(request) else database.ReplicaSessionLocal
+        async with factory() as session:
+            yield session
+        return
+
+    async with await _team_session(current_user.team_id) as session:
+        yield session
+
+
+# --- Длинные чтения (стриминг) ---
+# Зависимости с yield закрывают сессию до отправки тела StreamingResponse,
+# поэтому генератор ответа открывает сессии сам через эти фабрики.
+
+SessionFactoriesResolver = Callable[[Optional[int]], Awaitable[List[sessionmaker]]]
+
+
+async def read_session_factories(team_id: Optional[int]) -> List[sessionmaker]:
+    """
+    Фабрики сессий для чтения данных команды (None — всех команд).
+    Без шардирования — реплика; с шардированием — шард команды или все шарды.
+    """
+    if not shard_router.enabled:
+        return [database.ReplicaSessionLocal]
+    if team_id is None:
+        return list(shard_router.shards)
+    try:
+        shard = await shard_router.shard_for_team(team_id)
+    except TeamMovingError:
+        raise HTTPException(status_code=503, detail="Данные команды переносятся, повторите запрос позже")
+    return [shard_router.shards[shard]]
+
+
+def get_read_session_factories() -> SessionFactoriesResolver:
+    """Зависимость: функция подбора фабрик сессий для стриминговых эндпоинтов."""
+    return read_session_factories
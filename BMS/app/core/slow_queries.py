@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.sql_stats import statement_shape
+from app.models.slow_query import SlowQuery
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------------------
+# Контекст: маршрут текущего запроса и флаг «пишем журнал»
+# -------------------------------------------------------------------
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+_recording: ContextVar[bool] = ContextVar("slow_query_recording", default=False)
+
+# Фоновые задачи записи (держим ссылки, чтобы их не собрал GC)
+_pending: Set[asyncio.Task] = set()
+
+
+def bind_request_scope(scope: dict) -> None:
+    """Запомнить scope запроса, чтобы записи журнала знали свой маршрут."""
+    _request_scope.set(scope)
+
+
+def current_route() -> Optional[str]:
+    """Метод и шаблон маршрута текущего запроса, если он известен."""
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope.get('method')} {getattr(route, 'path', scope.get('path'))}"
+
+
+def redact_parameters(parameters: Any) -> Optional[str]:
+    """Заменить значения параметров их типами — в журнал не попадают данные."""
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        redacted: Any = {key: type(value).__name__ for key, value in parameters.items()}
+    elif isinstance(parameters, (list, tuple)):
+        redacted = [type(value).__name__ for value in parameters]
+    else:
+        redacted = type(parameters).__name__
+    return json.dumps(redacted, ensure_ascii=False)
+
+
+# -------------------------------------------------------------------
+# Запись в журнал
+# -------------------------------------------------------------------
+
+async def _persist(session_factory, async_engine: AsyncEngine, record: dict, explain_args) -> None:
+    """Снять план (если нужно) и сохранить запись. Собственные запросы не журналируются."""
+    _recording.set(True)
+    try:
+        if explain_args is not None:
+            statement, parameters = explain_args
+            async with async_engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                record["explain"] = "\n".join(row[0] for row in result)
+                # ANALYZE действительно выполняет запрос — ничего не фиксируем
+                await conn.rollback()
+
+        async with session_factory() as session:
+            session.add(SlowQuery(**record))
+            await session.commit()
+    except Exception:
+        logger.exception("Не удалось сохранить запись журнала медленных запросов")
+
+
+async def drain_pending() -> None:
+    """Дождаться фоновых записей журнала (тесты, остановка приложения)."""
+    if _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
+
+
+def install_slow_query_log(async_engine: AsyncEngine, session_factory) -> None:
+    """
+    Подключить журнал медленных запросов к движку.
+    Запросы дольше SLOW_QUERY_MS сохраняются в таблицу slow_queries;
+    для доли SLOW_QUERY_EXPLAIN_SAMPLE SELECT-запросов на PostgreSQL
+    дополнительно асинхронно снимается EXPLAIN (ANALYZE, BUFFERS).
+    """
+    sync_engine = async_engine.sync_engine
+    is_postgres = sync_engine.dialect.name == "postgresql"
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if duration_ms < settings.SLOW_QUERY_MS or _recording.get():
+            return
+
+        record = {
+            "duration_ms": round(duration_ms, 3),
+            "route": current_route(),
+            "statement": statement_shape(statement),
+            "parameters": redact_parameters(parameters),
+        }
+        explain_args = None
+        if (
+            is_postgres
+            and not executemany
+            and statement.lstrip().upper().startswith("SELECT")
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE
+        ):
+            explain_args = (statement, parameters)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(_persist(session_factory, async_engine, record, explain_args))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("slow_query_start"):
+            conn.info["slow_query_start"].pop()
+
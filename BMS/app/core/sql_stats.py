@@ -0,0 +1,98 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# -------------------------------------------------------------------
+# Статистика SQL-запросов в рамках одного HTTP-запроса
+# -------------------------------------------------------------------
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    «Форма» выражения: SQL без лишних пробелов.
+    Параметры уже вынесены драйвером в плейсхолдеры,
+    поэтому одинаковые запросы с разными значениями совпадают.
+    """
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class RequestSqlStats:
+    """Счётчики SQL-выражений, выполненных в рамках одного запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """Формы, выполненные не менее threshold раз (кандидаты в N+1)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing."""
+        top = self.shapes.most_common(1)
+        max_repeat = top[0][1] if top else 0
+        return (
+            f'db;dur={self.total_ms:.2f};desc="queries={self.count}", '
+            f'dbrepeat;desc="max_same_shape={max_repeat}"'
+        )
+
+
+_current_stats: ContextVar[Optional[RequestSqlStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def start_request_stats() -> RequestSqlStats:
+    """Начать сбор статистики для текущего контекста (запроса)."""
+    stats = RequestSqlStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def get_request_stats() -> Optional[RequestSqlStats]:
+    """Статистика текущего запроса или None вне запроса."""
+    return _current_stats.get()
+
+
+# -------------------------------------------------------------------
+# Хуки движка
+# -------------------------------------------------------------------
+
+_instrumented = set()
+
+
+def instrument_engine(async_engine: AsyncEngine) -> None:
+    """Подключить учёт выражений к движку (повторный вызов безопасен)."""
+    sync_engine = async_engine.sync_engine
+    if id(sync_engine) in _instrumented:
+        return
+    _instrumented.add(id(sync_engine))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["sql_stats_start"].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("sql_stats_start"):
+            conn.info["sql_stats_start"].pop()
@@ -0,0 +1,118 @@
+"""
+Прогрев воркера до приёма трафика и освобождение пулов при остановке.
+
+Uvicorn начинает принимать соединения только после startup в lifespan,
+поэтому всё, что сделано здесь, не достаётся первым запросам:
+  - пул каждого движка (основная БД, реплика, шарды) открывает
+    SERVER_WARMUP_CONNECTIONS соединений — без TCP/TLS-рукопожатия
+    и аутентификации на горячем пути;
+  - на каждом из них выполняются горячие запросы чтения: SQLAlchemy
+    компилирует и кэширует их, asyncpg готовит (PREPARE) выражения
+    в кэше своего соединения.
+
+При остановке dispose_engines() закрывает соединения всех пулов, чтобы
+они не висели на стороне PostgreSQL до таймаута после SIGTERM.
+"""
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from datetime import date
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+Query = Callable[[AsyncSession], Awaitable[object]]
+
+
+# -------------------------------------------------------------------
+# Горячие запросы
+# -------------------------------------------------------------------
+
+def hot_queries() -> List[Query]:
+    """
+    Запросы самых частых эндпоинтов (пользователь по id, списки задач
+    и встреч, их версии для ETag, календарь). Несуществующие id — важна
+    подготовка выражения, а не данные.
+    """
+    from app.models.user import User
+    from app.utils import read_queries
+
+    return [
+        lambda db: db.execute(select(User).where(User.id == 0)),
+        lambda db: read_queries.fetch_user_tasks(db, 0),
+        lambda db: read_queries.fetch_tasks_version(db, 0),
+        lambda db: read_queries.fetch_user_meetings(db, 0),
+        lambda db: read_queries.fetch_meetings_version(db, 0),
+        lambda db: read_queries.fetch_user_meetings_for_date(db, 0, date.today()),
+        lambda db: read_queries.fetch_team_tasks_for_date(db, 0, date.today()),
+    ]
+
+
+# -------------------------------------------------------------------
+# Прогрев и освобождение пулов
+# -------------------------------------------------------------------
+
+def app_engines() -> List[AsyncEngine]:
+    """Движки приложения без повторов: основная БД, реплика, шарды."""
+    from app.core.database import engine, replica_engine
+    from app.core.sharding import shard_router
+
+    engines: List[AsyncEngine] = []
+    for candidate in (engine, replica_engine, *shard_router.engines):
+        if all(candidate is not seen for seen in engines):
+            engines.append(candidate)
+    return engines
+
+
+async def warm_engine(async_engine: AsyncEngine, connections: int, queries: Sequence[Query]) -> int:
+    """
+    Открыть до connections соединений одновременно (не больше размера
+    пула) и выполнить на каждом queries. Возвращает число соединений.
+    """
+    size = getattr(async_engine.sync_engine.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    else:
+        # StaticPool/NullPool: держать несколько соединений нет смысла
+        connections = min(connections, 1)
+
+    async with AsyncExitStack() as stack:
+        opened = [await stack.enter_async_context(async_engine.connect()) for _ in range(connections)]
+        for connection in opened:
+            db = await stack.enter_async_context(AsyncSession(bind=connection))
+            for query in queries:
+                await query(db)
+            await db.rollback()
+    return connections
+
+
+async def warm_up(config=settings, engines: Optional[Sequence[AsyncEngine]] = None) -> int:
+    """
+    Прогреть пулы всех движков за SERVER_WARMUP_TIMEOUT секунд.
+    Ошибка или таймаут не мешают старту: воркер просто начнёт работу
+    с холодным пулом. Возвращает число прогретых соединений.
+    """
+    engines = app_engines() if engines is None else engines
+    queries = hot_queries()
+    try:
+        warmed = await asyncio.wait_for(
+            asyncio.gather(*(warm_engine(e, config.SERVER_WARMUP_CONNECTIONS, queries) for e in engines)),
+            config.SERVER_WARMUP_TIMEOUT,
+        )
+    except Exception as exc:
+        logger.warning("warm-up: пулы не прогреты: %r", exc)
+        return 0
+    logger.info("warm-up: открыто %d соединений, %d запросов на каждом", sum(warmed), len(queries))
+    return sum(warmed)
+
+
+async def dispose_engines(engines: Optional[Sequence[AsyncEngine]] = None) -> None:
+    """Закрыть соединения пулов всех движков (остановка воркера)."""
+    for async_engine in app_engines() if engines is None else engines:
+        await async_engine.dispose()
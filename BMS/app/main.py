@@ -1,30 +1,199 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
-from app.routers.auth import router as auth_router
-from app.routers.meetings import router as meetings_router
-from app.routers.tasks import router as tasks_router
-from app.routers.teams import router as teams_router
-from app.routers.calendar import router as calendar_router
-from app.routers.profile import router as users_router
-from app.admin import setup_admin
+from app.core.serialization import FastJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Старт и остановка воркера:
+      - прогрев пулов БД до приёма трафика (SERVER_WARMUP, app/core/warmup.py);
+      - замер задержки цикла событий для /readyz;
+      - диспетчер outbox, если OUTBOX_DISPATCHER_IN_APP (иначе он работает
+        отдельным процессом python -m app.utils.outbox_worker);
+      - чтение outbox для push-канала календаря (CALENDAR_PUSH_ENABLED);
+      - при остановке — закрытие соединений всех пулов и пометка
+        воркера завершённым для multiprocess-метрик.
+    """
+    from app.core.health import LoopLagMonitor
+    from app.core.warmup import dispose_engines, warm_up
+
+    config = app.state.config
+    if config.SERVER_WARMUP:
+        await warm_up(config)
+
+    loop_monitor = app.state.loop_monitor = LoopLagMonitor(config.HEALTH_LOOP_LAG_INTERVAL)
+    loop_monitor.start()
+
+    dispatcher = dispatcher_task = calendar_tail = None
+    if config.OUTBOX_DISPATCHER_IN_APP:
+        from app.core.outbox import build_dispatcher
+
+        dispatcher = app.state.dispatcher = build_dispatcher(config)
+        dispatcher_task = asyncio.create_task(dispatcher.run())
+    if config.CALENDAR_PUSH_ENABLED:
+        from app.core.push import build_outbox_tail
+
+        calendar_tail = build_outbox_tail(config=config)
+        calendar_tail.start()
+
+    yield
+
+    if calendar_tail is not None:
+        from app.core.push import calendar_hub
+
+        await calendar_tail.stop()
+        await calendar_hub.close_all()
+    if dispatcher is not None:
+        dispatcher.stop()
+        await dispatcher_task
+    await loop_monitor.stop()
+    await dispose_engines()
+    if config.METRICS_ENABLED:
+        from app.core.metrics import mark_worker_stopped
+
+        mark_worker_stopped()
+
+
+# -------------------------------------------------------------------
+# Админка: сборка при первом обращении
+# -------------------------------------------------------------------
+
+class LazyAdminApp:
+    """
+    ASGI-приложение на /admin, которое собирает sqladmin при первом запросе
+    (или первом url_for("admin:...")). Импорт sqladmin, WTForms, Jinja-шаблонов
+    и представлений моделей не входит во время старта воркера.
+    """
+
+    def __init__(self):
+        self._app = None
+
+    def load(self):
+        """Собрать админку сейчас (если ещё не собрана) и вернуть её ASGI-приложение."""
+        if self._app is None:
+            from starlette.applications import Starlette
+
+            from app.admin import setup_admin
+
+            # Admin монтирует себя в переданное приложение; нам нужно только
+            # его внутреннее ASGI-приложение
+            self._app = setup_admin(Starlette()).admin
+        return self._app
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    @property
+    def routes(self):
+        # Mount("/admin").routes — по ним строятся url_for("admin:...")
+        return self.load().routes
+
+    async def __call__(self, scope, receive, send):
+        await self.load()(scope, receive, send)
+
+
+# -------------------------------------------------------------------
+# Фабрика приложения
+# -------------------------------------------------------------------
+
+def create_app(config=settings) -> FastAPI:
+    """
+    Собрать приложение по настройкам. Инструментация импортируется и
+    подключается, только если включена; админка монтируется по
+    ADMIN_ENABLED (по умолчанию — везде, кроме MODE=PROD) и собирается
+    лениво (LazyAdminApp). Для uvicorn --factory: app.main:create_app.
+    """
+    from app.core.middleware import ReadYourWritesMiddleware
+
+    app = FastAPI(
+        title="Business Management System",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
+    )
+    app.state.config = config
+
+    # Чтения после записи — с основной БД (см. get_read_session)
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    # Счётчик SQL-выражений на запрос и заголовок Server-Timing
+    if config.SQL_STATS_ENABLED:
+        from app.core.database import engine, replica_engine
+        from app.core.middleware import SqlStatsMiddleware
+        from app.core.sharding import shard_router
+        from app.core.sql_stats import instrument_engine
+
+        instrument_engine(engine)
+        instrument_engine(replica_engine)
+        for shard_engine in shard_router.engines:
+            instrument_engine(shard_engine)
+        app.add_middleware(SqlStatsMiddleware)
+
+    # Журнал медленных запросов с выборочным EXPLAIN (см. админку)
+    if config.SLOW_QUERY_LOG_ENABLED:
+        from app.core.database import AsyncSessionLocal, engine, replica_engine
+        from app.core.middleware import SlowQueryContextMiddleware
+        from app.core.sharding import shard_router
+        from app.core.slow_queries import install_slow_query_log
+
+        install_slow_query_log(engine, AsyncSessionLocal)
+        if replica_engine is not engine:
+            install_slow_query_log(replica_engine, AsyncSessionLocal)
+        for shard_engine in shard_router.engines:
+            if shard_engine is not engine:
+                install_slow_query_log(shard_engine, AsyncSessionLocal)
+        app.add_middleware(SlowQueryContextMiddleware)
+
+    # Метрики Prometheus
+    if config.METRICS_ENABLED:
+        from fastapi import Response
+        from prometheus_client import CONTENT_TYPE_LATEST
+
+        from app.core.metrics import render_metrics
+        from app.core.middleware import MetricsMiddleware
+
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+    # Подключаем роутеры
+    from app.routers.auth import router as auth_router
+    from app.routers.meetings import router as meetings_router
+    from app.routers.tasks import router as tasks_router
+    from app.routers.teams import router as teams_router
+    from app.routers.calendar import router as calendar_router
+    from app.routers.profile import router as users_router
+    from app.routers.export import router as export_router
+    from app.routers.imports import router as import_router
+    from app.routers.health import router as health_router
 
+    app.include_router(auth_router)
+    app.include_router(meetings_router)
+    app.include_router(tasks_router)
+    app.include_router(teams_router)
+    app.include_router(calendar_router)
+    app.include_router(users_router)
+    app.include_router(export_router)
+    app.include_router(import_router)
+    app.include_router(health_router)
 
-app = FastAPI(title="Business Management System")
+    # Админка
+    if config.ADMIN_ENABLED_effective:
+        app.state.admin = LazyAdminApp()
+        app.mount("/admin", app.state.admin, name="admin")
 
-# Подключаем роутеры
-app.include_router(auth_router)
-app.include_router(meetings_router)
-app.include_router(tasks_router)
-app.include_router(teams_router)
-app.include_router(calendar_router)
-app.include_router(users_router)
+    @app.get("/")
+    async def root():
+        return {"message": "Welcome to the Business Management System API"}
 
-# Настройка админки
-setup_admin(app)
+    return app
 
 
-@app.get("/")
-async def root():
-    return {"message": "Welcome to the Business Management System API"}
+app = create_app()
@@ -7,7 +7,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import user, task, team, evaluation, meeting, comment
+from app.models import user, task, team, evaluation, meeting, comment, slow_query, archive, outbox
 
 
 config = context.config
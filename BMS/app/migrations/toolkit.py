@@ -0,0 +1,227 @@
+"""
+Помощники для миграций без простоя.
+
+  - create_index_concurrently / drop_index_concurrently —
+    CREATE/DROP INDEX CONCURRENTLY вне транзакции (на PostgreSQL),
+    с удалением «битого» индекса после прерванной сборки;
+  - lock_timeout — ограничение ожидания блокировок для DDL,
+    чтобы миграция падала, а не вставала в очередь за долгой транзакцией;
+  - batched_backfill — заполнение колонки пачками по диапазонам PK
+    с паузами между пачками и контрольными точками для продолжения.
+
+Пример в ревизии Alembic:
+
+    from app.migrations.toolkit import batched_backfill, create_index_concurrently, lock_timeout
+
+    def upgrade():
+        with lock_timeout("3s"):
+            op.add_column("tasks", sa.Column("team_id", sa.Integer(), nullable=True))
+        batched_backfill(
+            "tasks", "team_id = (SELECT team_id FROM users WHERE users.id = tasks.creator_id)",
+            checkpoint="tasks_team_id",
+        )
+        create_index_concurrently("ix_tasks_team_id", "tasks", ["team_id"])
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.engine import Connection
+
+
+logger = logging.getLogger("alembic.toolkit")
+
+CHECKPOINT_TABLE = "migration_checkpoints"
+
+
+def _is_postgres(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+# -------------------------------------------------------------------
+# Ограничение ожидания блокировок
+# -------------------------------------------------------------------
+
+@contextmanager
+def lock_timeout(timeout: str = "5s", statement_timeout: Optional[str] = None) -> Iterator[None]:
+    """
+    Установить lock_timeout (и опционально statement_timeout) на время блока.
+    Если ALTER TABLE не может взять блокировку за timeout, миграция падает
+    вместо того, чтобы блокировать все запросы к таблице за собой.
+    """
+    conn = op.get_bind()
+    if not _is_postgres(conn):
+        yield
+        return
+
+    conn.execute(sa.text(f"SET lock_timeout = '{timeout}'"))
+    if statement_timeout:
+        conn.execute(sa.text(f"SET statement_timeout = '{statement_timeout}'"))
+    try:
+        yield
+    finally:
+        conn.execute(sa.text("RESET lock_timeout"))
+        if statement_timeout:
+            conn.execute(sa.text("RESET statement_timeout"))
+
+
+# -------------------------------------------------------------------
+# Индексы
+# -------------------------------------------------------------------
+
+def _drop_invalid_index(conn: Connection, name: str) -> None:
+    """Прерванный CREATE INDEX CONCURRENTLY оставляет INVALID-индекс — удаляем его."""
+    invalid = conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        logger.warning("Удаляю невалидный индекс %s после прерванной сборки", name)
+        conn.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: List[str],
+    unique: bool = False,
+    lock_wait: str = "5s",
+    **kwargs,
+) -> None:
+    """
+    Создать индекс, не блокируя запись в таблицу.
+    На PostgreSQL — CONCURRENTLY в autocommit-блоке, на остальных СУБД — обычный индекс.
+    """
+    conn = op.get_bind()
+    if not _is_postgres(conn):
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True, **kwargs)
+        return
+
+    with op.get_context().autocommit_block():
+        _drop_invalid_index(conn, name)
+        conn.execute(sa.text(f"SET lock_timeout = '{lock_wait}'"))
+        try:
+            op.create_index(
+                name, table, columns, unique=unique,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs,
+            )
+        finally:
+            conn.execute(sa.text("RESET lock_timeout"))
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    """Удалить индекс без блокировки таблицы (PostgreSQL) или обычным DROP."""
+    conn = op.get_bind()
+    if not _is_postgres(conn):
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+# -------------------------------------------------------------------
+# Пакетное заполнение колонок
+# -------------------------------------------------------------------
+
+def _ensure_checkpoint_table(conn: Connection) -> None:
+    conn.execute(sa.text(
+        f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+        "name VARCHAR(200) PRIMARY KEY, "
+        "last_id BIGINT NOT NULL, "
+        "done BOOLEAN NOT NULL DEFAULT FALSE)"
+    ))
+
+
+def _load_checkpoint(conn: Connection, name: str):
+    return conn.execute(
+        sa.text(f"SELECT last_id, done FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+        {"name": name},
+    ).first()
+
+
+def _save_checkpoint(conn: Connection, name: str, last_id: int, done: bool = False) -> None:
+    updated = conn.execute(
+        sa.text(f"UPDATE {CHECKPOINT_TABLE} SET last_id = :last_id, done = :done WHERE name = :name"),
+        {"name": name, "last_id": last_id, "done": done},
+    )
+    if updated.rowcount == 0:
+        conn.execute(
+            sa.text(f"INSERT INTO {CHECKPOINT_TABLE} (name, last_id, done) VALUES (:name, :last_id, :done)"),
+            {"name": name, "last_id": last_id, "done": done},
+        )
+
+
+def batched_backfill(
+    table: str,
+    set_clause: str,
+    checkpoint: str,
+    where: Optional[str] = None,
+    batch_size: int = 5000,
+    pause: float = 0.05,
+    pk: str = "id",
+    lock_wait: str = "2s",
+    conn: Optional[Connection] = None,
+) -> int:
+    """
+    Выполнить UPDATE table SET <set_clause> пачками по диапазонам первичного ключа.
+
+    Каждая пачка — отдельная короткая транзакция (autocommit), между пачками —
+    пауза pause секунд, чтобы не забивать WAL и реплики. После каждой пачки
+    в migration_checkpoints сохраняется последний обработанный id, поэтому
+    прерванная миграция продолжит с того же места. Выражение set_clause должно
+    быть идемпотентным: пачка, прерванная до записи контрольной точки, выполнится
+    повторно. При явной передаче conn он должен быть в режиме autocommit.
+    Возвращает число изменённых строк.
+    """
+    if conn is None:
+        conn = op.get_bind()
+        with op.get_context().autocommit_block():
+            return _run_backfill(conn, table, set_clause, checkpoint, where, batch_size, pause, pk, lock_wait)
+    return _run_backfill(conn, table, set_clause, checkpoint, where, batch_size, pause, pk, lock_wait)
+
+
+def _run_backfill(conn, table, set_clause, checkpoint, where, batch_size, pause, pk, lock_wait) -> int:
+    _ensure_checkpoint_table(conn)
+    state = _load_checkpoint(conn, checkpoint)
+    if state is not None and state.done:
+        logger.info("Backfill %s уже завершён", checkpoint)
+        return 0
+
+    max_id = conn.execute(sa.text(f"SELECT MAX({pk}) FROM {table}")).scalar()
+    if max_id is None:
+        _save_checkpoint(conn, checkpoint, 0, done=True)
+        return 0
+
+    last_id = state.last_id if state is not None else 0
+    extra = f" AND ({where})" if where else ""
+    statement = sa.text(
+        f"UPDATE {table} SET {set_clause} WHERE {pk} > :lo AND {pk} <= :hi{extra}"
+    )
+    if _is_postgres(conn):
+        conn.execute(sa.text(f"SET lock_timeout = '{lock_wait}'"))
+
+    total = 0
+    started = time.monotonic()
+    try:
+        while last_id < max_id:
+            hi = min(last_id + batch_size, max_id)
+            total += conn.execute(statement, {"lo": last_id, "hi": hi}).rowcount or 0
+            last_id = hi
+            _save_checkpoint(conn, checkpoint, last_id, done=last_id >= max_id)
+            logger.info(
+                "Backfill %s: %d/%d (%.0f%%), обновлено %d строк за %.1f с",
+                checkpoint, last_id, max_id, 100 * last_id / max_id, total, time.monotonic() - started,
+            )
+            if pause and last_id < max_id:
+                time.sleep(pause)
+    finally:
+        if _is_postgres(conn):
+            conn.execute(sa.text("RESET lock_timeout"))
+    return total
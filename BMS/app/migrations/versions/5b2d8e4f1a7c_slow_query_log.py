@@ -0,0 +1,39 @@
+"""slow query log
+
+Revision ID: 5b2d8e4f1a7c
+Revises: 312ef7dc165d
+Create Date: 2026-10-19 10:12:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2d8e4f1a7c'
+down_revision: Union[str, None] = '312ef7dc165d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('slow_queries',
+        sa.Column('id', sa.Integer(), nullable=False, comment='Уникальный идентификатор записи'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Время выполнения запроса'),
+        sa.Column('duration_ms', sa.Float(), nullable=False, comment='Длительность выполнения, мс'),
+        sa.Column('route', sa.String(length=300), nullable=True, comment='HTTP-маршрут, из которого выполнен запрос'),
+        sa.Column('statement', sa.Text(), nullable=False, comment='SQL с плейсхолдерами вместо значений'),
+        sa.Column('parameters', sa.Text(), nullable=True, comment='Типы параметров без самих значений'),
+        sa.Column('explain', sa.Text(), nullable=True, comment='Вывод EXPLAIN (ANALYZE, BUFFERS), если снимался'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_slow_queries_id'), 'slow_queries', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_slow_queries_id'), table_name='slow_queries')
+    op.drop_table('slow_queries')
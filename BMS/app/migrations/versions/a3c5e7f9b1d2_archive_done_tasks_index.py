@@ -0,0 +1,33 @@
+"""archive done tasks index
+
+Revision ID: a3c5e7f9b1d2
+Revises: d9f4a2b7c3e8
+Create Date: 2026-10-19 22:41:13.527604
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from app.migrations.toolkit import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d2'
+down_revision: Union[str, None] = 'd9f4a2b7c3e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Пачка архивации: status = 'DONE' AND created_at < :cutoff ORDER BY created_at, id
+    create_index_concurrently(
+        'ix_tasks_done_created_at', 'tasks', ['created_at', 'id'],
+        postgresql_where=sa.text("status = 'DONE'"), sqlite_where=sa.text("status = 'DONE'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently('ix_tasks_done_created_at', 'tasks')
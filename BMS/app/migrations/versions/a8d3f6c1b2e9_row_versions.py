@@ -0,0 +1,39 @@
+"""row versions
+
+Revision ID: a8d3f6c1b2e9
+Revises: f2b7c9d3e5a1
+Create Date: 2026-10-19 16:41:05.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f6c1b2e9'
+down_revision: Union[str, None] = 'f2b7c9d3e5a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TABLES = {
+    'tasks': 'задачи',
+    'meetings': 'встречи',
+    'teams': 'команды',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, what in _TABLES.items():
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False, comment=f'Номер версии {what}, растёт при каждом UPDATE'))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment=f'Дата и время последнего изменения {what}'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(list(_TABLES)):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
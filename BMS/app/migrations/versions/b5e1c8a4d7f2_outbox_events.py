@@ -0,0 +1,41 @@
+"""outbox events
+
+Revision ID: b5e1c8a4d7f2
+Revises: a8d3f6c1b2e9
+Create Date: 2026-10-19 18:27:44.130562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1c8a4d7f2'
+down_revision: Union[str, None] = 'a8d3f6c1b2e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False, comment='Порядковый номер события'),
+        sa.Column('topic', sa.String(length=50), nullable=False, comment='Тип события, например task.updated'),
+        sa.Column('aggregate_id', sa.Integer(), nullable=False, comment='ID изменённой сущности'),
+        sa.Column('payload', sa.JSON(), nullable=False, comment='Данные события'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='Время записи события'),
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='Не раньше этого времени событие отдаётся потребителям (отсрочка повтора)'),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True, comment='Время успешной доставки всем потребителям'),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False, comment='Число неудачных попыток доставки'),
+        sa.Column('last_error', sa.Text(), nullable=True, comment='Ошибка последней неудачной попытки'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_pending', 'outbox_events', ['processed_at', 'available_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_events_pending', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,37 @@
+"""export filter indexes
+
+Revision ID: b6d8f0a2c4e7
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-19 23:05:48.190357
+
+"""
+from typing import Sequence, Union
+
+from app.migrations.toolkit import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d8f0a2c4e7'
+down_revision: Union[str, None] = 'a3c5e7f9b1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (таблица, колонка) — фильтры выгрузки и копирования команды на шард,
+# найденные app.utils.index_advisor
+INDEXES = [
+    ('meetings', 'creator_id'),
+    ('tasks', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in INDEXES:
+        create_index_concurrently(f'ix_{table}_{column}', table, [column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(INDEXES):
+        drop_index_concurrently(f'ix_{table}_{column}', table)
@@ -0,0 +1,52 @@
+"""fk and time indexes
+
+Revision ID: c7e1f3a9d4b6
+Revises: 5b2d8e4f1a7c
+Create Date: 2026-10-19 11:03:27.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1f3a9d4b6'
+down_revision: Union[str, None] = '5b2d8e4f1a7c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (таблица, колонка) — индексы по внешним ключам и временным колонкам
+INDEXES = [
+    ('tasks', 'creator_id'),
+    ('tasks', 'assignee_id'),
+    ('tasks', 'deadline'),
+    ('comments', 'task_id'),
+    ('evaluations', 'created_at'),
+    ('meetings', 'start_time'),
+    ('meeting_participants', 'user_id'),
+    ('users', 'team_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не работает внутри транзакции,
+    # зато не блокирует запись в большие таблицы на время построения
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(
+                op.f(f'ix_{table}_{column}'), table, [column], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table, column in reversed(INDEXES):
+            op.drop_index(
+                op.f(f'ix_{table}_{column}'), table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
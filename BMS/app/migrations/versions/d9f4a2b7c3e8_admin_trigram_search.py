@@ -0,0 +1,49 @@
+"""admin trigram search
+
+Revision ID: d9f4a2b7c3e8
+Revises: b5e1c8a4d7f2
+Create Date: 2026-10-19 20:12:05.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.migrations.toolkit import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f4a2b7c3e8'
+down_revision: Union[str, None] = 'b5e1c8a4d7f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (таблица, колонка) — поиск подстроки в админке
+INDEXES = [
+    ('users', 'email'),
+    ('tasks', 'title'),
+    ('meetings', 'title'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GIN-индексы gin_trgm_ops ускоряют ILIKE '%x%'; на других СУБД
+    # расширения нет, и индекс по подстроке всё равно не помогает
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in INDEXES:
+        create_index_concurrently(
+            f'ix_{table}_{column}_trgm', table, [column],
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column in reversed(INDEXES):
+        drop_index_concurrently(f'ix_{table}_{column}_trgm', table)
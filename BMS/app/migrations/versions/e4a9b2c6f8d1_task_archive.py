@@ -0,0 +1,75 @@
+"""task archive
+
+Revision ID: e4a9b2c6f8d1
+Revises: c7e1f3a9d4b6
+Create Date: 2026-10-19 12:26:51.377420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9b2c6f8d1'
+down_revision: Union[str, None] = 'c7e1f3a9d4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Тип task_status_enum уже создан в начальной миграции
+    task_status = postgresql.ENUM('OPEN', 'IN_PROGRESS', 'DONE', name='task_status_enum', create_type=False)
+
+    op.create_table('tasks_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False, comment='ID задачи (совпадает с исходным)'),
+        sa.Column('title', sa.String(length=200), nullable=False, comment='Краткое название задачи'),
+        sa.Column('description', sa.Text(), nullable=True, comment='Подробное описание задачи'),
+        sa.Column('status', task_status, nullable=False, comment='Статус задачи на момент архивации'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Дата и время создания задачи'),
+        sa.Column('deadline', sa.DateTime(timezone=True), nullable=True, comment='Срок выполнения задачи'),
+        sa.Column('creator_id', sa.Integer(), nullable=True, comment='ID пользователя, создавшего задачу'),
+        sa.Column('assignee_id', sa.Integer(), nullable=True, comment='ID пользователя—исполнителя задачи'),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='Дата и время переноса в архив'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tasks_archive_creator_id'), 'tasks_archive', ['creator_id'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_assignee_id'), 'tasks_archive', ['assignee_id'], unique=False)
+
+    op.create_table('comments_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False, comment='ID комментария (совпадает с исходным)'),
+        sa.Column('text', sa.Text(), nullable=False, comment='Текст комментария'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Дата и время создания комментария'),
+        sa.Column('task_id', sa.Integer(), nullable=False, comment='ID архивной задачи'),
+        sa.Column('author_id', sa.Integer(), nullable=True, comment='ID пользователя-автора комментария'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks_archive.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_comments_archive_task_id'), 'comments_archive', ['task_id'], unique=False)
+
+    op.create_table('evaluations_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False, comment='ID оценки (совпадает с исходным)'),
+        sa.Column('score', sa.Integer(), nullable=False, comment='Баллы, выставленные за задачу (1–5)'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='Дата и время создания оценки'),
+        sa.Column('task_id', sa.Integer(), nullable=False, comment='ID архивной задачи'),
+        sa.Column('evaluator_id', sa.Integer(), nullable=True, comment='ID пользователя, который выставил оценку'),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks_archive.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_evaluations_archive_created_at'), 'evaluations_archive', ['created_at'], unique=False)
+    op.create_index(op.f('ix_evaluations_archive_task_id'), 'evaluations_archive', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_evaluations_archive_task_id'), table_name='evaluations_archive')
+    op.drop_index(op.f('ix_evaluations_archive_created_at'), table_name='evaluations_archive')
+    op.drop_table('evaluations_archive')
+    op.drop_index(op.f('ix_comments_archive_task_id'), table_name='comments_archive')
+    op.drop_table('comments_archive')
+    op.drop_index(op.f('ix_tasks_archive_assignee_id'), table_name='tasks_archive')
+    op.drop_index(op.f('ix_tasks_archive_creator_id'), table_name='tasks_archive')
+    op.drop_table('tasks_archive')
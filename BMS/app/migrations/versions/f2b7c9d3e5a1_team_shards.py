@@ -0,0 +1,34 @@
+"""team shards
+
+Revision ID: f2b7c9d3e5a1
+Revises: e4a9b2c6f8d1
+Create Date: 2026-10-19 14:02:13.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c9d3e5a1'
+down_revision: Union[str, None] = 'e4a9b2c6f8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('team_shards',
+        sa.Column('team_id', sa.Integer(), nullable=False, comment='ID команды'),
+        sa.Column('shard', sa.Integer(), nullable=False, comment='Номер шарда в DB_SHARD_URLS'),
+        sa.Column('locked', sa.Boolean(), server_default='false', nullable=False, comment='Команда переносится между шардами, запросы к её данным временно отклоняются'),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('team_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('team_shards')
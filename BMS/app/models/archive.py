@@ -0,0 +1,154 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import DateTime, Integer, String, ForeignKey, Enum as SQLEnum, Text, func
+from sqlalchemy.orm import relationship, Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.task import TaskStatus
+
+
+# -------------------------------------------------------------------
+# Архив выполненных задач (холодное хранение)
+# -------------------------------------------------------------------
+# Колонки совпадают с «горячими» таблицами, поэтому строки переносятся
+# INSERT ... SELECT, а схемы ответа (TaskRead и др.) читают их как есть.
+# Внешних ключей на users нет: архив не должен мешать удалению пользователей.
+
+class TaskArchive(Base):
+    """
+    Выполненная задача, перенесённая из таблицы tasks.
+    """
+    __tablename__ = 'tasks_archive'
+
+    # Признак для схем ответа: запись пришла из архива
+    archived = True
+
+    # --- Базовые поля ---
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=False,
+        comment="ID задачи (совпадает с исходным)"
+    )
+    title: Mapped[str] = mapped_column(
+        String(200),
+        nullable=False,
+        comment="Краткое название задачи"
+    )
+    description: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Подробное описание задачи"
+    )
+    status: Mapped[TaskStatus] = mapped_column(
+        SQLEnum(TaskStatus, name="task_status_enum"),
+        nullable=False,
+        comment="Статус задачи на момент архивации"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Дата и время создания задачи"
+    )
+    deadline: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Срок выполнения задачи"
+    )
+    creator_id: Mapped[int] = mapped_column(
+        Integer,
+        index=True,
+        comment="ID пользователя, создавшего задачу"
+    )
+    assignee_id: Mapped[int] = mapped_column(
+        Integer,
+        index=True,
+        comment="ID пользователя—исполнителя задачи"
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="Дата и время переноса в архив"
+    )
+
+    # --- Связанные сущности ---
+    comments: Mapped[List["CommentArchive"]] = relationship(
+        "CommentArchive",
+        cascade="all, delete-orphan",
+    )
+    evaluations: Mapped[List["EvaluationArchive"]] = relationship(
+        "EvaluationArchive",
+        cascade="all, delete-orphan",
+    )
+
+
+class CommentArchive(Base):
+    """
+    Комментарий к архивной задаче.
+    """
+    __tablename__ = 'comments_archive'
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=False,
+        comment="ID комментария (совпадает с исходным)"
+    )
+    text: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="Текст комментария"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Дата и время создания комментария"
+    )
+    task_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('tasks_archive.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        comment="ID архивной задачи"
+    )
+    author_id: Mapped[int] = mapped_column(
+        Integer,
+        comment="ID пользователя-автора комментария"
+    )
+
+
+class EvaluationArchive(Base):
+    """
+    Оценка архивной задачи.
+    """
+    __tablename__ = 'evaluations_archive'
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=False,
+        comment="ID оценки (совпадает с исходным)"
+    )
+    score: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Баллы, выставленные за задачу (1–5)"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        comment="Дата и время создания оценки"
+    )
+    task_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('tasks_archive.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+        comment="ID архивной задачи"
+    )
+    evaluator_id: Mapped[int] = mapped_column(
+        Integer,
+        comment="ID пользователя, который выставил оценку"
+    )
@@ -40,6 +40,7 @@ class Comment(Base):
         Integer,
         ForeignKey('tasks.id', ondelete='CASCADE'),
         nullable=False,
+        index=True,
         comment="ID задачи, к которой относится комментарий"
     )
     task: Mapped["Task"] = relationship(
@@ -32,6 +32,7 @@ class Evaluation(Base):
         DateTime(timezone=True),
         default=datetime.utcnow,
         nullable=False,
+        index=True,
         comment="Дата и время создания оценки"
     )
 
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List
-from sqlalchemy import DateTime, Integer, String, ForeignKey
+from sqlalchemy import DateTime, Index, Integer, String, ForeignKey, func, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
@@ -17,6 +17,10 @@ class Meeting(Base):
     Содержит тему, время и список участников.
     """
     __tablename__ = 'meetings'
+    __table_args__ = (
+        # Поиск подстроки в админке (ILIKE '%x%'), PostgreSQL + pg_trgm
+        Index('ix_meetings_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
 
     # --- Основные поля ---
     id: Mapped[int] = mapped_column(
@@ -33,6 +37,7 @@ class Meeting(Base):
     start_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
         comment="Дата и время начала встречи"
     )
     end_time: Mapped[datetime] = mapped_column(
@@ -41,10 +46,29 @@ class Meeting(Base):
         comment="Дата и время окончания встречи"
     )
 
+    # --- Версия строки (ETag для условных GET) ---
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        onupdate=text('version + 1'),
+        comment="Номер версии встречи, растёт при каждом UPDATE"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        comment="Дата и время последнего изменения встречи"
+    )
+
     # --- Создатель ---
     creator_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('users.id', ondelete='CASCADE'),
+        index=True,
         comment="ID пользователя, создавшего встречу"
     )
     creator: Mapped["User"] = relationship(
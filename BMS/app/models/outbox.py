@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+# -------------------------------------------------------------------
+# Модель OutboxEvent (transactional outbox)
+# -------------------------------------------------------------------
+
+class OutboxEvent(Base):
+    """
+    Доменное событие, записанное в той же транзакции, что и изменение
+    задачи, встречи, комментария или оценки. Рассылается потребителям
+    диспетчером app.core.outbox с доставкой «хотя бы один раз».
+    При шардировании таблица живёт на каждом шарде рядом с данными.
+    """
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        # Выборка очереди: необработанные по порядку появления
+        Index('ix_outbox_events_pending', 'processed_at', 'available_at', 'id'),
+    )
+
+    # Номер шарда, из которого диспетчер прочитал событие (не хранится):
+    # id задач и встреч уникальны только в пределах шарда
+    shard = None
+
+    # --- Базовые поля ---
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        comment="Порядковый номер события"
+    )
+    topic: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Тип события, например task.updated"
+    )
+    aggregate_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="ID изменённой сущности"
+    )
+    payload: Mapped[dict] = mapped_column(
+        JSON,
+        nullable=False,
+        comment="Данные события"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        server_default=func.now(),
+        nullable=False,
+        comment="Время записи события"
+    )
+
+    # --- Доставка ---
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        server_default=func.now(),
+        nullable=False,
+        comment="Не раньше этого времени событие отдаётся потребителям (отсрочка повтора)"
+    )
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Время успешной доставки всем потребителям"
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default='0',
+        comment="Число неудачных попыток доставки"
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Ошибка последней неудачной попытки"
+    )
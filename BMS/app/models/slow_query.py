@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Float, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+# -------------------------------------------------------------------
+# Модель SlowQuery
+# -------------------------------------------------------------------
+
+class SlowQuery(Base):
+    """
+    Запись журнала медленных запросов.
+    Хранит форму SQL, обезличенные параметры, длительность,
+    маршрут-источник и (для части записей) план выполнения.
+    """
+    __tablename__ = 'slow_queries'
+
+    # --- Базовые поля ---
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        index=True,
+        comment="Уникальный идентификатор записи"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Время выполнения запроса"
+    )
+    duration_ms: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        comment="Длительность выполнения, мс"
+    )
+
+    # --- Запрос ---
+    route: Mapped[Optional[str]] = mapped_column(
+        String(300),
+        nullable=True,
+        comment="HTTP-маршрут, из которого выполнен запрос"
+    )
+    statement: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        comment="SQL с плейсхолдерами вместо значений"
+    )
+    parameters: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Типы параметров без самих значений"
+    )
+    explain: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment="Вывод EXPLAIN (ANALYZE, BUFFERS), если снимался"
+    )
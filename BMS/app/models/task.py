@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import DateTime, Integer, String, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import DateTime, Index, Integer, String, ForeignKey, Enum as SQLEnum, Text, func, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
@@ -29,6 +29,13 @@ class Task(Base):
     создателе, исполнителе, комментариях и оценках.
     """
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Поиск подстроки в админке (ILIKE '%x%'), PostgreSQL + pg_trgm
+        Index('ix_tasks_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        # Выборка пачки архивации (app/utils/archival.py): только выполненные
+        Index('ix_tasks_done_created_at', 'created_at', 'id',
+              postgresql_where=text("status = 'DONE'"), sqlite_where=text("status = 'DONE'")),
+    )
 
     # --- Базовые поля ---
     id: Mapped[int] = mapped_column(
@@ -57,18 +64,39 @@ class Task(Base):
         DateTime(timezone=True),
         default=datetime.utcnow,
         nullable=False,
+        index=True,
         comment="Дата и время создания задачи"
     )
     deadline: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
+        index=True,
         comment="Срок выполнения задачи"
     )
 
+    # --- Версия строки (ETag для условных GET) ---
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        onupdate=text('version + 1'),
+        comment="Номер версии задачи, растёт при каждом UPDATE"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        comment="Дата и время последнего изменения задачи"
+    )
+
     # --- Связь с пользователями ---
     creator_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('users.id', ondelete='CASCADE'),
+        index=True,
         comment="ID пользователя, создавшего задачу"
     )
     creator: Mapped["User"] = relationship(
@@ -80,6 +108,7 @@ class Task(Base):
     assignee_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('users.id', ondelete='SET NULL'),
+        index=True,
         comment="ID пользователя—исполнителя задачи"
     )
     assignee: Mapped["User"] = relationship(
@@ -1,4 +1,6 @@
-from sqlalchemy import Integer, String, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, String, ForeignKey, func, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from typing import List
 
@@ -37,6 +39,24 @@ class Team(Base):
         comment="Код приглашения для входа в команду"
     )
 
+    # --- Версия строки (ETag для условных GET) ---
+    version: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        onupdate=text('version + 1'),
+        comment="Номер версии команды, растёт при каждом UPDATE"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=func.now(),
+        comment="Дата и время последнего изменения команды"
+    )
+
     # --- Администратор команды ---
     admin_id: Mapped[int] = mapped_column(
         Integer,
@@ -55,3 +75,34 @@ class Team(Base):
         back_populates="team",
         foreign_keys="[User.team_id]",
     )
+
+
+# -------------------------------------------------------------------
+# Размещение команды по шардам (глобальный каталог)
+# -------------------------------------------------------------------
+
+class TeamShard(Base):
+    """
+    На каком шарде лежат задачи, встречи и оценки команды.
+    Таблица живёт только в основной БД (каталоге) вместе с users и teams.
+    """
+    __tablename__ = 'team_shards'
+
+    team_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('teams.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID команды"
+    )
+    shard: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Номер шарда в DB_SHARD_URLS"
+    )
+    locked: Mapped[bool] = mapped_column(
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default='false',
+        comment="Команда переносится между шардами, запросы к её данным временно отклоняются"
+    )
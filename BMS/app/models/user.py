@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, ForeignKey, Enum, Table
+from sqlalchemy import Column, Index, Integer, ForeignKey, Enum, Table
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
 
@@ -26,7 +26,7 @@ meeting_participants_association = Table(
     'meeting_participants',
     Base.metadata,
     Column('meeting_id', Integer, ForeignKey('meetings.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True, index=True),
 )
 
 
@@ -42,6 +42,10 @@ class User(SQLAlchemyBaseUserTable[int], Base):
       - is_active, is_superuser, is_verified
     """
     __tablename__ = 'users'
+    __table_args__ = (
+        # Поиск подстроки в админке (ILIKE '%x%'), PostgreSQL + pg_trgm
+        Index('ix_users_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+    )
 
     # --- Основные поля ---
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -57,6 +61,7 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         Integer,
         ForeignKey('teams.id', ondelete='SET NULL'),
         nullable=True,
+        index=True,
         comment="ID команды, к которой привязан пользователь"
     )
     team: Mapped["Team"] = relationship(
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.viewsets.CalendarViewSet import CalendarViewSet
-from app.core.database import get_async_session
-from app.core.auth import current_active_user
+from app.core.sharding import get_team_read_session
+from app.core.auth import current_active_user, websocket_user
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.push import calendar_hub
 from app.models.user import User
 
 
@@ -21,10 +25,16 @@ router = APIRouter(prefix="/calendar", tags=["Календарь"])
 )
 async def daily_calendar(
     target_date: str,
+    request: Request,
+    response: Response,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_read_session),
 ):
     viewset = CalendarViewSet(current_user, db)
+    etag = await viewset.daily_etag(target_date)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     return await viewset.daily_calendar(target_date)
 
 
@@ -36,8 +46,42 @@ async def daily_calendar(
 async def monthly_calendar(
     year: int,
     month: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_read_session),
 ):
     viewset = CalendarViewSet(current_user, db)
+    etag = await viewset.monthly_etag(year, month)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     return await viewset.monthly_calendar(year, month)
+
+
+@router.websocket("/ws")
+async def calendar_updates(
+    websocket: WebSocket,
+    current_user: Optional[User] = Depends(websocket_user),
+):
+    """
+    Канал изменений календаря: {"type": "invalidate", "dates": [...]}
+    или {"type": "resync"}. Входящие сообщения клиента игнорируются.
+    """
+    if current_user is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    connection = calendar_hub.register(websocket, current_user.id)
+    if connection is None:
+        # Воркер заполнен — клиент переподключится к другому
+        await websocket.close(code=1013)
+        return
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        calendar_hub.unregister(connection)
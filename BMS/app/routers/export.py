@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.viewsets.ExportViewSet import EXPORT_MEDIA_TYPES, ExportViewSet
+from app.core.auth import current_active_user
+from app.core.sharding import SessionFactoriesResolver, get_read_session_factories
+from app.models.user import User
+
+
+router = APIRouter(prefix="/export", tags=["Выгрузка"])
+
+# -------------------------------------------------------------------
+# Эндпоинты
+# -------------------------------------------------------------------
+
+@router.get(
+    "/{entity}",
+    response_class=StreamingResponse,
+    description=(
+        "Потоковая выгрузка задач, встреч или оценок в NDJSON или CSV. "
+        "Администратор — любой команды или всех, менеджер — своей команды."
+    ),
+)
+async def export_entity(
+    entity: Literal["tasks", "meetings", "evaluations"],
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Формат выгрузки"),
+    team_id: Optional[int] = Query(None, description="Только данные команды"),
+    date_from: Optional[date] = Query(None, description="Начало периода (включительно)"),
+    date_to: Optional[date] = Query(None, description="Конец периода (включительно)"),
+    current_user: User = Depends(current_active_user),
+    resolve_factories: SessionFactoriesResolver = Depends(get_read_session_factories),
+):
+    viewset = ExportViewSet(current_user, resolve_factories)
+    chunks = await viewset.export(entity, fmt, team_id, date_from, date_to)
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{extension}"'},
+    )
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Request
+
+from app.core.health import check_readiness
+from app.core.serialization import FastJSONResponse
+
+
+router = APIRouter(tags=["Служебные"])
+
+# -------------------------------------------------------------------
+# Эндпоинты (без авторизации, для балансировщика и оркестратора)
+# -------------------------------------------------------------------
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Живость: цикл событий отвечает."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz(request: Request):
+    """Готовность к трафику: 503, если БД недоступна или пул/цикл событий перегружены."""
+    state = request.app.state
+    ready, report = await check_readiness(
+        state.config,
+        loop_monitor=getattr(state, "loop_monitor", None),
+        dispatcher=getattr(state, "dispatcher", None),
+    )
+    return FastJSONResponse(report, status_code=200 if ready else 503)
@@ -0,0 +1,37 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.viewsets.ImportViewSet import ImportViewSet
+from app.core.auth import current_active_user
+from app.core.database import get_async_session
+from app.models.user import User
+from app.schemas.bulk_import import ImportReportRead
+from app.utils.bulk_import import DEFAULT_CHUNK_SIZE
+
+
+router = APIRouter(prefix="/import", tags=["Импорт"])
+
+# -------------------------------------------------------------------
+# Эндпоинты
+# -------------------------------------------------------------------
+
+@router.post(
+    "/{entity}",
+    response_model=ImportReportRead,
+    description=(
+        "Массовый импорт пользователей, задач, комментариев или встреч из CSV/NDJSON. "
+        "Только для администратора. Для миллионов строк используйте CLI app.utils.bulk_import."
+    ),
+)
+async def import_entity(
+    entity: Literal["users", "tasks", "comments", "meetings"],
+    file: UploadFile = File(..., description="CSV с заголовком или NDJSON"),
+    fmt: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="По умолчанию — по расширению"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50000, description="Строк в одной транзакции"),
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    viewset = ImportViewSet(current_user, db)
+    return await viewset.import_file(entity, file, fmt, chunk_size)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.viewsets.MeetingViewSet import MeetingViewSet
-from app.core.database import get_async_session
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.serialization import rows_response
+from app.core.sharding import get_team_read_session, get_team_session
 from app.core.auth import current_active_user
 from app.models.user import User
 from app.schemas.meeting import MeetingRead, MeetingCreate, MeetingUpdate
@@ -20,11 +22,15 @@ router = APIRouter(prefix="/meetings", tags=["Встречи"])
     description="Список встреч текущего пользователя."
 )
 async def list_meetings(
+    request: Request,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_read_session),
 ):
     viewset = MeetingViewSet(current_user, db)
-    return await viewset.list_meetings()
+    etag = await viewset.list_meetings_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return with_etag(rows_response(await viewset.list_meetings()), etag)
 
 
 @router.post(
@@ -36,7 +42,7 @@ async def list_meetings(
 async def create_meeting(
     meeting_in: MeetingCreate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = MeetingViewSet(current_user, db)
     return await viewset.create_meeting(meeting_in)
@@ -51,7 +57,7 @@ async def update_meeting(
     meeting_id: int,
     meeting_in: MeetingUpdate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = MeetingViewSet(current_user, db)
     return await viewset.update_meeting(meeting_id, meeting_in)
@@ -65,7 +71,7 @@ async def update_meeting(
 async def delete_meeting(
     meeting_id: int,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = MeetingViewSet(current_user, db)
     await viewset.delete_meeting(meeting_id)
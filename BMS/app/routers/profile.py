@@ -1,12 +1,14 @@
 from datetime import date
-from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.viewsets.ProfileViewSet import ProfileViewSet
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserRead
 from app.core.database import get_async_session
+from app.core.sharding import get_team_read_session
 from app.core.auth import current_user
+from app.core.etag import etag_matches, not_modified, with_etag
 
 
 router = APIRouter(prefix="/me", tags=["Пользователи"])
@@ -16,8 +18,12 @@ router = APIRouter(prefix="/me", tags=["Пользователи"])
 # -------------------------------------------------------------------
 
 @router.get("/", response_model=UserRead)
-async def get_my_profile(user: User = Depends(current_user)):
+async def get_my_profile(request: Request, response: Response, user: User = Depends(current_user)):
     viewset = ProfileViewSet(user, None)
+    etag = viewset.profile_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     return await viewset.get_my_profile()
 
 
@@ -55,7 +61,7 @@ async def get_average_evaluation(
     date_from: date = Query(..., alias="from", description="Начало периода"),
     date_to: date = Query(..., alias="to", description="Конец периода"),
     user: User = Depends(current_user),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_team_read_session)
 ):
     viewset = ProfileViewSet(user, session)
     return await viewset.get_average_evaluation(date_from, date_to)
\ No newline at end of file
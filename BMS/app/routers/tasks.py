@@ -1,13 +1,15 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.viewsets.TaskViewSet import TaskViewSet
 from app.viewsets.CommentViewSet import CommentViewSet
 from app.viewsets.EvaluationViewSet import EvaluationViewSet
 from app.core.auth import current_active_user
-from app.core.database import get_async_session
+from app.core.etag import etag_matches, not_modified, with_etag
+from app.core.serialization import rows_response
+from app.core.sharding import get_team_read_session, get_team_session
 from app.models.user import User
 from app.schemas.comment import CommentCreate, CommentRead
 from app.schemas.evaluation import EvaluationCreate, EvaluationRead
@@ -23,18 +25,33 @@ router = APIRouter(prefix="/tasks", tags=["Задачи"])
 
 @router.get("/", response_model=List[TaskRead])
 async def list_tasks(
+    request: Request,
+    include_archived: bool = Query(False, description="Добавить задачи из архива"),
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_read_session),
 ):
     viewset = TaskViewSet(current_user, db)
-    return await viewset.list_tasks()
+    etag = await viewset.list_tasks_etag(include_archived)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return with_etag(rows_response(await viewset.list_tasks(include_archived)), etag)
+
+
+@router.get("/{task_id}", response_model=TaskRead)
+async def get_task(
+    task_id: int,
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_team_read_session),
+):
+    viewset = TaskViewSet(current_user, db)
+    return await viewset.get_task(task_id)
 
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_in: TaskCreate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = TaskViewSet(current_user, db)
     return await viewset.create_task(task_in)
@@ -45,7 +62,7 @@ async def update_task(
     task_id: int,
     task_in: TaskUpdate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = TaskViewSet(current_user, db)
     return await viewset.update_task(task_id, task_in)
@@ -55,7 +72,7 @@ async def update_task(
 async def delete_task(
     task_id: int,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = TaskViewSet(current_user, db)
     await viewset.delete_task(task_id)
@@ -66,7 +83,7 @@ async def add_comment(
     task_id: int,
     comment_in: CommentCreate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = CommentViewSet(current_user, db)
     return await viewset.add_comment(task_id, comment_in)
@@ -76,10 +93,10 @@ async def add_comment(
 async def list_comments(
     task_id: int,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_read_session),
 ):
     viewset = CommentViewSet(current_user, db)
-    return await viewset.list_comments(task_id)
+    return rows_response(await viewset.list_comments(task_id))
 
 
 @router.post("/{task_id}/evaluations", response_model=EvaluationRead, status_code=status.HTTP_201_CREATED)
@@ -87,7 +104,7 @@ async def add_evaluation(
     task_id: int,
     eval_in: EvaluationCreate,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = EvaluationViewSet(current_user, db)
     return await viewset.add_evaluation(task_id, eval_in)
@@ -97,7 +114,7 @@ async def add_evaluation(
 async def list_evaluations(
     task_id: int,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_team_session),
 ):
     viewset = EvaluationViewSet(current_user, db)
     return await viewset.list_evaluations(task_id)
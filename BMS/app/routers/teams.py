@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update
 
 from app.viewsets.TeamViewSet import TeamViewSet
 from app.core.auth import current_active_user
+from app.core.etag import etag_matches, not_modified, with_etag
 from app.core.database import get_async_session
 from app.models.user import User
 from app.schemas.team import TeamCreate, TeamRead, TeamMemberAdd, TeamMemberRoleUpdate
@@ -37,10 +38,16 @@ async def create_team(
 )
 async def read_team(
     team_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_session),
 ):
     viewset = TeamViewSet(current_user, db)
+    etag = await viewset.read_team_etag(team_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    with_etag(response, etag)
     return await viewset.read_team(team_id)
 
 
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+
+from app.models.task import TaskStatus
+from app.models.user import UserRole
+
+
+# -------------------------------------------------------------------
+# Строки массового импорта (CSV / NDJSON)
+# -------------------------------------------------------------------
+# Ссылки на пользователей и команды задаются естественными ключами
+# (email, название команды) и разрешаются пачкой на весь кусок файла.
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Время без часового пояса считается UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _split_list(value):
+    """В CSV список передаётся строкой через «;»."""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(";") if item.strip()]
+    return value
+
+
+class ImportRow(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True, extra="ignore")
+
+
+class UserImport(ImportRow):
+    """
+    Пользователь. Без hashed_password вход невозможен до сброса пароля.
+    """
+    email: EmailStr
+    role: UserRole = UserRole.USER
+    team_name: Optional[str] = Field(None, description="Название существующей команды")
+    hashed_password: Optional[str] = Field(None, description="Хэш пароля из исходной системы")
+    is_active: bool = True
+    is_verified: bool = False
+
+
+class TaskImport(ImportRow):
+    """
+    Задача. id можно передать, чтобы сохранить номера исходной системы
+    и ссылаться на них из комментариев.
+    """
+    id: Optional[int] = None
+    title: str = Field(..., min_length=1, max_length=200)
+    description: Optional[str] = None
+    status: TaskStatus = TaskStatus.OPEN
+    creator_email: EmailStr
+    assignee_email: EmailStr
+    created_at: Optional[datetime] = None
+    deadline: Optional[datetime] = None
+
+    _utc = field_validator("created_at", "deadline")(_as_utc)
+
+
+class CommentImport(ImportRow):
+    """Комментарий к существующей (или импортированной с id) задаче."""
+    task_id: int
+    author_email: EmailStr
+    text: str = Field(..., min_length=1)
+    created_at: Optional[datetime] = None
+
+    _utc = field_validator("created_at")(_as_utc)
+
+
+class MeetingImport(ImportRow):
+    """Встреча; создатель добавляется в участники автоматически."""
+    title: str = Field(..., min_length=1, max_length=200)
+    start_time: datetime
+    end_time: datetime
+    creator_email: EmailStr
+    participant_emails: List[EmailStr] = Field(default_factory=list)
+
+    _list = field_validator("participant_emails", mode="before")(_split_list)
+    _utc = field_validator("start_time", "end_time")(_as_utc)
+
+    @field_validator("end_time")
+    @classmethod
+    def _ends_after_start(cls, value, info):
+        start = info.data.get("start_time")
+        if start is not None and value <= start:
+            raise ValueError("end_time должно быть позже start_time")
+        return value
+
+
+class ImportRowError(BaseModel):
+    """Строка файла, не прошедшая импорт."""
+    line: int = Field(..., description="Номер строки (для CSV — с учётом заголовка)")
+    message: str
+
+
+class ImportReportRead(BaseModel):
+    """
+    Итог импорта.
+    """
+    entity: str
+    inserted: int = Field(..., description="Сколько строк записано")
+    skipped: int = Field(..., description="Сколько строк пропущено из-за ошибок")
+    errors: List[ImportRowError] = Field(..., description="Первые ошибки (не больше 100)")
@@ -92,3 +92,7 @@ class TaskRead(BaseModel):
     deadline: Optional[datetime]
     comments: List[CommentRead]
     evaluations: List[EvaluationRead]
+    archived: bool = Field(
+        False,
+        description="Задача перенесена в архив (только чтение)"
+    )
@@ -0,0 +1,72 @@
+"""
+Запросы списков админки для больших таблиц.
+
+  - estimate_count — число строк выборки: оценка планировщика PostgreSQL
+    (EXPLAIN, без чтения таблицы), если она не меньше порога,
+    иначе точный COUNT(*);
+  - contains — поиск подстроки через ILIKE по самой колонке: без CAST,
+    который добавляет sqladmin, PostgreSQL использует GIN-индекс
+    gin_trgm_ops (см. миграцию admin_trigram_search);
+  - keyset_page — страница по первичному ключу (WHERE id < :after
+    вместо OFFSET), стоимость не зависит от номера страницы.
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def estimate_count(session: AsyncSession, stmt: Select, exact_below: int) -> Tuple[int, bool]:
+    """(число строк, оценка ли это) для выборки stmt."""
+    stmt = stmt.order_by(None)
+    dialect = session.bind.dialect
+    if dialect.name == "postgresql":
+        compiled = stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+        plan = (await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= exact_below:
+            return estimate, True
+    count = await session.scalar(select(func.count()).select_from(stmt.subquery()))
+    return count, False
+
+
+def contains(column, term: str):
+    """
+    column ILIKE '%term%' с экранированием % и _ в term. Символ экранирования
+    «/», а не обратная косая: её запись в литерале зависит от настроек сервера.
+    """
+    escaped = term.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return column.ilike(f"%{escaped}%", escape="/")
+
+
+async def keyset_page(
+    session: AsyncSession,
+    stmt: Select,
+    key,
+    page_size: int,
+    descending: bool = True,
+    after: Optional[Any] = None,
+    before: Optional[Any] = None,
+) -> Tuple[List[Any], bool, bool]:
+    """
+    Страница stmt, упорядоченная по key. after — ключ последней строки
+    предыдущей страницы, before — первой строки следующей (шаг назад).
+    Возвращает (строки, есть ли страница раньше, есть ли страница дальше).
+    """
+    forward = before is None
+    cursor = after if forward else before
+    # Направление обхода: вперёд — в порядке списка, назад — в обратном
+    walk_desc = descending if forward else not descending
+    if cursor is not None:
+        stmt = stmt.where(key < cursor if walk_desc else key > cursor)
+    stmt = stmt.order_by(None).order_by(key.desc() if walk_desc else key.asc()).limit(page_size + 1)
+
+    rows = list((await session.execute(stmt)).scalars().unique())
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if forward:
+        return rows, after is not None, more
+    return rows[::-1], more, True
@@ -0,0 +1,155 @@
+"""
+Перенос выполненных задач в архив.
+
+Задачи со статусом DONE старше ARCHIVE_DONE_TASKS_AFTER_DAYS дней
+вместе с комментариями и оценками переносятся в tasks_archive,
+comments_archive и evaluations_archive. Работа идёт пачками:
+каждая пачка — отдельная короткая транзакция. Пачка выбирается
+по частичному индексу ix_tasks_done_created_at (created_at, id
+WHERE status = 'DONE') в его порядке и не сканирует горячую таблицу задач.
+На каждую перенесённую задачу в транзакции пачки пишется событие
+task.deleted (payload как у DELETE /tasks/{id} плюс archived),
+чтобы поиск, вебхуки и календарь убрали задачу. Задачи команды лежат
+на её шарде (app/core/sharding.py), поэтому задание обходит все шарды;
+без DB_SHARD_URLS шард один — основная БД.
+
+Архивные задачи по-прежнему доступны: GET /tasks/{id} и
+GET /tasks/?include_archived=true читают и архив, в админке
+поиск по названию есть в разделе «Архив задач».
+
+Запуск из каталога BMS:
+    python -m app.utils.archival [--days 180] [--batch-size 1000] [--max-batches N]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import bindparam, delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import entity_cache
+from app.core.config import settings
+from app.core.outbox import emit
+from app.core.sharding import shard_of
+from app.models.archive import CommentArchive, EvaluationArchive, TaskArchive
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.task import Task
+from app.models.user import User
+
+
+_TASK_COLUMNS = ["id", "title", "description", "status", "created_at", "deadline", "creator_id", "assignee_id"]
+_COMMENT_COLUMNS = ["id", "text", "created_at", "task_id", "author_id"]
+_EVALUATION_COLUMNS = ["id", "score", "created_at", "task_id", "evaluator_id"]
+
+
+# Статус — литерал, а не параметр: иначе планировщик (и SQLite, и общий
+# план подготовленного выражения в PostgreSQL) не сопоставит условие
+# с предикатом частичного индекса ix_tasks_done_created_at
+_DONE_BATCH = (
+    select(Task.id, Task.deadline, Task.creator_id, Task.assignee_id)
+    .where(text("tasks.status = 'DONE'"), Task.created_at < bindparam("cutoff"))
+    .order_by(Task.created_at, Task.id)
+    .limit(bindparam("batch_size"))
+)
+
+
+def _copy(target, source, columns, where):
+    """INSERT INTO target (columns) SELECT columns FROM source WHERE ..."""
+    return insert(target).from_select(
+        columns,
+        select(*[getattr(source, name) for name in columns]).where(where),
+    )
+
+
+async def _emit_deleted(db: AsyncSession, tasks) -> None:
+    """task.deleted на каждую задачу; у задач с дедлайном — дата и команды для календаря."""
+    user_ids = {uid for task in tasks if task.deadline is not None for uid in (task.creator_id, task.assignee_id)}
+    teams = {}
+    if user_ids:
+        teams = dict((await db.execute(select(User.id, User.team_id).where(User.id.in_(user_ids)))).all())
+    for task in tasks:
+        payload = {"archived": True}
+        if task.deadline is not None:
+            payload["deadline"] = task.deadline
+            payload["team_ids"] = sorted({
+                teams[uid] for uid in (task.creator_id, task.assignee_id) if teams.get(uid) is not None
+            })
+        emit(db, "task.deleted", task.id, payload)
+
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """Перенести в архив одну пачку задач. Возвращает число перенесённых задач."""
+    tasks = (await db.execute(_DONE_BATCH, {"cutoff": cutoff, "batch_size": batch_size})).all()
+    if not tasks:
+        return 0
+    ids = [task.id for task in tasks]
+
+    await db.execute(_copy(TaskArchive, Task, _TASK_COLUMNS, Task.id.in_(ids)))
+    await db.execute(_copy(CommentArchive, Comment, _COMMENT_COLUMNS, Comment.task_id.in_(ids)))
+    await db.execute(_copy(EvaluationArchive, Evaluation, _EVALUATION_COLUMNS, Evaluation.task_id.in_(ids)))
+
+    await db.execute(delete(Comment).where(Comment.task_id.in_(ids)))
+    await db.execute(delete(Evaluation).where(Evaluation.task_id.in_(ids)))
+    await db.execute(delete(Task).where(Task.id.in_(ids)))
+    await _emit_deleted(db, tasks)
+    await db.commit()
+    await entity_cache.invalidate("task", *ids, shard=shard_of(db))
+    return len(ids)
+
+
+async def archive_done_tasks(
+    db: AsyncSession,
+    older_than: Optional[timedelta] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Архивировать выполненные задачи старше older_than пачками по batch_size.
+    max_batches ограничивает объём работы за один запуск. Возвращает число задач.
+    """
+    older_than = older_than or timedelta(days=settings.ARCHIVE_DONE_TASKS_AFTER_DAYS)
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - older_than
+
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = await archive_batch(db, cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
+
+
+async def archive_shards(
+    shards: Sequence[sessionmaker],
+    older_than: Optional[timedelta] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Архивировать задачи на каждом шарде по очереди (max_batches — на шард)."""
+    total = 0
+    for factory in shards:
+        async with factory() as db:
+            total += await archive_done_tasks(db, older_than, batch_size, max_batches)
+    return total
+
+
+async def _main(days: int, batch_size: int, max_batches: Optional[int]) -> None:
+    from app.core.sharding import shard_router
+
+    moved = await archive_shards(shard_router.shards, timedelta(days=days), batch_size, max_batches)
+    print(f"Перенесено в архив задач: {moved} (шардов: {len(shard_router.shards)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Архивация выполненных задач")
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_DONE_TASKS_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    opts = parser.parse_args()
+    asyncio.run(_main(opts.days, opts.batch_size, opts.max_batches))
@@ -0,0 +1,287 @@
+"""
+Массовые операции админки над задачами, пользователями и встречами.
+
+Выбранные строки обрабатываются не по одной через ORM, а set-based
+выражениями UPDATE/DELETE ... WHERE id IN (...) пачками по
+ADMIN_BULK_BATCH_SIZE: каждая пачка — отдельная короткая транзакция,
+после неё обновляется прогресс задания и сбрасывается кэш сущностей.
+Больше ADMIN_BULK_MAX_ROWS строк за одно задание не принимается.
+
+Как и вьюсеты, операции пишут в outbox по событию на каждую изменённую
+строку в транзакции пачки (payload — как у соответствующих эндпоинтов),
+поэтому вебхуки, поиск и календарь видят массовые правки. Перевод
+пользователей после пачки обновляет справочные копии прежних и новой
+команд на их шардах (shard_router.sync_team).
+
+Задания выполняются в фоне процесса админки; BulkJobs хранит последние
+из них для страницы прогресса (admin.BulkJobsView).
+"""
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database, sharding
+from app.core.cache import entity_cache
+from app.core.config import settings
+from app.core.metrics import ADMIN_BULK_ROWS
+from app.core.outbox import emit
+from app.core.sharding import shard_of
+from app.models.meeting import Meeting
+from app.models.task import Task, TaskStatus
+from app.models.user import User, meeting_participants_association
+
+
+logger = logging.getLogger(__name__)
+
+Apply = Callable[[AsyncSession, List[int]], Awaitable[int]]
+Invalidate = Callable[[List[int]], Awaitable[None]]
+
+
+# -------------------------------------------------------------------
+# Set-based операции (одна пачка id — одно выражение)
+# -------------------------------------------------------------------
+
+async def _team_ids(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    """Команды пользователей: id -> team_id."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    return dict((await db.execute(select(User.id, User.team_id).where(User.id.in_(user_ids)))).all())
+
+
+_TASK_CALENDAR_COLUMNS = (Task.id, Task.creator_id, Task.assignee_id, Task.deadline)
+
+
+def _task_payload(task, teams: Dict[int, Optional[int]], values: dict, *user_ids: Optional[int]) -> dict:
+    """
+    Payload task.updated как в TaskViewSet.update_task: у задачи с дедлайном —
+    previous_deadline и команды автора и исполнителей (календарь, push).
+    """
+    payload = dict(values)
+    if task.deadline is not None:
+        payload["previous_deadline"] = task.deadline
+        payload["team_ids"] = sorted({
+            teams[user_id] for user_id in (task.creator_id, task.assignee_id, *user_ids)
+            if teams.get(user_id) is not None
+        })
+    return payload
+
+
+async def _update_tasks(db: AsyncSession, ids: List[int], values: dict, *user_ids: Optional[int]) -> int:
+    tasks = (await db.execute(select(*_TASK_CALENDAR_COLUMNS).where(Task.id.in_(ids)))).all()
+    teams = await _team_ids(db, [*user_ids, *(t.creator_id for t in tasks), *(t.assignee_id for t in tasks)])
+    await db.execute(update(Task).where(Task.id.in_(ids)).values(**values))
+    for task in tasks:
+        emit(db, "task.updated", task.id, _task_payload(task, teams, values, *user_ids))
+    return len(tasks)
+
+
+def set_task_status(status: TaskStatus) -> Apply:
+    async def apply(db: AsyncSession, ids: List[int]) -> int:
+        return await _update_tasks(db, ids, {"status": status})
+    return apply
+
+
+def reassign_tasks(assignee_id: int) -> Apply:
+    async def apply(db: AsyncSession, ids: List[int]) -> int:
+        return await _update_tasks(db, ids, {"assignee_id": assignee_id}, assignee_id)
+    return apply
+
+
+async def deactivate_users(db: AsyncSession, ids: List[int]) -> int:
+    result = await db.execute(
+        update(User).where(User.id.in_(ids), User.is_active.is_(True)).values(is_active=False).returning(User.id)
+    )
+    updated = result.scalars().all()
+    for user_id in updated:
+        emit(db, "user.updated", user_id, {"is_active": False})
+    return len(updated)
+
+
+def move_users(team_id: Optional[int]) -> Tuple[Apply, Invalidate]:
+    """
+    Пара (apply, invalidate): apply запоминает прежние команды пачки,
+    invalidate после её commit сбрасывает кэш и синхронизирует
+    копии этих команд и новой команды на шардах.
+    """
+    teams: Set[int] = set()
+
+    async def apply(db: AsyncSession, ids: List[int]) -> int:
+        previous = await _team_ids(db, ids)
+        await db.execute(update(User).where(User.id.in_(ids)).values(team_id=team_id))
+        for user_id, previous_team_id in previous.items():
+            emit(db, "user.updated", user_id, {"team_id": team_id, "previous_team_id": previous_team_id})
+        teams.update(previous_team_id for previous_team_id in previous.values() if previous_team_id is not None)
+        if team_id is not None:
+            teams.add(team_id)
+        return len(previous)
+
+    async def invalidate(ids: List[int]) -> None:
+        await invalidate_users(ids)
+        for synced in sorted(teams):
+            await sharding.shard_router.sync_team(synced)
+        teams.clear()
+
+    return apply, invalidate
+
+
+async def delete_meetings(db: AsyncSession, ids: List[int]) -> int:
+    # payload — как у MeetingViewSet.delete_meeting: календарь участников
+    start_times = dict((await db.execute(
+        select(Meeting.id, Meeting.start_time).where(Meeting.id.in_(ids))
+    )).all())
+    participants: Dict[int, List[int]] = {meeting_id: [] for meeting_id in start_times}
+    for meeting_id, user_id in (await db.execute(
+        select(meeting_participants_association.c.meeting_id, meeting_participants_association.c.user_id)
+        .where(meeting_participants_association.c.meeting_id.in_(ids))
+        .order_by(meeting_participants_association.c.user_id)
+    )).all():
+        participants.setdefault(meeting_id, []).append(user_id)
+
+    await db.execute(
+        delete(meeting_participants_association)
+        .where(meeting_participants_association.c.meeting_id.in_(ids))
+    )
+    result = await db.execute(delete(Meeting).where(Meeting.id.in_(ids)))
+    for meeting_id, start_time in start_times.items():
+        emit(db, "meeting.deleted", meeting_id, {
+            "start_time": start_time, "participants": participants[meeting_id],
+        })
+    return result.rowcount
+
+
+async def ended_meeting_ids(
+    db: AsyncSession,
+    ended_before: datetime,
+    limit: int,
+    among: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """Id встреч, закончившихся до ended_before (не больше limit; среди among, если задано)."""
+    stmt = select(Meeting.id).where(Meeting.end_time < ended_before).order_by(Meeting.id).limit(limit)
+    if among:
+        stmt = stmt.where(Meeting.id.in_(among))
+    return list((await db.execute(stmt)).scalars())
+
+
+# -------------------------------------------------------------------
+# Сброс кэша после пачки
+# -------------------------------------------------------------------
+
+# Задания админки работают с основной БД (см. admin.setup_admin)
+
+async def invalidate_tasks(ids: List[int]) -> None:
+    await entity_cache.invalidate("task", *ids, shard=shard_of(database.engine))
+
+
+async def invalidate_meetings(ids: List[int]) -> None:
+    await entity_cache.invalidate("meeting", *ids, shard=shard_of(database.engine))
+
+
+async def invalidate_users(ids: List[int]) -> None:
+    # Прежние команды неизвестны — как и при правке пользователя в админке
+    await entity_cache.invalidate("user", *ids)
+    await entity_cache.invalidate_kind("team")
+    await entity_cache.invalidate_kind("task")
+
+
+# -------------------------------------------------------------------
+# Задания и прогресс
+# -------------------------------------------------------------------
+
+@dataclass
+class BulkJob:
+    id: int
+    action: str
+    label: str
+    total: int
+    processed: int = 0
+    affected: int = 0
+    state: str = "running"
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def percent(self) -> int:
+        return 100 if not self.total else self.processed * 100 // self.total
+
+
+class BulkJobs:
+    """Фоновые задания процесса; хранятся последние keep штук."""
+
+    def __init__(self, keep: int = 50):
+        self.keep = keep
+        self._jobs: "OrderedDict[int, BulkJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._tasks = set()
+
+    def get(self, job_id: int) -> Optional[BulkJob]:
+        return self._jobs.get(job_id)
+
+    def recent(self) -> List[BulkJob]:
+        return list(reversed(self._jobs.values()))
+
+    def start(
+        self,
+        action: str,
+        label: str,
+        ids: Sequence[int],
+        apply: Apply,
+        invalidate: Invalidate,
+        session_factory: sessionmaker,
+        batch_size: Optional[int] = None,
+    ) -> BulkJob:
+        job = BulkJob(id=next(self._ids), action=action, label=label, total=len(ids))
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.keep:
+            self._jobs.popitem(last=False)
+        task = asyncio.create_task(
+            run_job(job, list(ids), apply, invalidate, session_factory, batch_size or settings.ADMIN_BULK_BATCH_SIZE)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def wait(self) -> None:
+        """Дождаться всех запущенных заданий (остановка процесса, тесты)."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+async def run_job(
+    job: BulkJob,
+    ids: List[int],
+    apply: Apply,
+    invalidate: Invalidate,
+    session_factory: sessionmaker,
+    batch_size: int,
+) -> None:
+    try:
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            async with session_factory() as db:
+                affected = await apply(db, chunk)
+                await db.commit()
+            await invalidate(chunk)
+            job.processed += len(chunk)
+            job.affected += affected
+            ADMIN_BULK_ROWS.labels(job.action).inc(affected)
+            logger.info("admin bulk %s #%d: %d/%d", job.action, job.id, job.processed, job.total)
+        job.state = "done"
+    except Exception as exc:
+        job.state = "failed"
+        job.error = repr(exc)
+        logger.exception("admin bulk %s #%d прервано на %d/%d", job.action, job.id, job.processed, job.total)
+    finally:
+        job.finished_at = datetime.utcnow()
+
+
+bulk_jobs = BulkJobs()
@@ -0,0 +1,553 @@
+"""
+Массовый импорт пользователей, задач, комментариев и встреч.
+
+Файл (CSV с заголовком или NDJSON) читается потоком и обрабатывается
+кусками по chunk_size строк; каждый кусок:
+  1. валидируется целиком через TypeAdapter (при ошибке — построчно,
+     чтобы отбросить только плохие строки);
+  2. разрешает ссылки (email → users.id, название → teams.id, task_id)
+     одним запросом на вид ссылки;
+  3. записывается через COPY FROM STDIN (asyncpg) или executemany
+     (остальные драйверы, в т.ч. SQLite) и фиксируется отдельной транзакцией;
+     в той же транзакции на каждую задачу, комментарий и встречу пишется
+     событие *.created в outbox (payload как у эндпоинтов создания), чтобы
+     вебхуки, поиск и календарь увидели импорт. Id для событий на PostgreSQL
+     берутся из последовательности до COPY, на остальных СУБД — RETURNING.
+
+Чтение и валидация куска идут в отдельном потоке, чтобы не блокировать
+цикл событий (импорт через HTTP). С шардированием (DB_SHARD_URLS)
+пользователи ищутся в каталоге, а задачи, комментарии и встречи пишутся
+на шард команды автора; все упомянутые в строке пользователи должны
+быть из этой команды (см. check_same_team_users). После импорта
+пользователей их команды копируются на шарды (ShardRouter.sync_team).
+
+Запуск из каталога BMS:
+    python -m app.utils.bulk_import tasks.csv --entity tasks [--format csv] [--chunk-size 5000] [--shard N]
+
+--shard N пишет всё на один шард без маршрутизации по командам.
+"""
+import argparse
+import asyncio
+import csv
+import enum
+import io
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import entity_cache
+from app.core.database import AsyncSessionLocal
+from app.core.outbox import emit
+from app.models.comment import Comment
+from app.models.meeting import Meeting
+from app.models.task import Task
+from app.models.team import Team
+from app.models.user import User, meeting_participants_association
+from app.schemas.bulk_import import CommentImport, MeetingImport, TaskImport, UserImport
+
+
+IMPORT_SCHEMAS = {
+    "users": UserImport,
+    "tasks": TaskImport,
+    "comments": CommentImport,
+    "meetings": MeetingImport,
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+# Хэш, который не совпадёт ни с одним паролем: вход только после сброса
+UNUSABLE_PASSWORD = "!"
+
+
+@dataclass
+class ImportReport:
+    """Итог импорта: сколько записано, сколько пропущено и первые ошибки."""
+    entity: str
+    inserted: int = 0
+    skipped: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    # Команды, в которые добавлены пользователи (для копирования на шарды)
+    team_ids: Set[int] = field(default_factory=set)
+
+    def reject(self, line: int, message: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def as_dict(self) -> dict:
+        return {
+            "entity": self.entity,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "errors": [{"line": line, "message": message} for line, message in self.errors],
+        }
+
+
+# -------------------------------------------------------------------
+# Чтение файла
+# -------------------------------------------------------------------
+
+Record = Tuple[int, Any]
+
+
+def read_records(stream: IO[bytes], fmt: str) -> Iterator[Record]:
+    """Строки файла как (номер строки, dict) без загрузки файла в память."""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text_stream)
+        for record in reader:
+            # Пустая ячейка — значение не задано (сработает значение по умолчанию)
+            yield reader.line_num, {key: value for key, value in record.items() if key and value != ""}
+        return
+
+    for number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield number, exc
+
+
+def chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# -------------------------------------------------------------------
+# Валидация куска
+# -------------------------------------------------------------------
+
+def _error_text(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'строка'}: {err['msg']}" for err in exc.errors()
+        )
+    return str(exc)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def validate_chunk(schema, chunk: List[Record], report: ImportReport) -> List[Tuple[int, Any]]:
+    """
+    Провалидировать кусок одним вызовом TypeAdapter; если в куске есть ошибки —
+    повторить построчно и отбросить только плохие строки.
+    """
+    records = [(line, data) for line, data in chunk if not isinstance(data, Exception)]
+    for line, data in chunk:
+        if isinstance(data, Exception):
+            report.reject(line, f"некорректный JSON: {data}")
+
+    try:
+        models = _list_adapter(schema).validate_python([data for _, data in records])
+        return [(line, model) for (line, _), model in zip(records, models)]
+    except ValidationError:
+        pass
+
+    valid = []
+    for line, data in records:
+        try:
+            valid.append((line, schema.model_validate(data)))
+        except ValidationError as exc:
+            report.reject(line, _error_text(exc))
+    return valid
+
+
+def _next_valid(chunks: Iterator[List[Record]], schema, report: ImportReport) -> Optional[List[Tuple[int, Any]]]:
+    """Прочитать и провалидировать следующий кусок; None — файл закончился."""
+    chunk = next(chunks, None)
+    return None if chunk is None else validate_chunk(schema, chunk, report)
+
+
+# -------------------------------------------------------------------
+# Разрешение ссылок пачкой
+# -------------------------------------------------------------------
+
+async def _user_ids(db: AsyncSession, emails: Iterable[str]) -> Dict[str, int]:
+    emails = {email.lower() for email in emails}
+    if not emails:
+        return {}
+    rows = await db.execute(select(func.lower(User.email), User.id).where(func.lower(User.email).in_(emails)))
+    return dict(rows.all())
+
+
+async def _user_teams(db: AsyncSession, emails: Iterable[str]) -> Dict[str, Tuple[int, Optional[int]]]:
+    """email (в нижнем регистре) → (users.id, users.team_id)."""
+    emails = {email.lower() for email in emails}
+    if not emails:
+        return {}
+    rows = await db.execute(
+        select(func.lower(User.email), User.id, User.team_id).where(func.lower(User.email).in_(emails))
+    )
+    return {email: (user_id, team_id) for email, user_id, team_id in rows}
+
+
+async def _team_ids(db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+    names = set(names)
+    if not names:
+        return {}
+    rows = await db.execute(select(Team.name, Team.id).where(Team.name.in_(names)))
+    return dict(rows.all())
+
+
+async def _existing(db: AsyncSession, column, values: Iterable[Any]) -> set:
+    values = set(values)
+    if not values:
+        return set()
+    return set((await db.execute(select(column).where(column.in_(values)))).scalars())
+
+
+# -------------------------------------------------------------------
+# Запись
+# -------------------------------------------------------------------
+
+def _copy_value(value: Any) -> Any:
+    # SQLAlchemy Enum хранит имена членов перечисления
+    return value.name if isinstance(value, enum.Enum) else value
+
+
+async def write_rows(db: AsyncSession, table, rows: List[dict]) -> None:
+    """COPY FROM STDIN на asyncpg, executemany на остальных драйверах."""
+    if not rows:
+        return
+    conn = await db.connection()
+    if conn.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(_copy_value(row[name]) for name in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await db.execute(insert(table), rows)
+
+
+async def insert_rows(db: AsyncSession, table, rows: List[dict]) -> List[int]:
+    """
+    Вставить строки без id и вернуть выданные id в порядке строк.
+    PostgreSQL: id заранее из последовательности таблицы, затем COPY;
+    остальные СУБД: INSERT ... RETURNING пачкой в порядке параметров.
+    """
+    if not rows:
+        return []
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        ids = list((await db.execute(
+            text(f"SELECT nextval(pg_get_serial_sequence('{table.name}', 'id')) FROM generate_series(1, :count)"),
+            {"count": len(rows)},
+        )).scalars())
+        await write_rows(db, table, [{"id": row_id, **row} for row_id, row in zip(ids, rows)])
+        return ids
+    return list((await db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+    )).scalars())
+
+
+async def _user_team_ids(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, Optional[int]]:
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    return dict((await db.execute(select(User.id, User.team_id).where(User.id.in_(user_ids)))).all())
+
+
+async def _sync_sequence(db: AsyncSession, table) -> None:
+    """После вставки явных id сдвинуть последовательность PostgreSQL."""
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        await db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+        ))
+
+
+# -------------------------------------------------------------------
+# Импорт по сущностям
+# -------------------------------------------------------------------
+
+async def _import_users(db, valid, report, users=None) -> None:
+    teams = await _team_ids(db, [m.team_name for _, m in valid if m.team_name])
+    taken = await _user_ids(db, [m.email for _, m in valid])
+
+    rows = []
+    for line, model in valid:
+        email = model.email.lower()
+        if email in taken:
+            report.reject(line, f"пользователь {model.email} уже существует")
+            continue
+        if model.team_name and model.team_name not in teams:
+            report.reject(line, f"команда «{model.team_name}» не найдена")
+            continue
+        taken[email] = 0
+        rows.append({
+            "email": model.email,
+            "hashed_password": model.hashed_password or UNUSABLE_PASSWORD,
+            "role": model.role,
+            "team_id": teams.get(model.team_name),
+            "is_active": model.is_active,
+            "is_superuser": False,
+            "is_verified": model.is_verified,
+        })
+    await write_rows(db, User.__table__, rows)
+    report.inserted += len(rows)
+    report.team_ids.update(row["team_id"] for row in rows if row["team_id"] is not None)
+
+
+async def _import_tasks(db, valid, report, users) -> None:
+    taken_ids = await _existing(db, Task.id, [m.id for _, m in valid if m.id is not None])
+    now = datetime.now(timezone.utc)
+
+    rows = []
+    for line, model in valid:
+        missing = [e for e in (model.creator_email, model.assignee_email) if e.lower() not in users]
+        if missing:
+            report.reject(line, f"пользователь {missing[0]} не найден")
+            continue
+        if model.id is not None and model.id in taken_ids:
+            report.reject(line, f"задача с id {model.id} уже существует")
+            continue
+        row = {
+            "title": model.title,
+            "description": model.description,
+            "status": model.status,
+            "created_at": model.created_at or now,
+            "deadline": model.deadline,
+            "creator_id": users[model.creator_email.lower()],
+            "assignee_id": users[model.assignee_email.lower()],
+        }
+        if model.id is not None:
+            taken_ids.add(model.id)
+            row["id"] = model.id
+        rows.append(row)
+
+    # В одном COPY/executemany набор колонок должен совпадать
+    with_ids = [row for row in rows if "id" in row]
+    without_ids = [row for row in rows if "id" not in row]
+    for row, row_id in zip(without_ids, await insert_rows(db, Task.__table__, without_ids)):
+        row["id"] = row_id
+    await write_rows(db, Task.__table__, with_ids)
+    if with_ids:
+        await _sync_sequence(db, Task.__table__)
+
+    # Как TaskViewSet.create_task: у задач с дедлайном — команды для календаря
+    teams = await _user_team_ids(db, [
+        user_id for row in rows if row["deadline"] is not None for user_id in (row["creator_id"], row["assignee_id"])
+    ])
+    for row in rows:
+        payload = {
+            name: row[name] for name in ("title", "description", "deadline", "assignee_id", "status", "creator_id")
+        }
+        if row["deadline"] is not None:
+            payload["team_ids"] = sorted({
+                teams[user_id] for user_id in (row["creator_id"], row["assignee_id"]) if teams.get(user_id) is not None
+            })
+        emit(db, "task.created", row["id"], payload)
+    report.inserted += len(rows)
+
+
+async def _import_comments(db, valid, report, users) -> None:
+    tasks = await _existing(db, Task.id, [m.task_id for _, m in valid])
+    now = datetime.now(timezone.utc)
+
+    rows = []
+    for line, model in valid:
+        if model.task_id not in tasks:
+            report.reject(line, f"задача {model.task_id} не найдена")
+            continue
+        if model.author_email.lower() not in users:
+            report.reject(line, f"пользователь {model.author_email} не найден")
+            continue
+        rows.append({
+            "text": model.text,
+            "created_at": model.created_at or now,
+            "task_id": model.task_id,
+            "author_id": users[model.author_email.lower()],
+        })
+    for row, comment_id in zip(rows, await insert_rows(db, Comment.__table__, rows)):
+        emit(db, "comment.created", comment_id, {"task_id": row["task_id"], "author_id": row["author_id"]})
+    report.inserted += len(rows)
+
+
+async def _import_meetings(db, valid, report, users) -> None:
+
+    rows, participants = [], []
+    for line, model in valid:
+        emails = [model.creator_email, *model.participant_emails]
+        missing = [e for e in emails if e.lower() not in users]
+        if missing:
+            report.reject(line, f"пользователь {missing[0]} не найден")
+            continue
+        rows.append({
+            "title": model.title,
+            "start_time": model.start_time,
+            "end_time": model.end_time,
+            "creator_id": users[model.creator_email.lower()],
+        })
+        participants.append({users[e.lower()] for e in emails})
+    if not rows:
+        return
+
+    # id встреч нужны для участников и событий
+    ids = await insert_rows(db, Meeting.__table__, rows)
+    await write_rows(db, meeting_participants_association, [
+        {"meeting_id": meeting_id, "user_id": user_id}
+        for meeting_id, user_ids in zip(ids, participants)
+        for user_id in sorted(user_ids)
+    ])
+    for meeting_id, row, user_ids in zip(ids, rows, participants):
+        emit(db, "meeting.created", meeting_id, {
+            "title": row["title"], "start_time": row["start_time"], "end_time": row["end_time"],
+            "participants": sorted(user_ids),
+        })
+    report.inserted += len(rows)
+
+
+_IMPORTERS = {
+    "users": _import_users,
+    "tasks": _import_tasks,
+    "comments": _import_comments,
+    "meetings": _import_meetings,
+}
+
+# Пользователи, на которых ссылается строка; первый — автор, по его команде
+# выбирается шард
+_REFERENCED_USERS: Dict[str, Callable[[Any], Sequence[str]]] = {
+    "tasks": lambda m: (m.creator_email, m.assignee_email),
+    "comments": lambda m: (m.author_email,),
+    "meetings": lambda m: (m.creator_email, *m.participant_emails),
+}
+
+# Новые участники команд и комментарии задач меняют снимки в кэше сущностей
+_INVALIDATES = {
+    "users": "team",
+    "comments": "task",
+}
+
+
+async def _import_routed(directory: AsyncSession, router, entity: str, valid, report: ImportReport) -> None:
+    """
+    Кусок задач, комментариев или встреч при шардировании: пользователи
+    ищутся в каталоге, строки группируются по шарду команды автора.
+    """
+    from app.core.sharding import TeamMovingError
+
+    referenced = _REFERENCED_USERS[entity]
+    users = await _user_teams(directory, [e for _, m in valid for e in referenced(m)])
+    await directory.rollback()
+
+    groups: Dict[Optional[int], List[Tuple[int, Any]]] = {}
+    for line, model in valid:
+        emails = [email.lower() for email in referenced(model)]
+        missing = [email for email in emails if email not in users]
+        if missing:
+            report.reject(line, f"пользователь {missing[0]} не найден")
+            continue
+        team_id = users[emails[0]][1]
+        foreign = [email for email in emails if users[email][1] != team_id]
+        if foreign:
+            report.reject(line, f"пользователь {foreign[0]} не из команды автора")
+            continue
+        try:
+            shard = await router.shard_for_team(team_id)
+        except TeamMovingError:
+            report.reject(line, f"команда {team_id} переносится между шардами")
+            continue
+        groups.setdefault(shard, []).append((line, model))
+
+    ids = {email: user_id for email, (user_id, _) in users.items()}
+    for shard, group in groups.items():
+        async with (router.directory if shard is None else router.shards[shard])() as db:
+            await _IMPORTERS[entity](db, group, report, ids)
+            await db.commit()
+
+
+async def import_records(
+    db: AsyncSession,
+    entity: str,
+    records: Iterable[Record],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    router=None,
+) -> ImportReport:
+    """
+    Импортировать записи кусками; каждый кусок — отдельная транзакция.
+    router — ShardRouter: при включённом шардировании db — сессия каталога,
+    а задачи, комментарии и встречи пишутся на шарды команд.
+    """
+    if entity not in IMPORT_SCHEMAS:
+        raise ValueError(f"Неизвестная сущность импорта: {entity}")
+
+    routed = router is not None and router.enabled and entity in _REFERENCED_USERS
+    report = ImportReport(entity)
+    chunks = chunked(records, chunk_size)
+    while (valid := await asyncio.to_thread(_next_valid, chunks, IMPORT_SCHEMAS[entity], report)) is not None:
+        if not valid:
+            continue
+        if routed:
+            await _import_routed(db, router, entity, valid, report)
+            continue
+        users = None
+        if entity in _REFERENCED_USERS:
+            users = await _user_ids(db, [e for _, m in valid for e in _REFERENCED_USERS[entity](m)])
+        await _IMPORTERS[entity](db, valid, report, users)
+        await db.commit()
+
+    if router is not None:
+        for team_id in sorted(report.team_ids):
+            await router.sync_team(team_id)
+    if report.inserted and entity in _INVALIDATES:
+        await entity_cache.invalidate_kind(_INVALIDATES[entity])
+    return report
+
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+async def _main(opts) -> ImportReport:
+    from app.core.sharding import shard_router
+
+    factory, router = AsyncSessionLocal, shard_router
+    if opts.shard is not None:
+        factory, router = shard_router.shards[opts.shard], None
+
+    with open(opts.path, "rb") as fh:
+        async with factory() as db:
+            return await import_records(
+                db, opts.entity, read_records(fh, opts.format), opts.chunk_size, router
+            )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Массовый импорт из CSV/NDJSON")
+    parser.add_argument("path", help="файл с данными")
+    parser.add_argument("--entity", required=True, choices=sorted(IMPORT_SCHEMAS))
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None,
+                        help="по умолчанию — по расширению файла")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--shard", type=int, default=None,
+                        help="номер шарда для задач/комментариев/встреч (см. DB_SHARD_URLS)")
+    opts = parser.parse_args(argv)
+    opts.format = opts.format or ("ndjson" if opts.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    report = asyncio.run(_main(opts))
+    print(f"{report.entity}: записано {report.inserted}, пропущено {report.skipped}")
+    for line, message in report.errors:
+        print(f"  строка {line}: {message}", file=sys.stderr)
+    return 1 if report.skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Советник по индексам.
+
+Собирает колонки, по которым приложение фильтрует и соединяет таблицы:
+  - колонки связей моделей (relationship → внешние ключи и M2M);
+  - колонки в условиях WHERE/JOIN предсобранных выражений
+    (модульные select() из QUERY_MODULES) и выражений, которые
+    строятся при вызове (QUERY_BUILDERS: выгрузка со всеми фильтрами);
+  - опционально — колонки из файла с формами SQL
+    (например, выгрузка журнала медленных запросов).
+Сравнивает их с индексами в метаданных моделей (частичные индексы
+не в счёт: они покрывают не все строки) и завершается с кодом 1,
+если найдена неиндексированная колонка, которой нет в ACCEPTED_UNINDEXED.
+
+Выражения, собираемые внутри функций, работающих с БД (NOT_ANALYZED),
+не проверяются — их формы можно передать через --sql-file.
+
+Запуск из каталога BMS:
+    python -m app.utils.index_advisor [--sql-file shapes.sql]
+"""
+import argparse
+import importlib
+import re
+import sys
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, MetaData, UniqueConstraint
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.elements import BinaryExpression
+from sqlalchemy.sql.selectable import Select
+
+from app.core.database import Base
+from app.models import archive, comment, evaluation, meeting, slow_query, task, team, user  # noqa: F401
+
+
+ColumnRef = Tuple[str, str]
+
+# Модули, в которых лежат предсобранные выражения горячих запросов
+QUERY_MODULES = ["app.utils.services", "app.utils.read_queries", "app.utils.archival"]
+
+
+def _export_statements():
+    from datetime import date
+
+    from app.utils.read_queries import EXPORT_ENTITIES, export_statement
+
+    return [export_statement(entity, 1, date.today(), date.today())[1] for entity in EXPORT_ENTITIES]
+
+
+# Построители выражений, которых нет в модулях в виде готовых select()
+QUERY_BUILDERS: List[Callable[[], Iterable]] = [_export_statements]
+
+# Где выражения строятся внутри функций с БД и советником не видны
+NOT_ANALYZED = [
+    "app.core.sharding (перенос и копии команд)",
+    "app.utils.bulk_admin (массовые операции админки)",
+    "app.utils.bulk_import (импорт)",
+]
+
+# Неиндексированные колонки, отсутствие индекса на которых осознанно:
+# таблица мала или поиск по колонке идёт только вместе с индексированной.
+ACCEPTED_UNINDEXED: Dict[ColumnRef, str] = {
+    ("teams", "admin_id"): "команд мало, выборка по админу — только в админке",
+    ("meetings", "end_time"): "всегда фильтруется вместе с start_time",
+    ("comments", "author_id"): "нет запросов по автору комментария",
+    ("evaluations", "evaluator_id"): "нет запросов по оценившему",
+}
+
+
+# -------------------------------------------------------------------
+# Что проиндексировано
+# -------------------------------------------------------------------
+
+def indexed_columns(metadata: MetaData) -> Set[ColumnRef]:
+    """Колонки, которые являются ведущими в каком-либо индексе (или PK/UNIQUE)."""
+    result: Set[ColumnRef] = set()
+    for table in metadata.tables.values():
+        leading: List[Column] = []
+        if table.primary_key.columns:
+            leading.append(list(table.primary_key.columns)[0])
+        leading.extend(
+            list(index.columns)[0] for index in table.indexes
+            if not any(index.dialect_options[dialect].get("where") is not None for dialect in ("postgresql", "sqlite"))
+        )
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.columns:
+                leading.append(list(constraint.columns)[0])
+        result.update((table.name, col.name) for col in leading)
+    return result
+
+
+# -------------------------------------------------------------------
+# Что используется в фильтрах и соединениях
+# -------------------------------------------------------------------
+
+def relationship_columns() -> Set[ColumnRef]:
+    """Колонки, по которым ORM соединяет и подгружает связи."""
+    result: Set[ColumnRef] = set()
+    for mapper in Base.registry.mappers:
+        for rel in mapper.relationships:
+            pairs = list(rel.synchronize_pairs) + list(rel.secondary_synchronize_pairs or [])
+            for left, right in pairs:
+                for col in (left, right):
+                    if col.table is not None:
+                        result.add((col.table.name, col.name))
+    return result
+
+
+def statement_columns(stmt) -> Set[ColumnRef]:
+    """Колонки таблиц, участвующие в сравнениях внутри выражения."""
+    result: Set[ColumnRef] = set()
+    for element in visitors.iterate(stmt):
+        if not isinstance(element, BinaryExpression):
+            continue
+        for side in (element.left, element.right):
+            table = getattr(side, "table", None)
+            if isinstance(side, Column) and table is not None:
+                result.add((table.name, side.name))
+    return result
+
+
+def module_statement_columns(modules: Iterable[str]) -> Set[ColumnRef]:
+    """Колонки из всех модульных select() в перечисленных модулях."""
+    result: Set[ColumnRef] = set()
+    for name in modules:
+        module = importlib.import_module(name)
+        for value in vars(module).values():
+            if isinstance(value, Select):
+                result |= statement_columns(value)
+    return result
+
+
+def builder_statement_columns(builders: Iterable[Callable[[], Iterable]]) -> Set[ColumnRef]:
+    """Колонки из выражений, которые возвращают построители."""
+    result: Set[ColumnRef] = set()
+    for build in builders:
+        for stmt in build():
+            result |= statement_columns(stmt)
+    return result
+
+
+_SQL_PREDICATE = re.compile(
+    r"\b(\w+)\.(\w+)\s*(?:=|<>|!=|<=|>=|<|>|\bIN\b|\bIS\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+
+
+def sql_shape_columns(sql: str, known_tables: Set[str]) -> Set[ColumnRef]:
+    """Грубый разбор форм SQL: колонки вида table.column в сравнениях."""
+    return {
+        (table, column)
+        for table, column in _SQL_PREDICATE.findall(sql)
+        if table in known_tables
+    }
+
+
+# -------------------------------------------------------------------
+# Отчёт
+# -------------------------------------------------------------------
+
+def find_unindexed(sql: Optional[str] = None) -> Dict[ColumnRef, bool]:
+    """
+    Неиндексированные колонки фильтров/соединений.
+    Значение — True, если колонка принята в ACCEPTED_UNINDEXED.
+    """
+    metadata = Base.metadata
+    used = relationship_columns() | module_statement_columns(QUERY_MODULES) | builder_statement_columns(QUERY_BUILDERS)
+    if sql:
+        used |= sql_shape_columns(sql, set(metadata.tables))
+
+    missing = used - indexed_columns(metadata)
+    return {ref: ref in ACCEPTED_UNINDEXED for ref in sorted(missing)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Поиск неиндексированных колонок фильтров и соединений")
+    parser.add_argument("--sql-file", help="файл с формами SQL-запросов для дополнительного анализа")
+    opts = parser.parse_args(argv)
+
+    sql = None
+    if opts.sql_file:
+        with open(opts.sql_file, encoding="utf-8") as fh:
+            sql = fh.read()
+
+    report = find_unindexed(sql)
+    new = [ref for ref, accepted in report.items() if not accepted]
+
+    for (table, column), accepted in report.items():
+        note = f"принято: {ACCEPTED_UNINDEXED[(table, column)]}" if accepted else "НЕТ ИНДЕКСА"
+        print(f"{table + '.' + column:<32} {note}")
+
+    print("\nНе анализируются (выражения строятся внутри функций с БД):")
+    for place in NOT_ANALYZED:
+        print(f"  - {place}")
+
+    if new:
+        print(f"\nНайдено неиндексированных колонок: {len(new)}", file=sys.stderr)
+        return 1
+    print("\nНовых неиндексированных колонок нет.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Потребители событий outbox (см. app/core/outbox.py).
+
+  - cache — сброс снимков entity_cache по изменённым задачам и встречам;
+    нужен при внешнем бэкенде кэша, когда записи делают другие процессы
+    (запись из вьюсетов сбрасывает кэш сразу, этот путь — страховка);
+  - webhooks — POST пачки событий в JSON на OUTBOX_WEBHOOK_URLS;
+    значение «local» включает LocalWebhookSink (запись в память вместо HTTP);
+  - search — обновление поискового индекса задач и встреч;
+    LocalSearchIndex — локальная замена внешнего поискового движка.
+
+Все потребители идемпотентны: повторная доставка события ничего не ломает.
+"""
+import asyncio
+import urllib.request
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.cache import entity_cache
+from app.core.config import settings
+from app.core.outbox import Consumer
+from app.core.serialization import dumps
+from app.models.outbox import OutboxEvent
+
+
+def event_dict(event: OutboxEvent) -> dict:
+    """Событие в виде JSON-объекта для внешних получателей."""
+    return {
+        "id": event.id,
+        "topic": event.topic,
+        "aggregate_id": event.aggregate_id,
+        "payload": event.payload,
+        "created_at": event.created_at,
+    }
+
+
+# -------------------------------------------------------------------
+# Сброс кэша сущностей
+# -------------------------------------------------------------------
+
+def _cache_key(event: OutboxEvent) -> Optional[Tuple[str, int]]:
+    kind = event.topic.split(".", 1)[0]
+    if kind in ("task", "meeting"):
+        return kind, event.aggregate_id
+    if kind in ("comment", "evaluation"):
+        return "task", event.payload.get("task_id")
+    return None
+
+
+async def invalidate_cache(events: List[OutboxEvent]) -> None:
+    # (вид, шард) -> id: ключи кэша задач и встреч включают шард
+    keys: Dict[Tuple[str, Optional[int]], set] = {}
+    for event in events:
+        key = _cache_key(event)
+        if key is not None and key[1] is not None:
+            keys.setdefault((key[0], event.shard), set()).add(key[1])
+    for (kind, shard), ids in keys.items():
+        await entity_cache.invalidate(kind, *ids, shard=shard)
+
+
+# -------------------------------------------------------------------
+# Вебхуки
+# -------------------------------------------------------------------
+
+Transport = Callable[[str, bytes], Awaitable[int]]
+
+
+async def http_post(url: str, body: bytes, timeout: float = 5.0) -> int:
+    """POST application/json стандартной библиотекой в отдельном потоке."""
+    def _post() -> int:
+        request = urllib.request.Request(
+            url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+
+    return await asyncio.to_thread(_post)
+
+
+class LocalWebhookSink:
+    """Локальная замена получателя вебхуков: хранит последние max_items тел."""
+
+    def __init__(self, max_items: int = 1000):
+        self.deliveries: Deque[Tuple[str, bytes]] = deque(maxlen=max_items)
+
+    async def __call__(self, url: str, body: bytes) -> int:
+        self.deliveries.append((url, body))
+        return 204
+
+
+def webhook_consumer(urls: List[str], transport: Transport = http_post) -> Consumer:
+    """Одна пачка — один POST {"events": [...]} на каждый URL."""
+    async def deliver(events: List[OutboxEvent]) -> None:
+        body = dumps({"events": [event_dict(event) for event in events]})
+        for url in urls:
+            status = await transport(url, body)
+            if status >= 300:
+                raise RuntimeError(f"{url} ответил {status}")
+
+    return Consumer("webhooks", deliver)
+
+
+# -------------------------------------------------------------------
+# Поисковый индекс
+# -------------------------------------------------------------------
+
+class LocalSearchIndex:
+    """
+    Локальная замена поискового движка: документы по ключу (вид, id)
+    и поиск подстроки по заголовку и описанию. upsert — частичное
+    обновление: переданные поля сливаются с уже проиндексированными.
+    """
+
+    def __init__(self):
+        self.documents: Dict[Tuple[str, int], dict] = {}
+
+    async def upsert(self, documents: List[dict]) -> None:
+        for document in documents:
+            self.documents.setdefault((document["kind"], document["id"]), {}).update(document)
+
+    async def delete(self, keys: List[Tuple[str, int]]) -> None:
+        for key in keys:
+            self.documents.pop(key, None)
+
+    def search(self, text: str) -> List[dict]:
+        needle = text.casefold()
+        return [
+            document for document in self.documents.values()
+            if needle in f"{document.get('title', '')} {document.get('description') or ''}".casefold()
+        ]
+
+
+_INDEXED_FIELDS = ("title", "description", "status", "start_time", "end_time")
+
+
+def search_consumer(index) -> Consumer:
+    """
+    Индексирует задачи и встречи; удаление убирает документ.
+    Payload событий *.updated частичный (exclude_none), поэтому в индекс
+    уходят только изменённые поля, а события одного документа в пачке
+    сливаются по порядку.
+    """
+    async def reindex(events: List[OutboxEvent]) -> None:
+        upserts: Dict[Tuple[str, int], dict] = {}
+        deletes = []
+        for event in events:
+            kind, action = event.topic.split(".", 1)
+            key = (kind, event.aggregate_id)
+            if action == "deleted":
+                upserts.pop(key, None)
+                deletes.append(key)
+                continue
+            document = upserts.setdefault(key, {"kind": kind, "id": event.aggregate_id})
+            document.update((name, event.payload[name]) for name in _INDEXED_FIELDS if name in event.payload)
+        if deletes:
+            await index.delete(deletes)
+        if upserts:
+            await index.upsert(list(upserts.values()))
+
+    return Consumer("search", reindex, frozenset({"task.*", "meeting.*"}))
+
+
+# -------------------------------------------------------------------
+# Набор по умолчанию
+# -------------------------------------------------------------------
+
+local_webhook_sink = LocalWebhookSink()
+local_search_index = LocalSearchIndex()
+
+
+def default_consumers(config=settings) -> List[Consumer]:
+    """Потребители по настройкам: кэш всегда, вебхуки и поиск — если включены."""
+    consumers = [Consumer("cache", invalidate_cache)]
+
+    urls = config.OUTBOX_WEBHOOK_URLS_list
+    if urls == ["local"]:
+        consumers.append(webhook_consumer(urls, local_webhook_sink))
+    elif urls:
+        consumers.append(webhook_consumer(urls))
+
+    if config.OUTBOX_SEARCH_INDEX == "local":
+        consumers.append(search_consumer(local_search_index))
+    return consumers
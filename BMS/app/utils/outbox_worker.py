@@ -0,0 +1,46 @@
+"""
+Процесс-диспетчер outbox (см. app/core/outbox.py).
+
+    python -m app.utils.outbox_worker            # обрабатывать очередь до SIGTERM
+    python -m app.utils.outbox_worker --once     # разобрать накопившееся и выйти
+    python -m app.utils.outbox_worker --purge-days 7
+
+Несколько экземпляров могут работать параллельно: на PostgreSQL строки
+разбираются через FOR UPDATE SKIP LOCKED.
+"""
+import argparse
+import asyncio
+import signal
+from datetime import timedelta
+from typing import Optional
+
+from app.core.config import settings
+from app.core.outbox import build_dispatcher
+
+
+async def _main(once: bool, purge_days: Optional[int], batch_size: int) -> None:
+    dispatcher = build_dispatcher()
+    dispatcher.batch_size = batch_size
+    if purge_days is not None:
+        removed = await dispatcher.purge(timedelta(days=purge_days))
+        print(f"Удалено доставленных событий: {removed}")
+        return
+    if once:
+        delivered = await dispatcher.drain()
+        print(f"Обработано событий: {delivered}, в очереди: {await dispatcher.pending()}")
+        return
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, dispatcher.stop)
+    await dispatcher.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Доставка событий outbox")
+    parser.add_argument("--once", action="store_true", help="разобрать очередь и выйти")
+    parser.add_argument("--purge-days", type=int, default=None,
+                        help="удалить доставленные события старше N дней и выйти")
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    opts = parser.parse_args()
+    asyncio.run(_main(opts.once, opts.purge_days, opts.batch_size))
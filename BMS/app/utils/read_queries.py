@@ -0,0 +1,380 @@
+"""
+Слой чтения без ORM.
+
+Эндпоинты только на чтение (списки задач, встреч, комментариев, календарь)
+выбирают нужные колонки через Core и получают именованные кортежи вместо
+ORM-объектов: нет identity map, состояния InstanceState, прокси ленивой
+загрузки и отслеживания изменений. На пользователя с 10 000 задач это
+в разы меньше аллокаций и работы сборщика мусора.
+
+Порядок полей кортежей совпадает со схемами ответа (TaskRead, CommentRead,
+EvaluationRead, MeetingRead), поэтому строки сериализуются напрямую
+через compile_row_serializer. У дочерних строк последним полем идёт
+ключ родителя (task_id) — по нему они группируются.
+
+Здесь же собраны запросы версий (fetch_*_version) для ETag условных GET.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, Integer, bindparam, cast, func, literal, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive import CommentArchive, EvaluationArchive, TaskArchive
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.meeting import Meeting
+from app.models.task import Task, TaskStatus
+from app.models.team import Team
+from app.models.user import User, meeting_participants_association
+
+
+# -------------------------------------------------------------------
+# Компактные представления строк
+# -------------------------------------------------------------------
+
+class TaskRow(NamedTuple):
+    id: int
+    title: str
+    description: Optional[str]
+    status: TaskStatus
+    creator_id: int
+    assignee_id: int
+    created_at: datetime
+    deadline: Optional[datetime]
+
+
+class CommentRow(NamedTuple):
+    id: int
+    text: str
+    author_id: int
+    created_at: datetime
+    task_id: int
+
+
+class EvaluationRow(NamedTuple):
+    id: int
+    score: int
+    evaluator_id: int
+    created_at: datetime
+    task_id: int
+
+
+class MeetingRow(NamedTuple):
+    id: int
+    title: str
+    start_time: datetime
+    end_time: datetime
+    creator_id: int
+
+
+class ParticipantRow(NamedTuple):
+    meeting_id: int
+    user_id: int
+
+
+def _columns(model, row_type) -> list:
+    return [getattr(model, name) for name in row_type._fields]
+
+
+# -------------------------------------------------------------------
+# Предсобранные выражения
+# -------------------------------------------------------------------
+
+def _own_tasks(model):
+    return (
+        select(*_columns(model, TaskRow))
+        .where((model.assignee_id == bindparam("user_id")) | (model.creator_id == bindparam("user_id")))
+        .order_by(model.id)
+    )
+
+
+def _children(model, row_type):
+    return (
+        select(*_columns(model, row_type))
+        .where(model.task_id.in_(bindparam("task_ids", expanding=True)))
+        .order_by(model.id)
+    )
+
+
+_USER_TASKS = _own_tasks(Task)
+_USER_ARCHIVED_TASKS = _own_tasks(TaskArchive)
+_TASK_COMMENTS = _children(Comment, CommentRow)
+_TASK_EVALUATIONS = _children(Evaluation, EvaluationRow)
+_ARCHIVED_COMMENTS = _children(CommentArchive, CommentRow)
+_ARCHIVED_EVALUATIONS = _children(EvaluationArchive, EvaluationRow)
+
+_USER_MEETINGS = (
+    select(*_columns(Meeting, MeetingRow))
+    .join(meeting_participants_association)
+    .where(meeting_participants_association.c.user_id == bindparam("user_id"))
+    .order_by(Meeting.start_time, Meeting.id)
+)
+
+_MEETING_PARTICIPANTS = (
+    select(meeting_participants_association.c.meeting_id, meeting_participants_association.c.user_id)
+    .where(meeting_participants_association.c.meeting_id.in_(bindparam("meeting_ids", expanding=True)))
+    .order_by(meeting_participants_association.c.meeting_id, meeting_participants_association.c.user_id)
+)
+
+_team_members = select(User.id).where(User.team_id == bindparam("team_id")).scalar_subquery()
+
+_TEAM_TASKS_FOR_DATE = (
+    select(*_columns(Task, TaskRow))
+    .where(Task.deadline.isnot(None))
+    .where(func.date(Task.deadline) == bindparam("target", type_=Date))
+    .where(or_(Task.assignee_id.in_(_team_members), Task.creator_id.in_(_team_members)))
+    .order_by(Task.deadline, Task.id)
+)
+
+_USER_MEETINGS_FOR_DATE = _USER_MEETINGS.where(func.date(Meeting.start_time) == bindparam("target", type_=Date))
+
+
+# -------------------------------------------------------------------
+# Запросы
+# -------------------------------------------------------------------
+
+async def _rows(db: AsyncSession, stmt, params: dict, row_type) -> list:
+    result = await db.execute(stmt, params)
+    return [row_type._make(row) for row in result.tuples()]
+
+
+async def fetch_user_tasks(db: AsyncSession, user_id: int, archived: bool = False) -> List[TaskRow]:
+    """Задачи, где пользователь автор или исполнитель (из архива при archived=True)."""
+    stmt = _USER_ARCHIVED_TASKS if archived else _USER_TASKS
+    return await _rows(db, stmt, {"user_id": user_id}, TaskRow)
+
+
+async def fetch_task_comments(db: AsyncSession, task_ids: Sequence[int], archived: bool = False) -> List[CommentRow]:
+    """Комментарии к набору задач одной выборкой."""
+    if not task_ids:
+        return []
+    stmt = _ARCHIVED_COMMENTS if archived else _TASK_COMMENTS
+    return await _rows(db, stmt, {"task_ids": list(task_ids)}, CommentRow)
+
+
+async def fetch_task_evaluations(
+    db: AsyncSession, task_ids: Sequence[int], archived: bool = False
+) -> List[EvaluationRow]:
+    """Оценки набора задач одной выборкой."""
+    if not task_ids:
+        return []
+    stmt = _ARCHIVED_EVALUATIONS if archived else _TASK_EVALUATIONS
+    return await _rows(db, stmt, {"task_ids": list(task_ids)}, EvaluationRow)
+
+
+async def fetch_user_meetings(db: AsyncSession, user_id: int) -> List[MeetingRow]:
+    """Встречи, в которых пользователь участвует."""
+    return await _rows(db, _USER_MEETINGS, {"user_id": user_id}, MeetingRow)
+
+
+async def fetch_meeting_participants(db: AsyncSession, meeting_ids: Sequence[int]) -> List[ParticipantRow]:
+    """Пары (встреча, участник) для набора встреч."""
+    if not meeting_ids:
+        return []
+    return await _rows(db, _MEETING_PARTICIPANTS, {"meeting_ids": list(meeting_ids)}, ParticipantRow)
+
+
+async def fetch_team_tasks_for_date(db: AsyncSession, team_id: int, target: date) -> List[TaskRow]:
+    """Задачи команды (по автору или исполнителю) с дедлайном на дату."""
+    return await _rows(db, _TEAM_TASKS_FOR_DATE, {"team_id": team_id, "target": target}, TaskRow)
+
+
+async def fetch_user_meetings_for_date(db: AsyncSession, user_id: int, target: date) -> List[MeetingRow]:
+    """Встречи пользователя, начинающиеся в указанную дату."""
+    return await _rows(db, _USER_MEETINGS_FOR_DATE, {"user_id": user_id, "target": target}, MeetingRow)
+
+
+# -------------------------------------------------------------------
+# Версии данных для условных GET (ETag)
+# -------------------------------------------------------------------
+# Версия набора — агрегаты по строкам: число, сумма id, сумма version
+# и max(updated_at). Одного max(version) мало: он не замечает удаление
+# строки и замену одной строки другой. Дочерние строки (комментарии,
+# оценки, участники) неизменяемы, для них хватает числа и суммы ключей.
+
+class VersionRow(NamedTuple):
+    source: str
+    rows: int
+    key_sum: Optional[int]
+    version_sum: Optional[int]
+    changed_at: Optional[datetime]
+
+
+class TeamVersionRow(NamedTuple):
+    admin_id: int
+    version: int
+    updated_at: datetime
+    # id участников по возрастанию: count/sum не отличают {1, 6} от {2, 5}
+    members: Tuple[int, ...]
+
+
+def _version(source: str, key, where, version=None, stamp=None):
+    return select(
+        literal(source),
+        func.count(),
+        func.sum(key),
+        func.sum(version) if version is not None else cast(literal(0), Integer),
+        func.max(stamp) if stamp is not None else cast(null(), DateTime(timezone=True)),
+    ).where(where)
+
+
+def _tasks_version(task, comment, evaluation, version, stamp):
+    own = (task.assignee_id == bindparam("user_id")) | (task.creator_id == bindparam("user_id"))
+    own_ids = select(task.id).where(own)
+    return union_all(
+        _version("tasks", task.id, own, version, stamp),
+        _version("comments", comment.id, comment.task_id.in_(own_ids), stamp=comment.created_at),
+        _version("evaluations", evaluation.id, evaluation.task_id.in_(own_ids), stamp=evaluation.created_at),
+    )
+
+
+_USER_TASKS_VERSION = _tasks_version(Task, Comment, Evaluation, Task.version, Task.updated_at)
+_USER_ARCHIVED_TASKS_VERSION = _tasks_version(
+    TaskArchive, CommentArchive, EvaluationArchive, None, TaskArchive.archived_at
+)
+
+_user_meeting_ids = select(meeting_participants_association.c.meeting_id).where(
+    meeting_participants_association.c.user_id == bindparam("user_id")
+)
+
+_USER_MEETINGS_VERSION = union_all(
+    _version("meetings", Meeting.id, Meeting.id.in_(_user_meeting_ids), Meeting.version, Meeting.updated_at),
+    _version(
+        "participants",
+        meeting_participants_association.c.user_id,
+        meeting_participants_association.c.meeting_id.in_(_user_meeting_ids),
+    ),
+)
+
+# Строка на участника (одна с NULL, если участников нет); состав
+# собирается в fetch_team_version
+_TEAM_VERSION = (
+    select(Team.admin_id, Team.version, Team.updated_at, User.id)
+    .outerjoin(User, User.team_id == Team.id)
+    .where(Team.id == bindparam("team_id"))
+    .order_by(User.id)
+)
+
+
+def _in_window(column):
+    return (column >= bindparam("start")) & (column < bindparam("end"))
+
+
+_CALENDAR_VERSION = union_all(
+    _version(
+        "tasks",
+        Task.id,
+        _in_window(Task.deadline) & or_(Task.assignee_id.in_(_team_members), Task.creator_id.in_(_team_members)),
+        Task.version,
+        Task.updated_at,
+    ),
+    _version(
+        "meetings",
+        Meeting.id,
+        _in_window(Meeting.start_time) & Meeting.id.in_(_user_meeting_ids),
+        Meeting.version,
+        Meeting.updated_at,
+    ),
+    _version("members", User.id, User.team_id == bindparam("team_id")),
+)
+
+
+async def _versions(db: AsyncSession, stmt, params: dict) -> tuple:
+    rows = await _rows(db, stmt, params, VersionRow)
+    return tuple(sorted(rows))
+
+
+async def fetch_tasks_version(db: AsyncSession, user_id: int, archived: bool = False) -> tuple:
+    """Версия списка задач пользователя вместе с комментариями и оценками."""
+    stmt = _USER_ARCHIVED_TASKS_VERSION if archived else _USER_TASKS_VERSION
+    return await _versions(db, stmt, {"user_id": user_id})
+
+
+async def fetch_meetings_version(db: AsyncSession, user_id: int) -> tuple:
+    """Версия списка встреч пользователя вместе с составом участников."""
+    return await _versions(db, _USER_MEETINGS_VERSION, {"user_id": user_id})
+
+
+async def fetch_team_version(db: AsyncSession, team_id: int) -> Optional[TeamVersionRow]:
+    """Версия команды и состава участников; None, если команды нет."""
+    rows = (await db.execute(_TEAM_VERSION, {"team_id": team_id})).all()
+    if not rows:
+        return None
+    admin_id, version, updated_at, _ = rows[0]
+    members = tuple(row[3] for row in rows if row[3] is not None)
+    return TeamVersionRow(admin_id, version, updated_at, members)
+
+
+async def fetch_calendar_version(
+    db: AsyncSession, team_id: int, user_id: int, date_from: date, date_to: date
+) -> tuple:
+    """
+    Версия календаря за даты [date_from, date_to]: задачи команды по дедлайну,
+    встречи пользователя по началу и состав команды. Окно расширено на сутки
+    в обе стороны: календарь сравнивает даты в часовом поясе сессии БД.
+    """
+    params = {
+        "team_id": team_id,
+        "user_id": user_id,
+        "start": datetime.combine(date_from - timedelta(days=1), time.min, tzinfo=timezone.utc),
+        "end": datetime.combine(date_to + timedelta(days=2), time.min, tzinfo=timezone.utc),
+    }
+    return await _versions(db, _CALENDAR_VERSION, params)
+
+
+# -------------------------------------------------------------------
+# Выгрузка (GET /export/{entity})
+# -------------------------------------------------------------------
+
+EXPORT_ENTITIES = ("tasks", "meetings", "evaluations")
+
+
+def _team_filter(stmt, column, team_id: Optional[int]):
+    if team_id is None:
+        return stmt
+    return stmt.where(column.in_(select(User.id).where(User.team_id == team_id)))
+
+
+def _period_filter(stmt, column, date_from: Optional[date], date_to: Optional[date]):
+    # Полуинтервал [date_from, date_to + 1 день) в UTC использует индекс по колонке
+    if date_from is not None:
+        stmt = stmt.where(column >= datetime.combine(date_from, time.min, tzinfo=timezone.utc))
+    if date_to is not None:
+        stmt = stmt.where(column < datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=timezone.utc))
+    return stmt
+
+
+def export_statement(
+    entity: str,
+    team_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """
+    Выражение выгрузки и тип строки для сущности.
+    Команда задачи и встречи — команда автора; оценки фильтруются по задачам команды.
+    Период — по created_at (задачи, оценки) или start_time (встречи).
+    """
+    if entity == "tasks":
+        stmt = _team_filter(select(*_columns(Task, TaskRow)), Task.creator_id, team_id)
+        return TaskRow, _period_filter(stmt, Task.created_at, date_from, date_to).order_by(Task.id)
+    if entity == "meetings":
+        stmt = _team_filter(select(*_columns(Meeting, MeetingRow)), Meeting.creator_id, team_id)
+        return MeetingRow, _period_filter(stmt, Meeting.start_time, date_from, date_to).order_by(Meeting.id)
+    if entity == "evaluations":
+        stmt = select(*_columns(Evaluation, EvaluationRow))
+        if team_id is not None:
+            stmt = stmt.where(Evaluation.task_id.in_(_team_filter(select(Task.id), Task.creator_id, team_id)))
+        return EvaluationRow, _period_filter(stmt, Evaluation.created_at, date_from, date_to).order_by(Evaluation.id)
+    raise ValueError(f"Неизвестная сущность выгрузки: {entity}")
+
+
+async def stream_rows(db: AsyncSession, stmt, row_type, batch_size: int = 1000) -> AsyncIterator[list]:
+    """
+    Построчная выборка серверным курсором пачками по batch_size.
+    В памяти одновременно находится не больше одной пачки.
+    """
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    async for partition in result.partitions(batch_size):
+        yield [row_type._make(row) for row in partition]
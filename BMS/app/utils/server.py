@@ -0,0 +1,202 @@
+"""
+Продакшн-запуск API (вместо uvicorn --reload в контейнере).
+
+    python -m app.utils.server                    # воркеры по квоте CPU
+    python -m app.utils.server --workers 4 --port 8000
+    python -m app.utils.server --print-config     # показать параметры и выйти
+
+  - uvloop и httptools, если установлены (uvicorn[standard]), иначе asyncio и h11;
+  - число воркеров — SERVER_WORKERS или квота CPU контейнера (cgroup v2/v1),
+    без квоты — доступные процессу ядра; не больше SERVER_MAX_WORKERS;
+  - keep-alive, backlog, мягкая остановка и access log — из SERVER_*;
+  - приложение импортируется в главном процессе до запуска воркеров:
+    ошибка настроек или импорта видна сразу, а не в каждом воркере
+    по очереди. Пулы БД каждый воркер прогревает в lifespan до приёма
+    трафика (app/core/warmup.py);
+  - несколько воркеров — метрики в multiprocess-режиме prometheus_client
+    (PROMETHEUS_MULTIPROC_DIR задаётся до импорта приложения, /metrics
+    любого воркера отдаёт сумму по всем, см. app/core/metrics.py);
+  - несколько воркеров — только с общим кэшем сущностей или без него
+    (cache.is_shared): LRU в каждом воркере отдавал бы устаревшие снимки;
+  - SIGTERM: uvicorn перестаёт принимать соединения, ждёт начатые запросы
+    до SERVER_GRACEFUL_TIMEOUT секунд, затем lifespan закрывает пулы БД.
+"""
+import argparse
+import importlib
+import importlib.util
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+APP_TARGET = "app.main:app"
+
+
+# -------------------------------------------------------------------
+# Ресурсы контейнера
+# -------------------------------------------------------------------
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_quota(cgroup_root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Квота CPU контейнера в ядрах (например, 1.5) или None, если не задана.
+    cgroup v2: cpu.max = "<quota> <period>" или "max <period>";
+    cgroup v1: cpu.cfs_quota_us (-1 — без квоты) и cpu.cfs_period_us.
+    """
+    v2 = _read(cgroup_root / "cpu.max")
+    if v2 is not None:
+        quota, _, period = v2.partition(" ")
+        if quota == "max" or not period:
+            return None
+        return int(quota) / int(period)
+
+    quota = _read(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+    period = _read(cgroup_root / "cpu" / "cpu.cfs_period_us")
+    if quota is None or period is None or int(quota) <= 0:
+        return None
+    return int(quota) / int(period)
+
+
+def available_cpus() -> int:
+    """Ядра, на которых процессу разрешено работать (affinity), иначе все."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count(config=settings, cgroup_root: Path = CGROUP_ROOT) -> int:
+    """
+    SERVER_WORKERS, если задано; иначе по одному воркеру на ядро квоты
+    (дробная квота округляется вверх: воркер большую часть времени ждёт БД).
+    """
+    if config.SERVER_WORKERS:
+        return config.SERVER_WORKERS
+    cpus = available_cpus()
+    quota = cpu_quota(cgroup_root)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, min(cpus, config.SERVER_MAX_WORKERS))
+
+
+# -------------------------------------------------------------------
+# Параметры uvicorn
+# -------------------------------------------------------------------
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def uvicorn_options(config=settings, host: str = "0.0.0.0", port: int = 8000,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+    """Аргументы uvicorn.run для продакшна: без reload и файлового наблюдателя."""
+    return {
+        "host": host,
+        "port": port,
+        "workers": workers or worker_count(config),
+        "loop": event_loop(),
+        "http": http_protocol(),
+        "lifespan": "on",
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEPALIVE_TIMEOUT,
+        "timeout_graceful_shutdown": config.SERVER_GRACEFUL_TIMEOUT,
+        "access_log": config.SERVER_ACCESS_LOG,
+        "proxy_headers": True,
+        "server_header": False,
+    }
+
+
+def connection_budget(config=settings, workers: int = 1) -> int:
+    """Сколько соединений с каждой БД могут открыть все воркеры вместе."""
+    from app.core.database import get_engine_profile
+
+    profile = get_engine_profile(config)
+    return workers * (profile["pool_size"] + profile["max_overflow"])
+
+
+def prepare_metrics_dir(config=settings, workers: int = 1) -> Optional[str]:
+    """
+    Для нескольких воркеров — каталог multiprocess-метрик в PROMETHEUS_MULTIPROC_DIR
+    (наследуется воркерами). Файлы прошлого запуска удаляются. Вызывать до
+    импорта prometheus_client: режим выбирается при его импорте.
+    """
+    if workers <= 1 or not config.METRICS_ENABLED:
+        return None
+    path = Path(
+        os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        or config.METRICS_MULTIPROC_DIR
+        or tempfile.mkdtemp(prefix="bms-metrics-")
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+    return str(path)
+
+
+def check_entity_cache(config=settings, workers: int = 1) -> None:
+    """SystemExit, если воркеров несколько, а кэш сущностей у каждого свой."""
+    from app.core.cache import is_shared
+
+    if workers > 1 and not is_shared(config):
+        raise SystemExit(
+            f"ENTITY_CACHE_BACKEND={config.ENTITY_CACHE_BACKEND} не общий для {workers} воркеров: "
+            "задайте external с ENTITY_CACHE_URL или off"
+        )
+
+
+# -------------------------------------------------------------------
+# Запуск
+# -------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Продакшн-запуск API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="по умолчанию — по квоте CPU")
+    parser.add_argument("--print-config", action="store_true", help="показать параметры и выйти")
+    opts = parser.parse_args()
+
+    options = uvicorn_options(settings, opts.host, opts.port, opts.workers)
+    summary = (
+        f"workers={options['workers']} loop={options['loop']} http={options['http']} "
+        f"keep-alive={options['timeout_keep_alive']}s backlog={options['backlog']} "
+        f"соединений с каждой БД до {connection_budget(settings, options['workers'])}"
+    )
+    if opts.print_config:
+        print(summary)
+        return
+    check_entity_cache(settings, options["workers"])
+    prepare_metrics_dir(settings, options["workers"])
+
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("server: %s", summary)
+    # Предзагрузка: ошибки импорта и настроек — до запуска воркеров
+    module_name, _, attr = APP_TARGET.partition(":")
+    app = getattr(importlib.import_module(module_name), attr)
+    # Один воркер работает в этом же процессе на уже загруженном приложении;
+    # несколько uvicorn запускает отдельными процессами по строке импорта
+    uvicorn.run(app if options["workers"] == 1 else APP_TARGET, **options)
+
+
+if __name__ == "__main__":
+    main()
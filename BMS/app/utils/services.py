@@ -1,74 +1,111 @@
-from datetime import date, datetime
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import bindparam, select, and_
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.user import User, UserRole
 from app.models.task import Task
 from app.models.team import Team
 from app.models.meeting import Meeting, meeting_participants_association
+from app.models import comment, evaluation  # noqa: F401 — нужны мапперу Task до сборки выражений
+from app.core.cache import entity_cache
+from app.core.dataloader import loaders_for
+from app.core.metrics import MEETING_CONFLICT_REJECTIONS
+from app.core.sharding import shard_of
+
+
+# -------------------------------------------------------------------
+# Предсобранные выражения для горячих запросов
+# -------------------------------------------------------------------
+# Выражения строятся один раз при импорте: ключ кэша компиляции
+# SQLAlchemy мемоизируется на объекте, а одинаковый SQL-текст
+# попадает в кэш подготовленных выражений asyncpg.
+# Загрузчики get_*_or_404 идут через entity_cache (app/core/cache.py):
+# после изменения сущности вьюсет обязан вызвать entity_cache.invalidate()
+# (для задач и встреч — с shard=shard_of(db): их id уникальны только в шарде).
+# Снимок в кэше может отставать от записи в другом процессе, поэтому пути
+# записи передают cached=False: проверки прав и данные для записи читаются
+# из БД в транзакции запроса (задача и встреча — с блокировкой строки).
+# Пользователи и команды читаются пакетно через loaders_for(db)
+# (app/core/dataloader.py): автор и исполнитель задачи — одним IN-запросом,
+# участники загруженной команды или встречи повторно не запрашиваются.
+
+_MEETING_BY_ID = (
+    select(Meeting)
+    .options(selectinload(Meeting.participants))
+    .where(Meeting.id == bindparam("meeting_id"))
+)
+
+_MEETING_FOR_UPDATE = _MEETING_BY_ID.with_for_update(of=Meeting).execution_options(populate_existing=True)
+
+_CONFLICTING_USERS = (
+    select(meeting_participants_association.c.user_id)
+    .join(Meeting, meeting_participants_association.c.meeting_id == Meeting.id)
+    .where(meeting_participants_association.c.user_id.in_(bindparam("user_ids", expanding=True)))
+    .where(and_(
+        Meeting.start_time < bindparam("end"),
+        Meeting.end_time > bindparam("start")
+    ))
+)
+_CONFLICTING_USERS_EXCLUDING = _CONFLICTING_USERS.where(
+    Meeting.id != bindparam("exclude_meeting_id")
+)
+
+_TASK_BY_ID = (
+    select(Task)
+    .options(
+        selectinload(Task.comments),
+        selectinload(Task.evaluations),
+    )
+    .where(Task.id == bindparam("task_id"))
+)
+_TASK_FOR_UPDATE = _TASK_BY_ID.with_for_update(of=Task).execution_options(populate_existing=True)
 
 
-async def get_tasks_for_date(
-    db: AsyncSession, team_id: int, target: date
-) -> List[Task]:
-    """
-    Получить задачи с дедлайном на конкретную дату,
-    фильтруя по команде (через assignee или creator).
-    """
-    stmt = (
-        select(Task)
-        .where(Task.deadline.isnot(None))
-        .where(func.date(Task.deadline) == target)
-        .where(
-            or_(
-                Task.assignee.has(team_id=team_id),
-                Task.creator.has(team_id=team_id)
-            )
-        )
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
-            selectinload(Task.creator),
-            selectinload(Task.assignee),
+async def _first(db: AsyncSession, stmt, params: dict):
+    result = await db.execute(stmt, params)
+    return result.scalars().first()
+
+
+def _cached(db: AsyncSession, kind: str, entity_id: int, load, cached: bool, shard: Optional[int] = None):
+    if not cached:
+        return load()
+    return entity_cache.get(db, kind, entity_id, load, shard=shard)
+
+
+async def _load_task(db: AsyncSession, task_id: int, stmt=_TASK_BY_ID) -> Optional[Task]:
+    task = await _first(db, stmt, {"task_id": task_id})
+    if task is not None:
+        users = await loaders_for(db).users.load_many(
+            user_id for user_id in (task.creator_id, task.assignee_id) if user_id is not None
         )
-    )
-    res = await db.execute(stmt)
-    return res.scalars().all()
+        set_committed_value(task, "creator", users.get(task.creator_id))
+        set_committed_value(task, "assignee", users.get(task.assignee_id))
+    return task
 
 
-async def get_meetings_for_date(
-    db: AsyncSession, user_id: int, target: date
-) -> List[Meeting]:
-    """
-    Получить встречи пользователя на конкретную дату.
-    """
-    stmt = (
-        select(Meeting)
-        .options(selectinload(Meeting.participants))
-        .where(func.date(Meeting.start_time) == target)
-        .join(Meeting.participants)
-        .where(Meeting.participants.any(id=user_id))
-    )
-    res = await db.execute(stmt)
-    return res.scalars().all()
+def _prime_users(db: AsyncSession, users: List[User]) -> None:
+    loader = loaders_for(db).users
+    for user in users:
+        loader.prime(user.id, user)
 
 
-async def get_meeting_or_404(meeting_id: int, db: AsyncSession) -> Meeting:
+async def get_meeting_or_404(meeting_id: int, db: AsyncSession, cached: bool = True) -> Meeting:
     """
     Получить встречу по ID или выбросить 404 ошибку.
+    cached=False — из БД с блокировкой строки (для записи).
     """
-    res = await db.execute(
-        select(Meeting)
-        .options(selectinload(Meeting.participants))
-        .where(Meeting.id == meeting_id)
+    stmt = _MEETING_BY_ID if cached else _MEETING_FOR_UPDATE
+    meeting = await _cached(
+        db, "meeting", meeting_id, lambda: _first(db, stmt, {"meeting_id": meeting_id}), cached, shard_of(db),
     )
-    meeting = res.scalars().first()
     if not meeting:
         raise HTTPException(status_code=404, detail="Встреча не найдена")
+    _prime_users(db, meeting.participants)
     return meeting
 
 
@@ -83,23 +120,18 @@ async def check_time_conflicts(
     Проверяет пересечения по времени для списка пользователей.
     Если хотя бы у одного есть пересечение — выбрасывает ошибку.
     """
-    stmt = (
-        select(meeting_participants_association.c.user_id)
-        .join(Meeting, meeting_participants_association.c.meeting_id == Meeting.id)
-        .where(meeting_participants_association.c.user_id.in_(user_ids))
-        .where(and_(
-            Meeting.start_time < end,
-            Meeting.end_time > start
-        ))
-    )
+    params = {"user_ids": list(user_ids), "start": start, "end": end}
+    stmt = _CONFLICTING_USERS
 
     if exclude_meeting_id:
-        stmt = stmt.where(Meeting.id != exclude_meeting_id)
+        stmt = _CONFLICTING_USERS_EXCLUDING
+        params["exclude_meeting_id"] = exclude_meeting_id
 
-    result = await db.execute(stmt)
+    result = await db.execute(stmt, params)
     busy_user_ids = result.scalars().all()
 
     if busy_user_ids:
+        MEETING_CONFLICT_REJECTIONS.inc()
         ids_str = ', '.join(map(str, set(busy_user_ids)))
         raise HTTPException(
             status_code=400,
@@ -107,36 +139,24 @@ async def check_time_conflicts(
         )
 
 
-async def get_team_or_404(team_id: int, db: AsyncSession) -> Team:
+async def get_team_or_404(team_id: int, db: AsyncSession, cached: bool = True) -> Team:
     """
     Получить команду по ID или выбросить 404 ошибку.
     """
-    result = await db.execute(
-        select(Team)
-        .options(selectinload(Team.members))
-        .where(Team.id == team_id)
-    )
-    team = result.scalars().first()
+    team = await _cached(db, "team", team_id, lambda: loaders_for(db).teams.load(team_id), cached)
     if not team:
         raise HTTPException(status_code=404, detail="Команда не найдена")
+    _prime_users(db, team.members)
     return team
 
 
-async def get_task_or_404(task_id: int, db: AsyncSession) -> Task:
+async def get_task_or_404(task_id: int, db: AsyncSession, cached: bool = True) -> Task:
     """
-    Получить задачу с комментариями и оценками по ID или выбросить 404 ошибку.
+    Получить задачу с комментариями, оценками, автором и исполнителем по ID
+    или выбросить 404 ошибку. cached=False — из БД с блокировкой строки (для записи).
     """
-    result = await db.execute(
-        select(Task)
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
-            selectinload(Task.creator),
-            selectinload(Task.assignee),
-        )
-        .where(Task.id == task_id)
-    )
-    task = result.scalars().first()
+    stmt = _TASK_BY_ID if cached else _TASK_FOR_UPDATE
+    task = await _cached(db, "task", task_id, lambda: _load_task(db, task_id, stmt), cached, shard_of(db))
     if not task:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     return task
@@ -151,12 +171,11 @@ def assert_team_admin_or_global_admin(current_user: User, team: Team) -> None:
         raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения операции")
 
 
-async def get_user_or_404(user_id: int, db: AsyncSession) -> User:
+async def get_user_or_404(user_id: int, db: AsyncSession, cached: bool = True) -> User:
     """
     Получить пользователя по ID или выбросить 404 ошибку.
     """
-    res = await db.execute(select(User).where(User.id == user_id))
-    user = res.scalars().first()
+    user = await _cached(db, "user", user_id, lambda: loaders_for(db).users.load(user_id), cached)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     return user
@@ -0,0 +1,57 @@
+"""
+Перебалансировка шардов: перенос команды на другой шард.
+
+Запуск из каталога BMS:
+    python -m app.utils.shard_rebalance --list
+    python -m app.utils.shard_rebalance --team 5 --to 1
+
+Перед переносом команда блокируется на DB_SHARD_PLACEMENT_TTL секунд,
+чтобы все процессы приложения перестали писать её данные на старый шард.
+Шарды должны выдавать непересекающиеся id (на PostgreSQL — последовательности
+с шагом N и разным началом), иначе перенос остановится на конфликте id.
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from sqlalchemy import func, select
+
+from app.core.sharding import shard_router
+from app.models.team import TeamShard
+
+
+async def placement_report() -> List[tuple]:
+    """Число команд на каждом шарде."""
+    async with shard_router.directory() as db:
+        rows = (await db.execute(
+            select(TeamShard.shard, func.count()).group_by(TeamShard.shard).order_by(TeamShard.shard)
+        )).all()
+    counts = dict(rows)
+    return [(index, counts.get(index, 0)) for index in range(len(shard_router.shards))]
+
+
+async def _main(opts) -> int:
+    if opts.list:
+        for index, teams in await placement_report():
+            print(f"шард {index}: команд {teams}")
+        return 0
+
+    moved = await shard_router.move_team(opts.team, opts.to)
+    print(f"Команда {opts.team} перенесена на шард {opts.to}, задач: {moved}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Перенос команды между шардами")
+    parser.add_argument("--list", action="store_true", help="показать распределение команд по шардам")
+    parser.add_argument("--team", type=int, help="ID команды")
+    parser.add_argument("--to", type=int, help="номер целевого шарда")
+    opts = parser.parse_args(argv)
+    if not opts.list and (opts.team is None or opts.to is None):
+        parser.error("нужны --team и --to (или --list)")
+    return asyncio.run(_main(opts))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
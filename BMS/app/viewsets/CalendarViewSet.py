@@ -3,7 +3,8 @@ from datetime import datetime, date
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.services import get_meetings_for_date, get_tasks_for_date
+from app.core.etag import weak_etag
+from app.utils.read_queries import fetch_calendar_version, fetch_team_tasks_for_date, fetch_user_meetings_for_date
 from app.models.user import User
 
 
@@ -12,17 +13,46 @@ class CalendarViewSet:
         self.current_user = current_user
         self.db = db
 
-    async def daily_calendar(self, target_date_str: str) -> str:
+    @staticmethod
+    def _parse_date(target_date_str: str) -> date:
         try:
-            d = datetime.fromisoformat(target_date_str).date()
+            return datetime.fromisoformat(target_date_str).date()
         except ValueError:
             raise HTTPException(status_code=400, detail="Неверный формат даты, ожидается YYYY-MM-DD")
 
+    @staticmethod
+    def _month_bounds(year: int, month: int) -> tuple:
+        if not 1 <= month <= 12:
+            raise HTTPException(status_code=400, detail="Месяц должен быть от 1 до 12")
+        _, days_in_month = pycal.monthrange(year, month)
+        return date(year, month, 1), date(year, month, days_in_month)
+
+    async def _etag(self, view: str, date_from: date, date_to: date) -> str:
+        if not self.current_user.team_id:
+            return weak_etag("calendar", view, self.current_user.id, None)
+        versions = await fetch_calendar_version(
+            self.db, self.current_user.team_id, self.current_user.id, date_from, date_to
+        )
+        return weak_etag("calendar", view, self.current_user.id, self.current_user.team_id, versions)
+
+    async def daily_etag(self, target_date_str: str) -> str:
+        """ETag дневного вида по версиям задач, встреч и состава команды."""
+        d = self._parse_date(target_date_str)
+        return await self._etag(f"daily:{d.isoformat()}", d, d)
+
+    async def monthly_etag(self, year: int, month: int) -> str:
+        """ETag месячного вида по версиям задач, встреч и состава команды."""
+        first, last = self._month_bounds(year, month)
+        return await self._etag(f"monthly:{first.isoformat()}", first, last)
+
+    async def daily_calendar(self, target_date_str: str) -> str:
+        d = self._parse_date(target_date_str)
+
         if not self.current_user.team_id:
             return "Вы не состоите в команде."
 
-        tasks = await get_tasks_for_date(self.db, self.current_user.team_id, d)
-        meetings = await get_meetings_for_date(self.db, self.current_user.id, d)
+        tasks = await fetch_team_tasks_for_date(self.db, self.current_user.team_id, d)
+        meetings = await fetch_user_meetings_for_date(self.db, self.current_user.id, d)
 
         lines = ["Время      | Тип     | Заголовок", "-" * 40]
 
@@ -40,20 +70,18 @@ class CalendarViewSet:
         return "\n".join(lines)
 
     async def monthly_calendar(self, year: int, month: int) -> str:
-        if not 1 <= month <= 12:
-            raise HTTPException(status_code=400, detail="Месяц должен быть от 1 до 12")
+        _, last = self._month_bounds(year, month)
 
         if not self.current_user.team_id:
             return "Вы не состоите в команде."
 
-        _, days_in_month = pycal.monthrange(year, month)
         header = "Дата       | Задач | Встреч"
         lines = [header, "-" * len(header)]
 
-        for day in range(1, days_in_month + 1):
+        for day in range(1, last.day + 1):
             d = date(year, month, day)
-            tasks = await get_tasks_for_date(self.db, self.current_user.team_id, d)
-            meetings = await get_meetings_for_date(self.db, self.current_user.id, d)
+            tasks = await fetch_team_tasks_for_date(self.db, self.current_user.team_id, d)
+            meetings = await fetch_user_meetings_for_date(self.db, self.current_user.id, d)
             lines.append(f"{d.isoformat():<10}| {len(tasks):^5} | {len(meetings):^6}")
 
         return "\n".join(lines)
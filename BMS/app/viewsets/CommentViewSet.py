@@ -1,21 +1,28 @@
 from typing import List
 from fastapi import HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import entity_cache
+from app.core.outbox import emit
+from app.core.serialization import compile_row_serializer
+from app.core.sharding import shard_of
+from app.utils.read_queries import CommentRow, fetch_task_comments
 from app.utils.services import get_task_or_404
 from app.models.comment import Comment
 from app.models.user import User, UserRole
 from app.schemas.comment import CommentCreate
 
 
+_serialize_comment = compile_row_serializer(CommentRow._fields[:-1], "serialize_comment")
+
+
 class CommentViewSet:
     def __init__(self, current_user: User, db: AsyncSession):
         self.current_user = current_user
         self.db = db
 
     async def add_comment(self, task_id: int, comment_in: CommentCreate) -> Comment:
-        task = await get_task_or_404(task_id, self.db)
+        task = await get_task_or_404(task_id, self.db, cached=False)
 
         if self.current_user.role != UserRole.ADMIN and self.current_user.team_id not in {
             task.creator.team_id, task.assignee.team_id
@@ -24,11 +31,14 @@ class CommentViewSet:
 
         comment = Comment(text=comment_in.text, author_id=self.current_user.id, task_id=task_id)
         self.db.add(comment)
+        await self.db.flush()
+        emit(self.db, "comment.created", comment.id, {"task_id": task_id, "author_id": self.current_user.id})
         await self.db.commit()
+        await entity_cache.invalidate("task", task_id, shard=shard_of(self.db))
         await self.db.refresh(comment)
         return comment
 
-    async def list_comments(self, task_id: int) -> List[Comment]:
-        stmt = select(Comment).where(Comment.task_id == task_id)
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+    async def list_comments(self, task_id: int) -> List[dict]:
+        """Комментарии задачи в виде готовых к JSON словарей (схема CommentRead)."""
+        rows = await fetch_task_comments(self.db, [task_id])
+        return [_serialize_comment(row) for row in rows]
\ No newline at end of file
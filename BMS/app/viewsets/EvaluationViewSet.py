@@ -3,6 +3,9 @@ from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import entity_cache
+from app.core.outbox import emit
+from app.core.sharding import shard_of
 from app.utils.services import get_task_or_404
 from app.models.evaluation import Evaluation
 from app.models.task import TaskStatus
@@ -16,7 +19,7 @@ class EvaluationViewSet:
         self.db = db
 
     async def add_evaluation(self, task_id: int, eval_in: EvaluationCreate) -> Evaluation:
-        task = await get_task_or_404(task_id, self.db)
+        task = await get_task_or_404(task_id, self.db, cached=False)
 
         if task.status != TaskStatus.DONE:
             raise HTTPException(400, detail="Задача ещё не завершена")
@@ -36,7 +39,10 @@ class EvaluationViewSet:
             task_id=task_id,
         )
         self.db.add(evaluation)
+        await self.db.flush()
+        emit(self.db, "evaluation.created", evaluation.id, {"task_id": task_id, "score": eval_in.score})
         await self.db.commit()
+        await entity_cache.invalidate("task", task_id, shard=shard_of(self.db))
         await self.db.refresh(evaluation)
         return evaluation
 
@@ -0,0 +1,80 @@
+from datetime import date
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.core.serialization import compile_row_serializer, csv_chunk, ndjson_chunk
+from app.core.sharding import SessionFactoriesResolver
+from app.models.user import User, UserRole
+from app.utils.read_queries import EvaluationRow, MeetingRow, TaskRow, export_statement, stream_rows
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Строк в одной пачке серверного курсора и одном куске ответа
+EXPORT_BATCH_SIZE = 1000
+
+# Сериализаторы NDJSON по типу строки — собираются один раз при импорте
+_SERIALIZERS = {
+    row_type: compile_row_serializer(row_type._fields, f"serialize_{row_type.__name__}")
+    for row_type in (TaskRow, MeetingRow, EvaluationRow)
+}
+
+
+class ExportViewSet:
+    def __init__(self, current_user: User, resolve_factories: SessionFactoriesResolver):
+        self.current_user = current_user
+        self.resolve_factories = resolve_factories
+
+    def _export_team(self, team_id: Optional[int]) -> Optional[int]:
+        """
+        Администратор выгружает любую команду или все сразу,
+        менеджер — только свою. Остальным выгрузка недоступна.
+        """
+        if self.current_user.role == UserRole.ADMIN:
+            return team_id
+        if self.current_user.role != UserRole.MANAGER or not self.current_user.team_id:
+            raise HTTPException(status_code=403, detail="Выгрузка доступна администраторам и менеджерам команд")
+        if team_id is not None and team_id != self.current_user.team_id:
+            raise HTTPException(status_code=403, detail="Можно выгружать только данные своей команды")
+        return self.current_user.team_id
+
+    async def export(
+        self,
+        entity: str,
+        fmt: str,
+        team_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Проверить доступ и параметры и вернуть генератор кусков ответа.
+        Ошибки (403/400/503) выбрасываются до начала стриминга.
+        """
+        if date_from and date_to and date_from > date_to:
+            raise HTTPException(status_code=400, detail="Начальная дата периода позже конечной")
+
+        team_id = self._export_team(team_id)
+        row_type, stmt = export_statement(entity, team_id, date_from, date_to)
+        factories = await self.resolve_factories(team_id)
+        return self._stream(factories, stmt, row_type, fmt)
+
+    async def _stream(self, factories: List[sessionmaker], stmt, row_type, fmt: str) -> AsyncIterator[bytes]:
+        serializer = _SERIALIZERS[row_type]
+        header = row_type._fields if fmt == "csv" else None
+
+        for factory in factories:
+            async with factory() as db:
+                async for rows in stream_rows(db, stmt, row_type, EXPORT_BATCH_SIZE):
+                    if fmt == "csv":
+                        yield csv_chunk(rows, header)
+                        header = None
+                    else:
+                        yield ndjson_chunk(rows, serializer)
+        if header is not None:
+            # Пустая выгрузка CSV — только заголовок
+            yield csv_chunk([], header)
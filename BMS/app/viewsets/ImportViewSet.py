@@ -0,0 +1,35 @@
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sharding import shard_router
+from app.models.user import User, UserRole
+from app.utils.bulk_import import DEFAULT_CHUNK_SIZE, import_records, read_records
+
+
+class ImportViewSet:
+    def __init__(self, current_user: User, db: AsyncSession):
+        self.current_user = current_user
+        self.db = db
+
+    async def import_file(
+        self,
+        entity: str,
+        upload: UploadFile,
+        fmt: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> dict:
+        if self.current_user.role != UserRole.ADMIN:
+            raise HTTPException(status_code=403, detail="Импорт доступен только администратору системы")
+
+        if fmt is None:
+            name = (upload.filename or "").lower()
+            fmt = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+
+        # UploadFile уже лежит во временном файле: читаем его потоком; чтение
+        # и валидация кусков идут в потоке, строки — на шарды команд
+        report = await import_records(
+            self.db, entity, read_records(upload.file, fmt), chunk_size, shard_router
+        )
+        return report.as_dict()
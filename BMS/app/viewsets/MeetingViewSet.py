@@ -1,40 +1,69 @@
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from sqlalchemy import delete, select, update
-from sqlalchemy.orm import selectinload
-
+from typing import Dict, List
+from sqlalchemy import delete, update
+
+from app.core.cache import entity_cache
+from app.core.dataloader import loaders_for
+from app.core.etag import weak_etag
+from app.core.outbox import emit
+from app.core.serialization import compile_row_serializer
+from app.core.sharding import check_same_team_users, shard_of
 from app.models.user import User, UserRole
 from app.schemas.meeting import MeetingRead, MeetingCreate, MeetingUpdate
+from app.utils.read_queries import (
+    MeetingRow,
+    fetch_meeting_participants,
+    fetch_meetings_version,
+    fetch_user_meetings,
+)
 from app.utils.services import get_meeting_or_404, check_time_conflicts
 from app.models.meeting import Meeting, meeting_participants_association
 
 
+_serialize_meeting = compile_row_serializer(MeetingRow._fields, "serialize_meeting")
+
+
+def _meeting_read(meeting: Meeting) -> MeetingRead:
+    return MeetingRead(
+        id=meeting.id,
+        title=meeting.title,
+        start_time=meeting.start_time,
+        end_time=meeting.end_time,
+        creator_id=meeting.creator_id,
+        participants=[user.id for user in meeting.participants],
+    )
+
+
 class MeetingViewSet:
     def __init__(self, current_user: User, db: AsyncSession):
         self.current_user = current_user
         self.db = db
 
-    async def list_meetings(self) -> List[MeetingRead]:
-        meetings_result = await self.db.execute(
-            select(Meeting)
-            .options(selectinload(Meeting.participants))
-            .join(meeting_participants_association)
-            .where(meeting_participants_association.c.user_id == self.current_user.id)
-        )
-        meetings = meetings_result.scalars().all()
-
-        return [
-            MeetingRead(
-                id=m.id,
-                title=m.title,
-                start_time=m.start_time,
-                end_time=m.end_time,
-                creator_id=m.creator_id,
-                participants=[user.id for user in m.participants],
-            )
-            for m in meetings
-        ]
+    async def list_meetings(self) -> List[dict]:
+        """
+        Встречи пользователя в виде готовых к JSON словарей (схема MeetingRead):
+        строки встреч и одна выборка участников через слой read_queries.
+        """
+        rows = await fetch_user_meetings(self.db, self.current_user.id)
+        if not rows:
+            return []
+
+        participants: Dict[int, List[int]] = {}
+        for pair in await fetch_meeting_participants(self.db, [row.id for row in rows]):
+            participants.setdefault(pair.meeting_id, []).append(pair.user_id)
+
+        result = []
+        for row in rows:
+            item = _serialize_meeting(row)
+            item["participants"] = participants.get(row.id, [])
+            result.append(item)
+        return result
+
+    async def list_meetings_etag(self) -> str:
+        """ETag списка встреч по версиям строк, без выборки самих встреч."""
+        versions = await fetch_meetings_version(self.db, self.current_user.id)
+        return weak_etag("meetings", self.current_user.id, versions)
 
     async def create_meeting(self, meeting_in: MeetingCreate) -> MeetingRead:
         if self.current_user.role != UserRole.MANAGER:
@@ -42,6 +71,7 @@ class MeetingViewSet:
 
         participants = set(meeting_in.participants)
         participants.add(self.current_user.id)
+        await check_same_team_users(self.current_user, participants)
 
         await check_time_conflicts(
             user_ids=list(participants),
@@ -50,8 +80,7 @@ class MeetingViewSet:
             db=self.db
         )
 
-        result = await self.db.execute(select(User).where(User.id.in_(participants)))
-        users = result.scalars().all()
+        users = list((await loaders_for(self.db).users.load_many(participants)).values())
         if len(users) != len(participants):
             raise HTTPException(status_code=404, detail="Один или несколько участников не найдены")
 
@@ -64,23 +93,20 @@ class MeetingViewSet:
         )
 
         self.db.add(meeting)
+        await self.db.flush()
+        emit(self.db, "meeting.created", meeting.id, {
+            **meeting_in.model_dump(mode="json"), "participants": sorted(participants),
+        })
         await self.db.commit()
         await self.db.refresh(meeting, attribute_names=["participants"])
 
-        return MeetingRead(
-            id=meeting.id,
-            title=meeting.title,
-            start_time=meeting.start_time,
-            end_time=meeting.end_time,
-            creator_id=meeting.creator_id,
-            participants=[user.id for user in meeting.participants],
-        )
+        return _meeting_read(meeting)
 
     async def update_meeting(self, meeting_id: int, meeting_in: MeetingUpdate) -> MeetingRead:
         if self.current_user.role != UserRole.MANAGER:
             raise HTTPException(status_code=403, detail="Только менеджер может обновлять встречи")
 
-        meeting = await get_meeting_or_404(meeting_id, self.db)
+        meeting = await get_meeting_or_404(meeting_id, self.db, cached=False)
 
         if meeting.creator_id != self.current_user.id:
             raise HTTPException(status_code=403, detail="Можно редактировать только свои встречи")
@@ -91,6 +117,12 @@ class MeetingViewSet:
         new_end = data.get("end_time", meeting.end_time)
         new_participant_ids = set(data.get("participants", [u.id for u in meeting.participants]))
         new_participant_ids.add(meeting.creator_id)
+        if "participants" in data:
+            await check_same_team_users(self.current_user, new_participant_ids)
+        previous = {
+            "previous_start_time": meeting.start_time,
+            "previous_participants": sorted(u.id for u in meeting.participants),
+        }
 
         await check_time_conflicts(
             user_ids=list(new_participant_ids),
@@ -123,26 +155,30 @@ class MeetingViewSet:
                 )
             )
 
+        emit(self.db, "meeting.updated", meeting_id, {
+            **meeting_in.model_dump(mode="json", exclude_none=True),
+            "participants": sorted(new_participant_ids),
+            **previous,
+        })
         await self.db.commit()
+        await entity_cache.invalidate("meeting", meeting_id, shard=shard_of(self.db))
         updated = await get_meeting_or_404(meeting_id, self.db)
-        return MeetingRead(
-            id=updated.id,
-            title=updated.title,
-            start_time=updated.start_time,
-            end_time=updated.end_time,
-            creator_id=updated.creator_id,
-            participants=[user.id for user in updated.participants],
-        )
+        return _meeting_read(updated)
 
     async def delete_meeting(self, meeting_id: int) -> None:
         if self.current_user.role != UserRole.MANAGER:
             raise HTTPException(status_code=403, detail="Только менеджер может удалять встречи")
 
-        meeting = await get_meeting_or_404(meeting_id, self.db)
+        meeting = await get_meeting_or_404(meeting_id, self.db, cached=False)
 
         if meeting.creator_id != self.current_user.id:
             raise HTTPException(status_code=403, detail="Можно удалять только свои встречи")
 
+        payload = {
+            "start_time": meeting.start_time,
+            "participants": sorted(u.id for u in meeting.participants),
+        }
+
         await self.db.execute(
             delete(meeting_participants_association)
             .where(meeting_participants_association.c.meeting_id == meeting_id)
@@ -152,4 +188,6 @@ class MeetingViewSet:
             delete(Meeting).where(Meeting.id == meeting_id)
         )
 
+        emit(self.db, "meeting.deleted", meeting_id, payload)
         await self.db.commit()
+        await entity_cache.invalidate("meeting", meeting_id, shard=shard_of(self.db))
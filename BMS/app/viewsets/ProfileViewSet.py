@@ -1,8 +1,12 @@
 from datetime import date, datetime
 from fastapi import HTTPException
-from sqlalchemy import func, select
+from sqlalchemy import func, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import entity_cache
+from app.core.etag import weak_etag
+from app.core.sharding import shard_router
+from app.models.archive import EvaluationArchive, TaskArchive
 from app.models.task import Task
 from app.models.evaluation import Evaluation
 from app.models.team import Team
@@ -18,6 +22,13 @@ class ProfileViewSet:
     async def get_my_profile(self) -> User:
         return self.user
 
+    def profile_etag(self) -> str:
+        """ETag профиля по полям UserRead; пользователь уже загружен аутентификацией."""
+        user = self.user
+        return weak_etag(
+            "me", user.id, user.email, user.is_active, user.is_superuser, user.is_verified, user.role, user.team_id
+        )
+
     async def update_profile(self, user_update: UserUpdate) -> User:
         for field, value in user_update.dict(exclude_unset=True).items():
             setattr(self.user, field, value)
@@ -25,11 +36,19 @@ class ProfileViewSet:
         self.session.add(self.user)
         await self.session.commit()
         await self.session.refresh(self.user)
+        await entity_cache.invalidate_member(self.user.id, self.user.team_id)
+        if self.user.team_id:
+            await shard_router.sync_team(self.user.team_id)
         return self.user
 
     async def delete_profile(self) -> None:
+        user_id, team_id = self.user.id, self.user.team_id
         await self.session.delete(self.user)
         await self.session.commit()
+        # Каскадом удаляются команды, где он админ, и его участие во встречах
+        await entity_cache.invalidate_member(user_id, team_id)
+        await entity_cache.invalidate_kind("team")
+        await entity_cache.invalidate_kind("meeting")
 
     async def join_team_by_code(self, code: str) -> dict:
         if self.user.team_id:
@@ -47,6 +66,8 @@ class ProfileViewSet:
         self.session.add(self.user)
         await self.session.commit()
         await self.session.refresh(self.user)
+        await entity_cache.invalidate_member(self.user.id, team.id)
+        await shard_router.sync_team(team.id)
 
         return {"message": f"Вы успешно присоединились к команде '{team.name}'."}
 
@@ -56,15 +77,27 @@ class ProfileViewSet:
 
         date_to_datetime = datetime.combine(date_to, datetime.max.time())
 
-        stmt = (
-            select(func.avg(Evaluation.score))
+        date_from_datetime = datetime.combine(date_from, datetime.min.time())
+
+        # Оценки по рабочим и архивным задачам
+        scores = union_all(
+            select(Evaluation.score.label("score"))
             .join(Task, Evaluation.task_id == Task.id)
             .where(
                 Task.assignee_id == self.user.id,
-                Evaluation.created_at >= datetime.combine(date_from, datetime.min.time()),
+                Evaluation.created_at >= date_from_datetime,
                 Evaluation.created_at <= date_to_datetime,
-            )
-        )
+            ),
+            select(EvaluationArchive.score.label("score"))
+            .join(TaskArchive, EvaluationArchive.task_id == TaskArchive.id)
+            .where(
+                TaskArchive.assignee_id == self.user.id,
+                EvaluationArchive.created_at >= date_from_datetime,
+                EvaluationArchive.created_at <= date_to_datetime,
+            ),
+        ).subquery()
+
+        stmt = select(func.avg(scores.c.score))
         result = await self.session.execute(stmt)
         average = result.scalar()
 
@@ -1,39 +1,128 @@
-from typing import List
+from typing import List, Union
 from fastapi import HTTPException
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import entity_cache
+from app.core.dataloader import loaders_for
+from app.core.etag import weak_etag
+from app.core.outbox import emit
+from app.core.serialization import compile_row_serializer, group_rows
+from app.core.sharding import check_same_team_users, shard_of
+from app.utils.read_queries import (
+    CommentRow,
+    EvaluationRow,
+    TaskRow,
+    fetch_task_comments,
+    fetch_task_evaluations,
+    fetch_tasks_version,
+    fetch_user_tasks,
+)
 from app.utils.services import get_task_or_404
+from app.models.archive import TaskArchive
 from app.models.task import Task
 from app.models.user import User, UserRole
 from app.schemas.task import TaskCreate, TaskUpdate
 
 
+# -------------------------------------------------------------------
+# Сериализаторы строк слоя чтения (поля TaskRead/CommentRead/EvaluationRead)
+# -------------------------------------------------------------------
+
+_serialize_task = compile_row_serializer(TaskRow._fields, "serialize_task")
+_serialize_comment = compile_row_serializer(CommentRow._fields[:-1], "serialize_comment")
+_serialize_evaluation = compile_row_serializer(EvaluationRow._fields[:-1], "serialize_evaluation")
+
+
 class TaskViewSet:
     def __init__(self, current_user: User, db: AsyncSession):
         self.current_user = current_user
         self.db = db
 
-    async def list_tasks(self) -> List[Task]:
+    async def list_tasks(self, include_archived: bool = False) -> List[dict]:
+        """
+        Задачи пользователя в виде готовых к JSON словарей (схема TaskRead).
+        Строки читаются слоем read_queries без ORM-объектов и моделей Pydantic.
+        """
         if not self.current_user.team_id:
             return []
 
-        stmt = (
+        tasks = await self._task_rows(archived=False)
+        if include_archived:
+            tasks.extend(await self._task_rows(archived=True))
+        return tasks
+
+    async def list_tasks_etag(self, include_archived: bool = False) -> str:
+        """ETag списка задач по версиям строк, без выборки самих задач."""
+        if not self.current_user.team_id:
+            return weak_etag("tasks", self.current_user.id, None)
+
+        versions = await fetch_tasks_version(self.db, self.current_user.id)
+        if include_archived:
+            versions += await fetch_tasks_version(self.db, self.current_user.id, archived=True)
+        return weak_etag("tasks", self.current_user.id, versions)
+
+    async def _task_rows(self, archived: bool) -> List[dict]:
+        rows = await fetch_user_tasks(self.db, self.current_user.id, archived)
+        if not rows:
+            return []
+
+        task_ids = [row.id for row in rows]
+        comments = group_rows(await fetch_task_comments(self.db, task_ids, archived), _serialize_comment)
+        evaluations = group_rows(await fetch_task_evaluations(self.db, task_ids, archived), _serialize_evaluation)
+
+        result = []
+        for row in rows:
+            item = _serialize_task(row)
+            item["comments"] = comments.get(row.id, [])
+            item["evaluations"] = evaluations.get(row.id, [])
+            item["archived"] = archived
+            result.append(item)
+        return result
+
+    async def get_task(self, task_id: int) -> Union[Task, TaskArchive]:
+        """Задача по ID: сначала из рабочей таблицы, затем из архива."""
+        result = await self.db.execute(
             select(Task)
-            .where(
-                (Task.assignee_id == self.current_user.id) |
-                (Task.creator_id == self.current_user.id)
-            )
             .options(
                 selectinload(Task.comments),
-                selectinload(Task.evaluations)
+                selectinload(Task.evaluations),
             )
+            .where(Task.id == task_id)
         )
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+        task = result.scalars().first()
+        if task is None:
+            result = await self.db.execute(
+                select(TaskArchive)
+                .options(
+                    selectinload(TaskArchive.comments),
+                    selectinload(TaskArchive.evaluations),
+                )
+                .where(TaskArchive.id == task_id)
+            )
+            task = result.scalars().first()
+        if task is None:
+            raise HTTPException(status_code=404, detail="Задача не найдена")
+
+        if self.current_user.role != UserRole.ADMIN and self.current_user.id not in {
+            task.creator_id, task.assignee_id
+        }:
+            users = await loaders_for(self.db).users.load_many(
+                user_id for user_id in (task.creator_id, task.assignee_id) if user_id is not None
+            )
+            teams = {user.team_id for user in users.values()}
+            if self.current_user.team_id is None or self.current_user.team_id not in teams:
+                raise HTTPException(403, detail="Нет доступа к задаче")
+        return task
+
+    async def _team_ids(self, *user_ids) -> List[int]:
+        """Команды автора и исполнителя: их участники видят задачу в календаре."""
+        users = await loaders_for(self.db).users.load_many(uid for uid in user_ids if uid is not None)
+        return sorted({user.team_id for user in users.values() if user.team_id is not None})
 
     async def create_task(self, task_in: TaskCreate) -> Task:
+        await check_same_team_users(self.current_user, [task_in.assignee_id])
         task = Task(
             title=task_in.title,
             description=task_in.description,
@@ -43,6 +132,11 @@ class TaskViewSet:
             status=task_in.status,
         )
         self.db.add(task)
+        await self.db.flush()
+        payload = {**task_in.model_dump(mode="json"), "creator_id": self.current_user.id}
+        if task_in.deadline is not None:
+            payload["team_ids"] = await self._team_ids(self.current_user.id, task_in.assignee_id)
+        emit(self.db, "task.created", task.id, payload)
         await self.db.commit()
 
         result = await self.db.execute(
@@ -57,7 +151,7 @@ class TaskViewSet:
         return task
 
     async def update_task(self, task_id: int, task_in: TaskUpdate) -> Task:
-        task = await get_task_or_404(task_id, self.db)
+        task = await get_task_or_404(task_id, self.db, cached=False)
 
         same_team = task.creator.team_id == self.current_user.team_id
         is_author = task.creator_id == self.current_user.id
@@ -68,8 +162,17 @@ class TaskViewSet:
             raise HTTPException(403, detail="Нет прав на изменение задачи")
 
         data = task_in.model_dump(exclude_none=True)
+        await check_same_team_users(self.current_user, [data.get("assignee_id")])
+        payload = task_in.model_dump(mode="json", exclude_none=True)
+        if task.deadline is not None or "deadline" in data:
+            payload["previous_deadline"] = task.deadline
+            payload["team_ids"] = await self._team_ids(
+                task.creator_id, task.assignee_id, data.get("assignee_id")
+            )
         await self.db.execute(update(Task).where(Task.id == task_id).values(**data))
+        emit(self.db, "task.updated", task_id, payload)
         await self.db.commit()
+        await entity_cache.invalidate("task", task_id, shard=shard_of(self.db))
 
         result = await self.db.execute(
             select(Task)
@@ -83,10 +186,15 @@ class TaskViewSet:
         return task
 
     async def delete_task(self, task_id: int) -> None:
-        task = await get_task_or_404(task_id, self.db)
+        task = await get_task_or_404(task_id, self.db, cached=False)
 
         if self.current_user.role != UserRole.ADMIN and task.creator_id != self.current_user.id:
             raise HTTPException(403, detail="Нет прав на удаление задачи")
 
+        payload = {}
+        if task.deadline is not None:
+            payload = {"deadline": task.deadline, "team_ids": await self._team_ids(task.creator_id, task.assignee_id)}
         await self.db.execute(delete(Task).where(Task.id == task_id))
+        emit(self.db, "task.deleted", task_id, payload)
         await self.db.commit()
+        await entity_cache.invalidate("task", task_id, shard=shard_of(self.db))
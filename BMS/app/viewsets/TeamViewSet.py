@@ -2,6 +2,10 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update
 
+from app.core.cache import entity_cache
+from app.core.etag import weak_etag
+from app.core.sharding import shard_router
+from app.utils.read_queries import fetch_team_version
 from app.utils.services import assert_team_admin_or_global_admin, get_team_or_404, get_user_or_404
 from app.models.team import Team
 from app.models.user import User, UserRole
@@ -48,29 +52,45 @@ class TeamViewSet:
             members=[u.id for u in team.members]
         )
 
+    async def read_team_etag(self, team_id: int) -> str:
+        """
+        ETag команды по версии строки и составу участников.
+        Права проверяются здесь же: 304 не должен раскрывать чужую команду.
+        """
+        version = await fetch_team_version(self.db, team_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Команда не найдена")
+        assert_team_admin_or_global_admin(self.current_user, version)
+        return weak_etag("team", team_id, tuple(version))
+
     async def add_member(self, team_id: int, member_in: TeamMemberAdd) -> None:
-        team = await get_team_or_404(team_id, self.db)
+        team = await get_team_or_404(team_id, self.db, cached=False)
         assert_team_admin_or_global_admin(self.current_user, team)
 
-        user = await get_user_or_404(member_in.user_id, self.db)
+        user = await get_user_or_404(member_in.user_id, self.db, cached=False)
+        previous_team_id = user.team_id
         team.members.append(user)
         await self.db.commit()
+        await entity_cache.invalidate_member(user.id, team_id, previous_team_id)
+        await shard_router.sync_team(team_id)
 
     async def remove_member(self, team_id: int, user_id: int) -> None:
-        team = await get_team_or_404(team_id, self.db)
+        team = await get_team_or_404(team_id, self.db, cached=False)
         assert_team_admin_or_global_admin(self.current_user, team)
 
-        user = await get_user_or_404(user_id, self.db)
+        user = await get_user_or_404(user_id, self.db, cached=False)
 
         if user in team.members:
             team.members.remove(user)
             await self.db.commit()
+            await entity_cache.invalidate_member(user_id, team_id)
+            await shard_router.sync_team(team_id)
 
     async def update_member_role(self, team_id: int, user_id: int, role_in: TeamMemberRoleUpdate) -> None:
-        team = await get_team_or_404(team_id, self.db)
+        team = await get_team_or_404(team_id, self.db, cached=False)
         assert_team_admin_or_global_admin(self.current_user, team)
 
-        user = await get_user_or_404(user_id, self.db)
+        user = await get_user_or_404(user_id, self.db, cached=False)
 
         if user.team_id != team_id:
             raise HTTPException(status_code=400, detail="Пользователь не состоит в этой команде")
@@ -82,3 +102,5 @@ class TeamViewSet:
             update(User).where(User.id == user_id).values(role=role_in.role)
         )
         await self.db.commit()
+        await entity_cache.invalidate_member(user_id, team_id)
+        await shard_router.sync_team(team_id)
@@ -0,0 +1,97 @@
+"""
+Микробенчмарк: память и время чтения списка задач пользователя.
+
+Сравнивает загрузку ORM-объектов (select(Task) с selectinload
+комментариев и оценок, как было в list_tasks) со слоем чтения
+app/utils/read_queries.py (колонки Core → именованные кортежи).
+Пиковая память измеряется tracemalloc, данные — синхронный SQLite в памяти.
+
+Запуск из каталога BMS:
+    python -m bench.bench_read_path [--tasks 10000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.database import Base
+from app.models import team  # noqa: F401 — нужна для внешнего ключа users.team_id
+from app.models.comment import Comment
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.utils import read_queries
+from app.utils.read_queries import CommentRow, TaskRow
+
+
+def orm_path(session, user_id):
+    stmt = (
+        select(Task)
+        .where((Task.assignee_id == user_id) | (Task.creator_id == user_id))
+        .options(selectinload(Task.comments), selectinload(Task.evaluations))
+    )
+    tasks = session.execute(stmt).scalars().all()
+    return tasks
+
+
+def rows_path(session, user_id):
+    tasks = [TaskRow._make(r) for r in session.execute(read_queries._USER_TASKS, {"user_id": user_id})]
+    ids = [t.id for t in tasks]
+    comments = [CommentRow._make(r) for r in session.execute(read_queries._TASK_COMMENTS, {"task_ids": ids})]
+    evaluations = list(session.execute(read_queries._TASK_EVALUATIONS, {"task_ids": ids}))
+    return tasks, comments, evaluations
+
+
+def measure(engine, func, user_id):
+    with Session(engine) as session:
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func(session, user_id)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10000)
+    opts = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.MANAGER,
+                    is_active=True, is_superuser=False, is_verified=True)
+        session.add(user)
+        session.flush()
+        now = datetime(2025, 1, 1)
+        session.execute(insert(Task), [
+            {"title": f"task {i}", "description": "описание", "creator_id": user.id, "assignee_id": user.id,
+             "status": TaskStatus.OPEN, "created_at": now, "deadline": now}
+            for i in range(opts.tasks)
+        ])
+        session.execute(insert(Comment), [
+            {"text": "комментарий", "author_id": user.id, "task_id": i + 1, "created_at": now}
+            for i in range(opts.tasks)
+        ])
+        session.commit()
+        user_id = user.id
+
+    # прогрев кэшей компиляции
+    measure(engine, orm_path, user_id)
+    measure(engine, rows_path, user_id)
+
+    print(f"{'path':<8}{'ms':>10}{'peak MiB':>12}")
+    for name, func in (("orm", orm_path), ("rows", rows_path)):
+        ms, mib = measure(engine, func, user_id)
+        print(f"{name:<8}{ms:>10.1f}{mib:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
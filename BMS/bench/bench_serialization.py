@@ -0,0 +1,117 @@
+"""
+Микробенчмарк: время сериализации списка задач на 10 000 строк.
+
+Сравнивает:
+  - pydantic — TaskRead.model_validate по атрибутам объектов
+    и json.dumps(jsonable_encoder(...)), как делает FastAPI с response_model;
+  - pydantic-json — то же, но с TypeAdapter(List[TaskRead]).dump_json;
+  - rows+orjson — предкомпилированный сериализатор строк Core и orjson.
+
+Данные синтетические (без БД), по два комментария и одной оценке на задачу.
+
+Запуск из каталога BMS:
+    python -m bench.bench_serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.serialization import dumps, group_rows
+from app.models.task import TaskStatus
+from app.schemas.task import TaskRead
+from app.viewsets.TaskViewSet import _serialize_comment, _serialize_evaluation, _serialize_task
+
+
+def make_rows(count: int):
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    tasks = [
+        (i, f"task {i}", "описание задачи", TaskStatus.OPEN, 1, 2, now, now + timedelta(days=i % 30))
+        for i in range(count)
+    ]
+    comments = [
+        (i * 2 + k, "комментарий", 1, now, i)
+        for i in range(count) for k in range(2)
+    ]
+    evaluations = [(i, 5, 1, now, i) for i in range(count)]
+    return tasks, comments, evaluations
+
+
+def as_objects(tasks, comments, evaluations):
+    """Объекты с атрибутами — то, что раньше валидировалось из ORM."""
+    by_task = {}
+    for c in comments:
+        by_task.setdefault(c[4], {"comments": [], "evaluations": []})["comments"].append(
+            SimpleNamespace(id=c[0], text=c[1], author_id=c[2], created_at=c[3]))
+    for e in evaluations:
+        by_task.setdefault(e[4], {"comments": [], "evaluations": []})["evaluations"].append(
+            SimpleNamespace(id=e[0], score=e[1], evaluator_id=e[2], created_at=e[3]))
+    fields = ["id", "title", "description", "status", "creator_id", "assignee_id", "created_at", "deadline"]
+    return [
+        SimpleNamespace(**dict(zip(fields, row)), archived=False, **by_task.get(row[0], {}))
+        for row in tasks
+    ]
+
+
+def pydantic_path(objects):
+    models = [TaskRead.model_validate(obj) for obj in objects]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+_adapter = TypeAdapter(List[TaskRead])
+
+
+def pydantic_json_path(objects):
+    return _adapter.dump_json(_adapter.validate_python(objects, from_attributes=True))
+
+
+def rows_path(tasks, comments, evaluations):
+    grouped_comments = group_rows(comments, _serialize_comment)
+    grouped_evaluations = group_rows(evaluations, _serialize_evaluation)
+    result = []
+    for row in tasks:
+        item = _serialize_task(row)
+        item["comments"] = grouped_comments.get(row[0], [])
+        item["evaluations"] = grouped_evaluations.get(row[0], [])
+        item["archived"] = False
+        result.append(item)
+    return dumps(result)
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    tasks, comments, evaluations = make_rows(opts.rows)
+    objects = as_objects(tasks, comments, evaluations)
+    assert json.loads(rows_path(tasks, comments, evaluations)) == json.loads(pydantic_json_path(objects))
+
+    results = [
+        ("pydantic", best_of(opts.repeat, pydantic_path, objects)),
+        ("pydantic-json", best_of(opts.repeat, pydantic_json_path, objects)),
+        ("rows+orjson", best_of(opts.repeat, rows_path, tasks, comments, evaluations)),
+    ]
+    baseline = results[0][1]
+    print(f"{'path':<16}{'ms / ' + str(opts.rows) + ' rows':>18}{'speedup':>10}")
+    for name, ms in results:
+        print(f"{name:<16}{ms:>18.1f}{baseline / ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
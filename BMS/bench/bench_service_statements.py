@@ -0,0 +1,100 @@
+"""
+Микробенчмарк: накладные расходы Python на вызов горячих запросов сервисов.
+
+Сравнивает построение select() на каждый вызов (как было раньше)
+с предсобранными выражениями из app/utils/services.py.
+Запросы выполняются на синхронном SQLite в памяти, чтобы время
+драйвера было минимальным и разница в подготовке была видна.
+
+Запуск из каталога BMS:
+    python -m bench.bench_service_statements [--calls 5000]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, create_engine, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.database import Base
+from app.models.meeting import Meeting, meeting_participants_association
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.utils import services
+
+
+def inline_task(task_id):
+    # Те же связи, что у services._TASK_BY_ID: автора и исполнителя
+    # сервис догружает через DataLoader, в сравнение они не входят
+    return (
+        select(Task)
+        .options(
+            selectinload(Task.comments),
+            selectinload(Task.evaluations),
+        )
+        .where(Task.id == task_id)
+    ), None
+
+
+def prebuilt_task(task_id):
+    return services._TASK_BY_ID, {"task_id": task_id}
+
+
+def inline_conflicts(user_ids, start, end):
+    return (
+        select(meeting_participants_association.c.user_id)
+        .join(Meeting, meeting_participants_association.c.meeting_id == Meeting.id)
+        .where(meeting_participants_association.c.user_id.in_(user_ids))
+        .where(and_(Meeting.start_time < end, Meeting.end_time > start))
+    ), None
+
+
+def prebuilt_conflicts(user_ids, start, end):
+    return services._CONFLICTING_USERS, {"user_ids": user_ids, "start": start, "end": end}
+
+
+def run(session, factory, args, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        stmt, params = factory(*args)
+        session.execute(stmt, params).all()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    opts = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime(2025, 1, 1, 12)
+
+    with Session(engine) as session:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.MANAGER,
+                    is_active=True, is_superuser=False, is_verified=True)
+        session.add(user)
+        session.flush()
+        task = Task(title="bench", creator_id=user.id, assignee_id=user.id, status=TaskStatus.OPEN)
+        session.add(task)
+        session.add(Meeting(title="bench", start_time=now, end_time=now + timedelta(hours=1),
+                            creator_id=user.id, participants=[user]))
+        session.commit()
+
+        cases = [
+            ("get_task_or_404", inline_task, prebuilt_task, (task.id,)),
+            ("check_time_conflicts", inline_conflicts, prebuilt_conflicts,
+             ([user.id], now, now + timedelta(minutes=30))),
+        ]
+        print(f"{'query':<24}{'inline, µs':>14}{'prebuilt, µs':>16}{'speedup':>10}")
+        for name, inline, prebuilt, args in cases:
+            # прогрев кэшей компиляции
+            run(session, inline, args, 50)
+            run(session, prebuilt, args, 50)
+            before = run(session, inline, args, opts.calls)
+            after = run(session, prebuilt, args, opts.calls)
+            print(f"{name:<24}{before:>14.1f}{after:>16.1f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
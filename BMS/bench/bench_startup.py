@@ -0,0 +1,82 @@
+"""
+Бенчмарк холодного старта: время от запуска интерпретатора до готового
+объекта приложения (import app.main → create_app()).
+
+Каждый замер — отдельный процесс python, поэтому кэш модулей не помогает
+(кэш байткода .pyc — помогает, как и при реальном старте воркера).
+Сценарии:
+  - no-admin    — ADMIN_ENABLED=false (как MODE=PROD);
+  - lazy-admin  — админка смонтирована, но ещё не собрана;
+  - eager-admin — админка собрана сразу (как было до ленивого монтирования).
+С --importtime печатает самые дорогие модули по данным python -X importtime.
+
+Запуск из каталога BMS:
+    python -m bench.bench_startup [--runs 10] [--importtime 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BMS_DIR = Path(__file__).resolve().parents[1]
+
+SCENARIOS = (
+    ("no-admin", {"ADMIN_ENABLED": "false"}, "import app.main"),
+    ("lazy-admin", {"ADMIN_ENABLED": "true"}, "import app.main"),
+    ("eager-admin", {"ADMIN_ENABLED": "true"}, "import app.main; app.main.app.state.admin.load()"),
+)
+
+
+def run_once(code, env, *flags):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BMS_DIR, env=dict(os.environ, **env), capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    return elapsed * 1000, result.stderr
+
+
+def import_profile(env, top):
+    """Модули с наибольшим суммарным временем импорта (мкс → мс)."""
+    _, stderr = run_once("import app.main", env, "-X", "importtime")
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Вложенность показана отступом по два пробела; берём модули двух верхних уровней
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if cumulative.strip().isdigit() and depth <= 1:
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [(us / 1000, name) for us, name in rows[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=0, metavar="TOP")
+    opts = parser.parse_args()
+
+    # прогрев: .pyc и файловый кэш ОС
+    run_once("import app.main", {"ADMIN_ENABLED": "true"})
+
+    print(f"{'scenario':<14}{'min ms':>10}{'median ms':>12}")
+    for name, env, code in SCENARIOS:
+        timings = [run_once(code, env)[0] for _ in range(opts.runs)]
+        print(f"{name:<14}{min(timings):>10.1f}{statistics.median(timings):>12.1f}")
+
+    if opts.importtime:
+        print(f"\n{'cumulative ms':>14}  module (два верхних уровня импорта)")
+        for ms, module in import_profile({"ADMIN_ENABLED": "false"}, opts.importtime):
+            print(f"{ms:>14.1f}  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,4 +10,4 @@ echo "✅ Database is up — running migrations"
 alembic upgrade head
 
 echo "🚀 Starting FastAPI"
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
+exec python -m app.utils.server --host 0.0.0.0 --port 8000
\ No newline at end of file
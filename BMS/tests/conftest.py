@@ -5,7 +5,9 @@ import pytest_asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from app.core.database import get_async_session, Base  # import Base from your models
+from app.core.cache import LRUCache, entity_cache
+from app.core.database import get_async_session, get_read_session, Base  # import Base from your models
+from app.core.sharding import get_read_session_factories, get_team_read_session, get_team_session
 from app.main import app
 
 # 2) In-memory SQLite URL
@@ -28,6 +30,17 @@ async def init_test_db():
     await engine_test.dispose()
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def clear_entity_cache(monkeypatch):
+    """
+    Тесты идут в одном процессе — кэш сущностей включён (LRU).
+    Id в базе в памяти повторяются между тестами — кэш у каждого теста свой.
+    """
+    monkeypatch.setattr(entity_cache, "backend", LRUCache(10_000))
+    monkeypatch.setattr(entity_cache, "ttl", 30.0)
+    yield
+
+
 @pytest_asyncio.fixture
 async def db_session(init_test_db) -> AsyncSession:
     """Каждый тест получает свою сессию на тот же движок."""
@@ -44,6 +57,14 @@ def override_db_dependency(db_session: AsyncSession):
         yield db_session
 
     app.dependency_overrides[get_async_session] = _get_test_session
+    app.dependency_overrides[get_read_session] = _get_test_session
+    app.dependency_overrides[get_team_session] = _get_test_session
+    app.dependency_overrides[get_team_read_session] = _get_test_session
+
+    async def _test_factories(team_id):
+        return [TestSessionLocal]
+
+    app.dependency_overrides[get_read_session_factories] = lambda: _test_factories
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.main import create_app
+
+
+BMS_DIR = Path(__file__).resolve().parents[2]
+
+
+def _run(code: str, cwd: Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=str(BMS_DIR))
+    return subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def test_admin_enabled_by_mode():
+    assert settings.model_copy(update={"MODE": "DEV"}).ADMIN_ENABLED_effective
+    assert not settings.model_copy(update={"MODE": "prod"}).ADMIN_ENABLED_effective
+    assert settings.model_copy(update={"MODE": "PROD", "ADMIN_ENABLED": True}).ADMIN_ENABLED_effective
+    assert not settings.model_copy(update={"MODE": "DEV", "ADMIN_ENABLED": False}).ADMIN_ENABLED_effective
+
+
+def test_disabled_admin_is_not_mounted():
+    config = settings.model_copy(update={"ADMIN_ENABLED": False})
+    app = create_app(config)
+    assert not any(getattr(route, "path", None) == "/admin" for route in app.routes)
+    assert not hasattr(app.state, "admin")
+
+
+@pytest.mark.asyncio
+async def test_admin_is_built_on_first_request():
+    app = create_app(settings.model_copy(update={"ADMIN_ENABLED": True}))
+    assert not app.state.admin.loaded
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/admin/")
+
+    assert response.status_code == 200
+    assert app.state.admin.loaded
+    assert app.url_path_for("admin:list", identity="task") == "/admin/task/list"
+
+
+def test_import_does_not_load_admin_or_read_env(tmp_path):
+    # Каталог без .env: импорт конфигурации не читает настройки
+    bare = _run("import app.core.config", tmp_path)
+    assert bare.returncode == 0, bare.stderr
+
+    started = _run("import sys, app.main; print('sqladmin' in sys.modules, 'jinja2' in sys.modules)", BMS_DIR)
+    assert started.returncode == 0, started.stderr
+    assert started.stdout.split() == ["False", "False"]
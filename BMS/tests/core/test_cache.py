@@ -0,0 +1,203 @@
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.main import app
+from app.core import cache as cache_module
+from app.core.auth import current_active_user
+from app.core.cache import CacheBackend, EntityCache, ExternalCache, LRUCache, LocalCacheClient
+from app.core.metrics import REGISTRY
+from app.models.meeting import Meeting
+from app.models.task import Task
+from app.models.team import Team
+from app.models.user import User, UserRole, meeting_participants_association
+from app.utils.services import get_meeting_or_404, get_task_or_404, get_team_or_404
+from tests.conftest import TestSessionLocal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+async def _team_with_admin(db_session):
+    admin = User(email="cache@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(admin)
+    await db_session.commit()
+    team = Team(name="Cache", invite_code="CACHE001", admin_id=admin.id)
+    db_session.add(team)
+    await db_session.commit()
+    admin.team_id = team.id
+    await db_session.commit()
+    return admin, team
+
+
+@pytest.mark.asyncio
+async def test_lru_ttl_and_size_eviction():
+    clock = FakeClock()
+    lru = LRUCache(max_entries=2, clock=clock)
+    size_before = _sample("bms_entity_cache_evictions_total", kind="x", reason="size")
+    expired_before = _sample("bms_entity_cache_evictions_total", kind="x", reason="expired")
+
+    await lru.set("x:0:1", {"a": 1}, ttl=10)
+    await lru.set("x:0:2", {"a": 2}, ttl=10)
+    assert await lru.get("x:0:1") == {"a": 1}  # 1 становится самым свежим
+    await lru.set("x:0:3", {"a": 3}, ttl=10)
+    assert await lru.get("x:0:2") is None
+    assert len(lru) == 2
+
+    clock.now = 11
+    assert await lru.get("x:0:1") is None
+    assert _sample("bms_entity_cache_evictions_total", kind="x", reason="size") == size_before + 1
+    assert _sample("bms_entity_cache_evictions_total", kind="x", reason="expired") == expired_before + 1
+
+    # снимок — копия: изменение исходного объекта в кэш не попадает
+    value = {"a": [1]}
+    await lru.set("x:0:4", value, ttl=10)
+    value["a"].append(2)
+    assert await lru.get("x:0:4") == {"a": [1]}
+
+
+@pytest.mark.asyncio
+async def test_external_backend_roundtrip_and_generations():
+    clock = FakeClock()
+    backend = ExternalCache(LocalCacheClient(clock=clock))
+    await backend.set("team:0:1", {"name": "A"}, ttl=5)
+    first, second = await backend.get("team:0:1"), await backend.get("team:0:1")
+    assert first == second == {"name": "A"} and first is not second
+
+    assert await backend.generation("task") == 0
+    assert await backend.bump_generation("task") == 1
+    assert await backend.generation("task") == 1
+
+    clock.now = 6
+    assert await backend.get("team:0:1") is None
+
+
+@pytest.mark.parametrize("backend_factory", [LRUCache, lambda: ExternalCache(LocalCacheClient())])
+@pytest.mark.asyncio
+async def test_entity_cache_hit_is_attached_to_new_session(db_session, monkeypatch, backend_factory):
+    monkeypatch.setattr(cache_module.entity_cache, "backend", backend_factory())
+    admin, team = await _team_with_admin(db_session)
+    task = Task(title="T", creator_id=admin.id, assignee_id=admin.id)
+    db_session.add(task)
+    await db_session.commit()
+
+    hits = _sample("bms_entity_cache_hits_total", kind="task")
+    async with TestSessionLocal() as first:
+        await get_task_or_404(task.id, first)
+    async with TestSessionLocal() as second:
+        cached = await get_task_or_404(task.id, second)
+        # связи пришли из снимка: ленивой загрузки (и MissingGreenlet) нет
+        assert cached.creator.team_id == team.id
+        assert cached.comments == []
+        assert cached in second
+    assert _sample("bms_entity_cache_hits_total", kind="task") == hits + 1
+
+    # объект из кэша можно менять и коммитить
+    member = User(email="new@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(member)
+    await db_session.commit()
+    async with TestSessionLocal() as session:
+        await get_team_or_404(team.id, session)
+    async with TestSessionLocal() as session:
+        cached_team = await get_team_or_404(team.id, session)
+        cached_team.members.append(await session.get(User, member.id))
+        await session.commit()
+    async with TestSessionLocal() as session:
+        assert (await session.get(User, member.id)).team_id == team.id
+
+
+@pytest.mark.asyncio
+async def test_write_through_invalidation(async_client: AsyncClient, db_session):
+    admin, team = await _team_with_admin(db_session)
+    task = Task(title="T", creator_id=admin.id, assignee_id=admin.id)
+    db_session.add(task)
+    await db_session.commit()
+    task_id = task.id
+    app.dependency_overrides[current_active_user] = lambda: admin
+
+    async with TestSessionLocal() as session:
+        await get_task_or_404(task_id, session)
+    hits = _sample("bms_entity_cache_hits_total", kind="task")
+    misses = _sample("bms_entity_cache_misses_total", kind="task")
+    # запись читает задачу из БД, мимо снимка, и сбрасывает его
+    assert (await async_client.put(f"/tasks/{task_id}", json={"title": "T2"})).status_code == 200
+    assert _sample("bms_entity_cache_hits_total", kind="task") == hits
+    async with TestSessionLocal() as session:
+        assert (await get_task_or_404(task_id, session)).title == "T2"
+    assert _sample("bms_entity_cache_misses_total", kind="task") == misses + 1
+
+    assert (await async_client.delete(f"/tasks/{task_id}")).status_code == 204
+    assert (await async_client.put(f"/tasks/{task_id}", json={"title": "T4"})).status_code == 404
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_write_ignores_stale_snapshot(async_client: AsyncClient, db_session):
+    manager = User(email="mgr@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    first = User(email="first@e.com", hashed_password="x", role=UserRole.USER,
+                 is_active=True, is_superuser=False, is_verified=True)
+    second = User(email="second@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, first, second])
+    await db_session.commit()
+    start = datetime(2030, 1, 1, 10)
+    meeting = Meeting(title="M", start_time=start, end_time=start + timedelta(hours=1),
+                      creator_id=manager.id, participants=[manager, first])
+    db_session.add(meeting)
+    await db_session.commit()
+    meeting_id, manager_id, second_id = meeting.id, manager.id, second.id
+
+    async with TestSessionLocal() as session:
+        await get_meeting_or_404(meeting_id, session)
+    # участников меняет другой процесс: снимок в этом кэше устарел
+    async with TestSessionLocal() as session:
+        await session.execute(delete(meeting_participants_association)
+                              .where(meeting_participants_association.c.meeting_id == meeting_id))
+        await session.execute(meeting_participants_association.insert(), [
+            {"meeting_id": meeting_id, "user_id": manager_id}, {"meeting_id": meeting_id, "user_id": second_id},
+        ])
+        await session.commit()
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.put(f"/meetings/{meeting_id}", json={"title": "M2"})
+    assert resp.status_code == 200
+    assert sorted(resp.json()["participants"]) == sorted([manager_id, second_id])
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_loads(db_session):
+    disabled = EntityCache(None)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return None
+
+    assert await disabled.get(db_session, "team", 1, load) is None
+    assert await disabled.get(db_session, "team", 1, load) is None
+    assert len(calls) == 2
+    await disabled.invalidate("team", 1)
+    await disabled.invalidate_kind("task")
+
+
+def test_backend_must_implement_every_operation():
+    class PartialBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialBackend()
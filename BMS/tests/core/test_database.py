@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import create_db_engine, get_engine_profile, get_pool_stats
+
+
+def test_engine_profile_by_mode():
+    prod = get_engine_profile(settings.model_copy(update={"MODE": "PROD"}))
+    assert prod["echo"] is False
+    assert prod["pool_pre_ping"] is True
+
+    dev = get_engine_profile(settings.model_copy(update={"MODE": "unknown"}))
+    assert dev["echo"] is True
+
+
+def test_engine_profile_env_overrides():
+    config = settings.model_copy(update={"MODE": "PROD", "DB_POOL_SIZE": 3, "DB_ECHO": True})
+    profile = get_engine_profile(config)
+    assert profile["pool_size"] == 3
+    assert profile["echo"] is True
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_counts_checkouts(tmp_path):
+    profile = get_engine_profile(settings.model_copy(update={"MODE": "TEST"}))
+    engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", profile)
+
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(engine)
+    assert stats["checkouts_total"] == 3
+    assert stats["checkedout"] == 0
+    await engine.dispose()
@@ -0,0 +1,121 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.dataloader import LoaderGroup, loaders_for
+from app.models.task import Task
+from app.models.team import Team
+from app.models.user import User, UserRole
+from app.utils.services import get_task_or_404, get_team_or_404, get_user_or_404
+from tests.conftest import TestSessionLocal, engine_test
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _count)
+
+
+async def _seed(db_session, members=3):
+    admin = User(email="dl-admin@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(admin)
+    await db_session.commit()
+    team = Team(name="DL", invite_code="DL000001", admin_id=admin.id)
+    db_session.add(team)
+    await db_session.commit()
+    users = [
+        User(email=f"dl{i}@e.com", hashed_password="x", role=UserRole.USER, team_id=team.id,
+             is_active=True, is_superuser=False, is_verified=True)
+        for i in range(members)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    return admin, team, users
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_batched(db_session):
+    _, _, users = await _seed(db_session)
+    ids = [user.id for user in users]
+
+    async with TestSessionLocal() as session:
+        loader = loaders_for(session).users
+        with count_statements() as statements:
+            loaded = await asyncio.gather(*(loader.load(user_id) for user_id in ids), loader.load(10_000))
+            again = await loader.load_many(ids)
+        assert len(statements) == 1
+        assert [user.id for user in loaded[:-1]] == ids
+        assert loaded[-1] is None
+        assert again == dict(zip(ids, loaded))
+
+    # объекты из identity map сессии отдаются без SQL
+    async with TestSessionLocal() as session:
+        known = await session.get(User, ids[0])
+        with count_statements() as statements:
+            assert await loaders_for(session).users.load(ids[0]) is known
+        assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_task_creator_and_assignee_in_one_query(db_session):
+    admin, team, users = await _seed(db_session)
+    task = Task(title="T", creator_id=admin.id, assignee_id=users[0].id)
+    db_session.add(task)
+    await db_session.commit()
+
+    async with TestSessionLocal() as session:
+        with count_statements() as statements:
+            loaded = await get_task_or_404(task.id, session)
+            assert loaded.creator.id == admin.id
+            assert loaded.assignee.team_id == team.id
+        # задача + комментарии + оценки + один IN-запрос пользователей
+        assert len(statements) == 4
+        assert sum("FROM users" in statement for statement in statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_team_members_are_primed(db_session):
+    _, team, users = await _seed(db_session, members=5)
+
+    async with TestSessionLocal() as session:
+        with count_statements() as statements:
+            await get_team_or_404(team.id, session)
+            team_queries = len(statements)
+            for user in users:
+                assert (await get_user_or_404(user.id, session)).team_id == team.id
+        # участники пришли вместе с командой — ни одного запроса на пользователя
+        assert len(statements) == team_queries == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_error_is_propagated_and_retried():
+    calls = []
+
+    async def flaky(keys):
+        calls.append(list(keys))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return {key: key * 10 for key in keys}
+
+    group = LoaderGroup()
+    loader = group.add(flaky)
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    assert await loader.load_many([1, 2]) == {1: 10, 2: 20}
+    assert calls == [[1, 2], [1, 2]]
+
+    loader.prime(3, 30)
+    assert await loader.load(3) == 30
+    assert len(calls) == 2
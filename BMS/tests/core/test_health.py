@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import health
+from app.core.config import settings
+from app.core.health import LoopLagMonitor, check_readiness
+from tests.conftest import engine_test
+
+
+class Monitor:
+    def __init__(self, lag):
+        self.lag = lag
+
+
+class Dispatcher:
+    def __init__(self, backlog):
+        self.backlog = backlog
+
+    async def pending(self):
+        return self.backlog
+
+
+@pytest.mark.asyncio
+async def test_healthz_and_readyz(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(health, "health_engines", lambda: {"primary": engine_test})
+
+    assert (await async_client.get("/healthz")).json() == {"status": "ok"}
+
+    response = await async_client.get("/readyz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["databases"]["primary"]["ok"]
+    assert "latency_ms" in body["checks"]["databases"]["primary"]
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_is_not_ready(tmp_path):
+    pooled = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0
+    )
+    try:
+        ready, report = await check_readiness(settings, {"primary": pooled})
+        assert ready
+        async with pooled.connect():
+            started = time.perf_counter()
+            ready, report = await check_readiness(settings, {"primary": pooled})
+            # Проверка не ждёт в очереди пула
+            assert time.perf_counter() - started < settings.HEALTH_DB_TIMEOUT
+        primary = report["checks"]["databases"]["primary"]
+        assert not ready and report["status"] == "unavailable"
+        assert primary["error"] == "pool saturated"
+        assert primary["pool"] == {"checkedout": 1, "capacity": 1, "saturation": 1.0}
+    finally:
+        await pooled.dispose()
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_and_outbox_backlog():
+    engines = {"primary": engine_test}
+    ready, report = await check_readiness(settings, engines, Monitor(5.0))
+    assert not ready and report["checks"]["event_loop"] == {"ok": False, "lag_ms": 5000.0}
+
+    ready, report = await check_readiness(settings, engines, Monitor(0.0), Dispatcher(10))
+    assert ready and report["checks"]["outbox"] == {"ok": True, "backlog": 10}
+
+    limited = settings.model_copy(update={"HEALTH_MAX_OUTBOX_BACKLOG": 5})
+    ready, report = await check_readiness(limited, engines, None, Dispatcher(10))
+    assert not ready and not report["checks"]["outbox"]["ok"]
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_call():
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # блокирует цикл событий
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+    assert monitor.lag is not None and monitor.lag >= 0.05
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.database import engine
+import app.core.sharding as sharding
+from app.core.metrics import REGISTRY, PoolCollector
+from app.models.meeting import Meeting
+from app.models.user import User, UserRole
+from app.utils.services import check_time_conflicts
+
+
+class Dummy:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_latency_labelled_by_route_template(async_client: AsyncClient):
+    app.dependency_overrides[current_active_user] = lambda: Dummy(id=1, team_id=None)
+    labels = {"method": "GET", "route": "/calendar/monthly/{year}/{month}", "status": "200"}
+    before = _sample("bms_http_request_duration_seconds_count", **labels)
+
+    await async_client.get("/calendar/monthly/2025/6")
+    await async_client.get("/calendar/monthly/2025/7")
+
+    assert _sample("bms_http_request_duration_seconds_count", **labels) == before + 2
+    app.dependency_overrides.pop(current_active_user)
+
+    resp = await async_client.get("/metrics")
+    assert resp.status_code == 200
+    assert "bms_http_requests_in_flight" in resp.text
+    assert "bms_db_pool_checkouts_total" in resp.text
+
+
+@pytest.mark.asyncio
+async def test_conflict_rejections_counted(db_session):
+    user = User(email="c@e.com", hashed_password="x", role=UserRole.MANAGER,
+                is_active=True, is_superuser=False, is_verified=True)
+    now = datetime.utcnow()
+    db_session.add(Meeting(title="Busy", start_time=now, end_time=now + timedelta(hours=1),
+                           creator=user, participants=[user]))
+    await db_session.commit()
+
+    before = _sample("bms_meeting_conflict_rejections_total")
+    with pytest.raises(HTTPException):
+        await check_time_conflicts([user.id], now, now + timedelta(minutes=30), db_session)
+    assert _sample("bms_meeting_conflict_rejections_total") == before + 1
+
+
+def test_pool_collector_includes_shard_engines(tmp_path, monkeypatch):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    shard_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'shard.db'}")
+    monkeypatch.setattr(sharding, "shard_router", SimpleNamespace(engines=[engine, shard_engine]))
+    checkouts = next(f for f in PoolCollector().collect() if f.name == "bms_db_pool_checkouts")
+    assert {sample.labels["database"] for sample in checkouts.samples} >= {"primary", "shard1"}
+
+
+_WORKER = """
+from app.core.metrics import MEETING_CONFLICT_REJECTIONS
+MEETING_CONFLICT_REJECTIONS.inc()
+"""
+
+_SCRAPE = """
+from app.core.metrics import render_metrics
+print(render_metrics().decode())
+"""
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    cwd = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", _WORKER], env=env, cwd=cwd, check=True)
+    scraped = subprocess.run([sys.executable, "-c", _SCRAPE], env=env, cwd=cwd, check=True,
+                             capture_output=True, text=True).stdout
+    assert "bms_meeting_conflict_rejections_total 2.0" in scraped
+    assert 'bms_db_pool_checkouts_total{database="primary",pid=' in scraped
@@ -0,0 +1,186 @@
+import pytest
+from datetime import datetime
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.auth import current_active_user
+from app.core.outbox import Consumer, OutboxDispatcher, emit
+from app.main import app
+from app.models.outbox import OutboxEvent
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.utils.outbox_consumers import LocalSearchIndex, LocalWebhookSink, search_consumer, webhook_consumer
+from tests.conftest import TestSessionLocal
+
+
+async def _events(db_session):
+    db_session.expire_all()
+    return list((await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars())
+
+
+@pytest.mark.asyncio
+async def test_event_is_written_only_with_commit(db_session):
+    emit(db_session, "task.updated", 1, {"title": "A"})
+    await db_session.rollback()
+    assert await _events(db_session) == []
+
+    emit(db_session, "task.updated", 1, {"title": "B"})
+    await db_session.commit()
+    [event] = await _events(db_session)
+    assert (event.topic, event.payload, event.processed_at, event.attempts) == ("task.updated", {"title": "B"}, None, 0)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_batches_by_topic(db_session):
+    for i in range(5):
+        emit(db_session, "task.updated" if i % 2 else "meeting.created", i, {"n": i})
+    await db_session.commit()
+
+    received = {"all": [], "tasks": []}
+
+    async def to_all(events):
+        received["all"].append([event.aggregate_id for event in events])
+
+    async def to_tasks(events):
+        received["tasks"].append([event.aggregate_id for event in events])
+
+    dispatcher = OutboxDispatcher(
+        [TestSessionLocal],
+        [Consumer("all", to_all), Consumer("tasks", to_tasks, frozenset({"task.*"}))],
+        batch_size=3,
+    )
+    assert await dispatcher.pending() == 5
+    assert await dispatcher.drain() == 5
+    assert received == {"all": [[0, 1, 2], [3, 4]], "tasks": [[1], [3]]}
+    assert await dispatcher.pending() == 0
+    assert all(event.processed_at is not None for event in await _events(db_session))
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_with_backoff(db_session):
+    emit(db_session, "task.deleted", 7)
+    await db_session.commit()
+
+    calls = []
+
+    async def flaky(events):
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise RuntimeError("unavailable")
+
+    dispatcher = OutboxDispatcher([TestSessionLocal], [Consumer("flaky", flaky)])
+    assert await dispatcher.drain() == 1
+    [event] = await _events(db_session)
+    assert event.attempts == 1 and event.processed_at is None
+    assert "unavailable" in event.last_error
+
+    # повтор не раньше отсрочки; сдвигаем её в прошлое
+    assert event.available_at > datetime.utcnow()
+    event.available_at = datetime(2000, 1, 1)
+    await db_session.commit()
+    assert await dispatcher.drain() == 1
+    [event] = await _events(db_session)
+    assert event.processed_at is not None and calls == [1, 1]
+
+    # после max_attempts неудач событие больше не выбирается
+    emit(db_session, "task.deleted", 8)
+    await db_session.commit()
+    stuck = OutboxDispatcher([TestSessionLocal], [Consumer("down", flaky)], max_attempts=0)
+    assert await stuck.drain() == 0
+    assert await stuck.pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_local_consumers(db_session):
+    emit(db_session, "task.created", 1, {"title": "Отчёт", "description": "квартал"})
+    emit(db_session, "meeting.created", 2, {"title": "Планёрка"})
+    emit(db_session, "task.deleted", 3)
+    await db_session.commit()
+
+    sink, index = LocalWebhookSink(), LocalSearchIndex()
+    await index.upsert([{"kind": "task", "id": 3, "title": "старая"}])
+    dispatcher = OutboxDispatcher(
+        [TestSessionLocal], [webhook_consumer(["http://hook"], sink), search_consumer(index)]
+    )
+    await dispatcher.drain()
+
+    [(url, body)] = sink.deliveries
+    assert url == "http://hook" and body.count(b'"topic"') == 3
+    assert set(index.documents) == {("task", 1), ("meeting", 2)}
+    assert [doc["id"] for doc in index.search("КВАРТАЛ")] == [1]
+
+
+@pytest.mark.asyncio
+async def test_partial_update_keeps_indexed_fields(db_session):
+    index = LocalSearchIndex()
+    dispatcher = OutboxDispatcher([TestSessionLocal], [search_consumer(index)])
+
+    emit(db_session, "task.created", 1, {"title": "Отчёт", "status": "todo"})
+    await db_session.commit()
+    await dispatcher.drain()
+    emit(db_session, "task.updated", 1, {"status": "in_progress"})
+    emit(db_session, "task.created", 2, {"title": "Смета"})
+    emit(db_session, "task.updated", 2, {"description": "квартал"})
+    await db_session.commit()
+    await dispatcher.drain()
+
+    [document] = index.search("отчёт")
+    assert (document["id"], document["status"]) == (1, "in_progress")
+    assert [doc["title"] for doc in index.search("квартал")] == ["Смета"]
+
+
+@pytest.mark.asyncio
+async def test_api_writes_emit_events(async_client: AsyncClient, db_session):
+    user = User(email="outbox@e.com", hashed_password="x", role=UserRole.ADMIN,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: user
+    user_id = user.id
+
+    resp = await async_client.post("/tasks/", json={"title": "T", "assignee_id": user_id})
+    assert resp.status_code == 201
+    task_id = resp.json()["id"]
+    assert (await async_client.put(f"/tasks/{task_id}", json={"title": "T2"})).status_code == 200
+    assert (await async_client.delete(f"/tasks/{task_id}")).status_code == 204
+
+    events = await _events(db_session)
+    assert [(event.topic, event.aggregate_id) for event in events] == [
+        ("task.created", task_id), ("task.updated", task_id), ("task.deleted", task_id),
+    ]
+    assert events[0].payload["creator_id"] == user_id
+    assert events[1].payload == {"title": "T2"}
+    assert await db_session.get(Task, task_id) is None
+
+
+@pytest.mark.asyncio
+async def test_batch_is_claimed_before_delivery(db_session):
+    emit(db_session, "task.updated", 1)
+    await db_session.commit()
+
+    seen = []
+
+    async def slow(events):
+        # Пачка уже забрана и закоммичена: второй диспетчер её не видит
+        seen.append(await OutboxDispatcher([TestSessionLocal], [Consumer("other", slow)]).drain())
+        async with TestSessionLocal() as db:
+            [event] = (await db.execute(select(OutboxEvent))).scalars()
+            seen.append((event.processed_at, event.available_at > datetime.utcnow()))
+
+    assert await OutboxDispatcher([TestSessionLocal], [Consumer("slow", slow)]).drain() == 1
+    assert seen == [0, (None, True)]
+    [event] = await _events(db_session)
+    assert event.processed_at is not None and event.attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_returns_batch_to_queue(db_session):
+    emit(db_session, "task.updated", 1)
+    await db_session.commit()
+
+    dispatcher = OutboxDispatcher([TestSessionLocal], [], lease=0)
+    # Диспетчер забрал пачку и упал, не отметив её
+    [claimed] = await dispatcher._claim(TestSessionLocal, datetime.utcnow())
+    assert await dispatcher.drain() == 1
+    [event] = await _events(db_session)
+    assert event.id == claimed.id and event.processed_at is not None
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.auth import current_active_user, websocket_user
+from app.core.outbox import emit
+from app.core.push import CalendarPushHub, OutboxTail, calendar_hub
+from app.main import app
+from app.models.outbox import OutboxEvent
+from app.models.task import Task, TaskStatus
+from app.models.team import Team
+from app.models.user import User, UserRole
+from app.utils import bulk_admin
+from app.utils.bulk_admin import BulkJob, run_job
+from tests.conftest import TestSessionLocal
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = None
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_hub_coalesces_and_bounds_pending_dates():
+    hub = CalendarPushHub(max_pending_dates=3)
+    socket = FakeSocket()
+    hub.register(socket, 1)
+
+    assert hub.notify([1, 2], ["2026-01-02"]) == 1
+    hub.notify([1], ["2026-01-01", "2026-01-02"])
+    await _settle()
+    assert socket.sent == [{"type": "invalidate", "dates": ["2026-01-01", "2026-01-02"]}]
+
+    hub.notify([1], [f"2026-02-0{day}" for day in range(1, 5)])
+    hub.notify([1], ["2026-03-01"])
+    await _settle()
+    assert socket.sent[-1] == {"type": "resync"}
+    assert len(socket.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_hub_limits_connections_and_drops_slow_clients():
+    hub = CalendarPushHub(max_connections=3, max_per_user=2, send_timeout=0.01)
+    first, second, third = FakeSocket(), FakeSocket(), FakeSocket()
+    hub.register(first, 1)
+    hub.register(second, 1)
+    hub.register(third, 1)
+    await _settle()
+    assert first.closed == 1000 and len(hub) == 2
+
+    slow = FakeSocket(delay=1.0)
+    hub.register(slow, 2)
+    assert hub.register(FakeSocket(), 3) is None
+
+    hub.notify([1, 2], ["2026-01-01"])
+    await asyncio.sleep(0.05)
+    assert slow.closed == 1000 and len(hub) == 2
+    assert second.sent == third.sent == [{"type": "invalidate", "dates": ["2026-01-01"]}]
+
+    await hub.close_all()
+    assert len(hub) == 0 and second.closed == 1001
+
+
+async def _team(db_session, members=2):
+    admin = User(email="push-admin@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(admin)
+    await db_session.commit()
+    team = Team(name="Push", invite_code="PUSH0001", admin_id=admin.id)
+    db_session.add(team)
+    await db_session.commit()
+    admin.team_id = team.id
+    users = [User(email=f"push{i}@e.com", hashed_password="x", role=UserRole.USER, team_id=team.id,
+                  is_active=True, is_superuser=False, is_verified=True) for i in range(members)]
+    db_session.add_all(users)
+    await db_session.commit()
+    return admin, team, users
+
+
+@pytest.mark.asyncio
+async def test_tail_fans_out_task_and_meeting_events(db_session):
+    _, team, users = await _team(db_session)
+    hub = CalendarPushHub()
+    sockets = [FakeSocket() for _ in users]
+    for socket, user in zip(sockets, users):
+        hub.register(socket, user.id)
+    tail = OutboxTail(hub, [TestSessionLocal])
+
+    emit(db_session, "task.created", 1, {"deadline": "2026-01-01T10:00:00", "team_ids": [team.id]})
+    await db_session.commit()
+    await tail.poll()  # первое чтение только запоминает конец очереди
+
+    emit(db_session, "task.updated", 1, {"deadline": "2026-01-05T10:00:00",
+                                         "previous_deadline": "2026-01-01T10:00:00", "team_ids": [team.id]})
+    emit(db_session, "meeting.updated", 2, {"start_time": "2026-01-07T09:00:00",
+                                            "participants": [users[0].id], "previous_participants": []})
+    emit(db_session, "comment.created", 3, {"task_id": 1})
+    emit(db_session, "task.updated", 4, {"title": "без дедлайна"})
+    await db_session.commit()
+    assert await tail.poll() == 4
+    await _settle()
+
+    assert sockets[0].sent == [{"type": "invalidate", "dates": ["2026-01-01", "2026-01-05", "2026-01-07"]}]
+    assert sockets[1].sent == [{"type": "invalidate", "dates": ["2026-01-01", "2026-01-05"]}]
+
+
+@pytest.mark.asyncio
+async def test_tail_rereads_ids_committed_out_of_order(db_session):
+    now = [0.0]
+    hub = CalendarPushHub()
+    socket = FakeSocket()
+    hub.register(socket, 1)
+    tail = OutboxTail(hub, [TestSessionLocal], gap_timeout=10.0, clock=lambda: now[0])
+    await tail.poll()
+
+    meeting = {"start_time": "2026-01-01T09:00:00", "participants": [1]}
+    db_session.add(OutboxEvent(id=3, topic="meeting.created", aggregate_id=1, payload=meeting))
+    await db_session.commit()
+    assert await tail.poll() == 1
+
+    # id 1 и 2 выданы раньше, но зафиксированы позже
+    db_session.add(OutboxEvent(id=2, topic="meeting.created", aggregate_id=2,
+                               payload={**meeting, "start_time": "2026-01-02T09:00:00"}))
+    await db_session.commit()
+    assert await tail.poll() == 1
+
+    now[0] = 11.0
+    db_session.add(OutboxEvent(id=1, topic="meeting.created", aggregate_id=3,
+                               payload={**meeting, "start_time": "2026-01-03T09:00:00"}))
+    await db_session.commit()
+    assert await tail.poll() == 0
+    await _settle()
+    assert [day for message in socket.sent for day in message["dates"]] == ["2026-01-01", "2026-01-02"]
+
+
+@pytest.mark.asyncio
+async def test_moving_task_deadline_notifies_old_and_new_day(async_client: AsyncClient, db_session):
+    admin, team, users = await _team(db_session, members=1)
+    admin_id, member_id = admin.id, users[0].id
+    app.dependency_overrides[current_active_user] = lambda: admin
+    hub = CalendarPushHub()
+    socket = FakeSocket()
+    hub.register(socket, member_id)
+    tail = OutboxTail(hub, [TestSessionLocal])
+    await tail.poll()
+
+    resp = await async_client.post("/tasks/", json={
+        "title": "T", "assignee_id": admin_id, "deadline": "2026-05-10T12:00:00",
+    })
+    task_id = resp.json()["id"]
+    await async_client.put(f"/tasks/{task_id}", json={"deadline": "2026-05-12T12:00:00"})
+    await tail.poll()
+    await _settle()
+    assert socket.sent == [{"type": "invalidate", "dates": ["2026-05-10", "2026-05-12"]}]
+
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_change_notifies_deadline_day(db_session):
+    admin, team, users = await _team(db_session, members=1)
+    task = Task(title="T", creator_id=admin.id, assignee_id=users[0].id, deadline=datetime(2026, 6, 3, 12))
+    db_session.add(task)
+    await db_session.commit()
+    task_id, member_id = task.id, users[0].id
+    hub = CalendarPushHub()
+    socket = FakeSocket()
+    hub.register(socket, member_id)
+    tail = OutboxTail(hub, [TestSessionLocal])
+    await tail.poll()
+
+    job = BulkJob(id=1, action="tasks.set_status", label="x", total=1)
+    await run_job(job, [task_id], bulk_admin.set_task_status(TaskStatus.DONE),
+                  bulk_admin.invalidate_tasks, TestSessionLocal, 10)
+    await tail.poll()
+    await _settle()
+    assert socket.sent == [{"type": "invalidate", "dates": ["2026-06-03"]}]
+
+
+def test_websocket_endpoint_registers_connection():
+    user = User(id=42, email="ws@e.com", hashed_password="x", role=UserRole.USER,
+                is_active=True, is_superuser=False, is_verified=True)
+    client = TestClient(app)
+
+    app.dependency_overrides[websocket_user] = lambda: None
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect("/calendar/ws") as ws:
+            ws.receive_text()
+    assert rejected.value.code == 1008
+
+    app.dependency_overrides[websocket_user] = lambda: user
+    try:
+        with client.websocket_connect("/calendar/ws?token=x") as ws:
+            ws.send_text("ping")
+            for _ in range(100):
+                if len(calendar_hub):
+                    break
+                time.sleep(0.01)
+            assert len(calendar_hub) == 1
+        assert len(calendar_hub) == 0
+    finally:
+        del app.dependency_overrides[websocket_user]
@@ -0,0 +1,59 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.database as database
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.database import Base, READ_YOUR_WRITES_COOKIE, get_read_session
+from app.core.sharding import get_team_read_session
+from app.models.task import Task, TaskStatus
+
+
+async def _make_db(path, title):
+    """SQLite-файл со схемой и одной задачей пользователя 1."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Task(title=title, creator_id=1, assignee_id=1, status=TaskStatus.OPEN))
+        await session.commit()
+    return engine, factory
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_outside_rw_window(async_client: AsyncClient, tmp_path, monkeypatch):
+    primary_engine, primary = await _make_db(tmp_path / "primary.db", "from-primary")
+    replica_engine, replica = await _make_db(tmp_path / "replica.db", "from-replica")
+    monkeypatch.setattr(database, "AsyncSessionLocal", primary)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", replica)
+
+    app.dependency_overrides.pop(get_read_session)
+    app.dependency_overrides.pop(get_team_read_session)
+    app.dependency_overrides[current_active_user] = lambda: SimpleNamespace(id=1, team_id=1)
+
+    resp = await async_client.get("/tasks/")
+    assert [t["title"] for t in resp.json()] == ["from-replica"]
+
+    async_client.cookies.set(READ_YOUR_WRITES_COOKIE, str(time.time() + 60))
+    resp = await async_client.get("/tasks/")
+    assert [t["title"] for t in resp.json()] == ["from-primary"]
+
+    app.dependency_overrides.pop(current_active_user)
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_write_sets_read_your_writes_cookie(async_client: AsyncClient):
+    resp = await async_client.post("/auth/register", json={
+        "email": "rw@example.com",
+        "password": "strongpassword123",
+    })
+    assert resp.status_code == 201
+    assert float(resp.cookies[READ_YOUR_WRITES_COOKIE]) > time.time()
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.serialization import compile_row_serializer, dumps
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.schemas.task import TaskRead
+
+
+def test_row_serializer_matches_pydantic_output():
+    fields = ["id", "title", "description", "status", "creator_id", "assignee_id", "created_at", "deadline"]
+    serialize = compile_row_serializer(fields)
+    created = datetime(2025, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+    row = (7, "t", None, TaskStatus.IN_PROGRESS, 1, 2, created, None)
+
+    item = serialize(row)
+    item.update(comments=[], evaluations=[], archived=False)
+
+    assert orjson.loads(dumps(item)) == orjson.loads(TaskRead(**item).model_dump_json())
+
+
+def test_row_serializer_rejects_bad_field_names():
+    with pytest.raises(ValueError):
+        compile_row_serializer(["id", "x); import os; ("])
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_payload_matches_schema(async_client: AsyncClient, db_session):
+    user = User(email="ser@e.com", hashed_password="x", role=UserRole.MANAGER, team_id=1,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    tasks = [Task(title=f"t{i}", creator_id=user.id, assignee_id=user.id, status=TaskStatus.OPEN)
+             for i in range(3)]
+    db_session.add_all(tasks)
+    await db_session.commit()
+    db_session.add(Comment(text="c", author_id=user.id, task_id=tasks[1].id))
+    db_session.add(Evaluation(score=4, evaluator_id=user.id, task_id=tasks[1].id))
+    await db_session.commit()
+
+    app.dependency_overrides[current_active_user] = lambda: user
+    resp = await async_client.get("/tasks/")
+    app.dependency_overrides.pop(current_active_user)
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [t["title"] for t in data] == ["t0", "t1", "t2"]
+    for item in data:
+        TaskRead.model_validate(item)
+    assert [c["text"] for c in data[1]["comments"]] == ["c"]
+    assert [e["score"] for e in data[1]["evaluations"]] == [4]
+    assert data[0]["comments"] == [] and data[0]["archived"] is False
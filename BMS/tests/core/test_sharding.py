@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.sharding as sharding
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.cache import entity_cache
+from app.core.database import Base
+from app.core.sharding import ShardRouter, get_team_read_session, get_team_session
+from app.models.comment import Comment
+from app.models.outbox import OutboxEvent
+from app.models.task import Task, TaskStatus
+from app.models.team import Team, TeamShard
+from app.models.user import User, UserRole
+from app.utils.outbox_consumers import invalidate_cache
+from app.utils.services import get_task_or_404
+
+
+async def _make_db(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _seed_directory(directory):
+    """Две команды по одному участнику; команда 1 → шард 1, команда 2 → шард 0."""
+    async with directory() as db:
+        users = [
+            User(email=f"u{i}@e.com", hashed_password="x", role=UserRole.MANAGER,
+                 is_active=True, is_superuser=False, is_verified=True)
+            for i in (1, 2)
+        ]
+        db.add_all(users)
+        await db.commit()
+        for i, user in enumerate(users, start=1):
+            db.add(Team(id=i, name=f"team-{i}", invite_code=f"code-{i}", admin_id=user.id))
+        await db.commit()
+        for i, user in enumerate(users, start=1):
+            user.team_id = i
+        await db.commit()
+        return [SimpleNamespace(id=u.id, team_id=u.team_id, role=u.role) for u in users]
+
+
+async def _titles(factory):
+    async with factory() as db:
+        return list((await db.execute(select(Task.title).order_by(Task.id))).scalars())
+
+
+@pytest_asyncio.fixture
+async def shards(tmp_path, monkeypatch):
+    engines = []
+    factories = []
+    for name in ("directory", "shard0", "shard1"):
+        engine, factory = await _make_db(tmp_path / f"{name}.db")
+        engines.append(engine)
+        factories.append(factory)
+
+    router = ShardRouter(factories[0], factories[1:], placement_ttl=0)
+    monkeypatch.setattr(sharding, "shard_router", router)
+    app.dependency_overrides.pop(get_team_session)
+    app.dependency_overrides.pop(get_team_read_session)
+    yield router
+    app.dependency_overrides.pop(current_active_user, None)
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_team_data_goes_to_its_shard(async_client: AsyncClient, shards: ShardRouter):
+    user1, user2 = await _seed_directory(shards.directory)
+    assert await shards.shard_for_team(1) == 1
+    assert await shards.shard_for_team(2) == 0
+    await shards.sync_team(1)
+    await shards.sync_team(2)
+
+    for user, title in ((user1, "t1"), (user2, "t2")):
+        app.dependency_overrides[current_active_user] = lambda user=user: user
+        resp = await async_client.post("/tasks/", json={"title": title, "assignee_id": user.id})
+        assert resp.status_code == 201
+
+    assert await _titles(shards.shards[1]) == ["t1"]
+    assert await _titles(shards.shards[0]) == ["t2"]
+    assert await _titles(shards.directory) == []
+
+    # Справочные копии на шарде: команда и её участник
+    async with shards.shards[1]() as db:
+        assert (await db.execute(select(User.team_id).where(User.id == user1.id))).scalar() == 1
+
+    app.dependency_overrides[current_active_user] = lambda: user1
+    resp = await async_client.get("/tasks/")
+    assert [t["title"] for t in resp.json()] == ["t1"]
+
+
+@pytest.mark.asyncio
+async def test_move_team_between_shards(async_client: AsyncClient, shards: ShardRouter):
+    user1, _ = await _seed_directory(shards.directory)
+    await shards.sync_team(1)
+    async with shards.shards[1]() as db:
+        task = Task(title="moving", creator_id=user1.id, assignee_id=user1.id, status=TaskStatus.OPEN)
+        db.add(task)
+        await db.commit()
+        db.add(Comment(text="c", author_id=user1.id, task_id=task.id))
+        await db.commit()
+
+    assert await shards.move_team(1, 0) == 1
+
+    assert await _titles(shards.shards[1]) == []
+    assert await _titles(shards.shards[0]) == ["moving"]
+    async with shards.shards[0]() as db:
+        assert (await db.execute(select(Comment.text))).scalars().all() == ["c"]
+    async with shards.directory() as db:
+        placement = (await db.execute(select(TeamShard).where(TeamShard.team_id == 1))).scalar_one()
+        assert (placement.shard, placement.locked) == (0, False)
+
+    app.dependency_overrides[current_active_user] = lambda: user1
+    resp = await async_client.get("/tasks/")
+    assert [t["title"] for t in resp.json()] == ["moving"]
+
+
+@pytest.mark.asyncio
+async def test_locked_team_gets_503(async_client: AsyncClient, shards: ShardRouter):
+    user1, _ = await _seed_directory(shards.directory)
+    await shards.shard_for_team(1)
+    await shards._set_locked(1, True)
+
+    app.dependency_overrides[current_active_user] = lambda: user1
+    resp = await async_client.get("/tasks/")
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_other_team_participants_and_assignees_rejected(async_client: AsyncClient, shards: ShardRouter):
+    user1, user2 = await _seed_directory(shards.directory)
+    await shards.sync_team(1)
+    app.dependency_overrides[current_active_user] = lambda: user1
+
+    resp = await async_client.post("/tasks/", json={"title": "t", "assignee_id": user2.id})
+    assert resp.status_code == 400
+    assert str(user2.id) in resp.json()["detail"]
+
+    resp = await async_client.post("/meetings/", json={
+        "title": "m", "participants": [user2.id],
+        "start_time": "2030-01-01T10:00:00", "end_time": "2030-01-01T11:00:00",
+    })
+    assert resp.status_code == 400
+
+    resp = await async_client.post("/meetings/", json={
+        "title": "m", "participants": [999],
+        "start_time": "2030-01-01T10:00:00", "end_time": "2030-01-01T11:00:00",
+    })
+    assert resp.status_code == 404
+
+    # Своя команда — как раньше
+    resp = await async_client.post("/meetings/", json={
+        "title": "m", "participants": [],
+        "start_time": "2030-01-01T10:00:00", "end_time": "2030-01-01T11:00:00",
+    })
+    assert resp.status_code == 201
+    assert await _titles(shards.shards[1]) == []
+
+
+@pytest.mark.asyncio
+async def test_entity_cache_keys_include_shard(async_client: AsyncClient, shards: ShardRouter):
+    user1, user2 = await _seed_directory(shards.directory)
+    await shards.sync_team(1)
+    await shards.sync_team(2)
+    for user, title in ((user1, "t1"), (user2, "t2")):
+        app.dependency_overrides[current_active_user] = lambda user=user: user
+        resp = await async_client.post("/tasks/", json={"title": title, "assignee_id": user.id})
+        # Последовательности у шардов свои: id совпадают
+        assert resp.json()["id"] == 1
+
+    for index, title in ((1, "t1"), (0, "t2")):
+        async with shards.shards[index]() as db:
+            assert (await get_task_or_404(1, db)).title == title
+    # Повторно — из кэша, но каждый шард получает свою задачу
+    for index, title in ((1, "t1"), (0, "t2")):
+        async with shards.shards[index]() as db:
+            assert (await get_task_or_404(1, db)).title == title
+
+    # Событие outbox с шарда 1 сбрасывает только его снимок
+    event = OutboxEvent(topic="task.updated", aggregate_id=1, payload={})
+    event.shard = 1
+    await invalidate_cache([event])
+    assert await entity_cache.backend.get(await entity_cache._key("task", 1, 1)) is None
+    assert await entity_cache.backend.get(await entity_cache._key("task", 1, 0)) is not None
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.slow_queries import drain_pending, install_slow_query_log, redact_parameters
+from app.models.slow_query import SlowQuery
+
+
+def test_redact_parameters_keeps_only_types():
+    assert json.loads(redact_parameters({"email_1": "a@b.c", "id_1": 5})) == {"email_1": "str", "id_1": "int"}
+    assert json.loads(redact_parameters(("secret", 1.5))) == ["str", "float"]
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_recorded(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    install_slow_query_log(engine, factory)
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT :value"), {"value": "top secret"})
+    await drain_pending()
+
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 10_000.0)
+    async with factory() as session:
+        records = (await session.execute(select(SlowQuery))).scalars().all()
+
+    assert [r.statement for r in records] == ["SELECT ?"]
+    assert "top secret" not in records[0].parameters
+    assert records[0].explain is None  # EXPLAIN только на PostgreSQL
+    await engine.dispose()
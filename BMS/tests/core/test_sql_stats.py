@@ -0,0 +1,43 @@
+import re
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.sql_stats import RequestSqlStats, instrument_engine
+from app.models.user import User, UserRole
+
+
+def test_repeated_shapes_ignore_whitespace():
+    stats = RequestSqlStats()
+    for _ in range(3):
+        stats.record("SELECT * FROM tasks\n  WHERE id = ?", 1.0)
+    stats.record("SELECT 1", 0.5)
+
+    assert stats.count == 4
+    assert stats.repeated(3) == [("SELECT * FROM tasks WHERE id = ?", 3)]
+    assert 'queries=4' in stats.server_timing()
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_counts_queries(async_client: AsyncClient, db_session):
+    instrument_engine(db_session.bind)
+
+    user = User(email="st@e.com", hashed_password="x", role=UserRole.USER, team_id=1,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    app.dependency_overrides[current_active_user] = lambda: user
+
+    resp = await async_client.get("/calendar/monthly/2025/2")
+    assert resp.status_code == 200
+    assert "Server-Timing" in resp.headers
+    match = re.search(r"queries=(\d+)", resp.headers["Server-Timing"])
+    assert match is not None
+    # Точное число зависит от реализации календаря; сверху — не больше
+    # двух запросов на день (задачи + встречи) и запроса версии для ETag
+    assert 0 < int(match.group(1)) <= 2 * 28 + 1
+
+    app.dependency_overrides.pop(current_active_user)
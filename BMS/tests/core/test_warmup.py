@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import get_pool_stats
+from app.core import warmup
+from app.core.warmup import dispose_engines, hot_queries, warm_engine, warm_up
+from tests.conftest import engine_test
+
+
+@pytest.mark.asyncio
+async def test_warm_engine_runs_hot_queries():
+    calls = []
+
+    async def query(db):
+        calls.append(await db.connection())
+
+    assert await warm_engine(engine_test, 5, [query, query]) == 1
+    assert len(calls) == 2
+    # Реальные горячие запросы выполняются на схеме без ошибок
+    assert await warm_engine(engine_test, 1, hot_queries()) == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failure_does_not_block_startup(monkeypatch):
+    async def broken(db):
+        raise RuntimeError("db down")
+
+    config = settings.model_copy(update={"SERVER_WARMUP_TIMEOUT": 1.0})
+    assert await warm_up(config, engines=[engine_test]) == 1
+
+    monkeypatch.setattr(warmup, "hot_queries", lambda: [broken])
+    assert await warm_up(config, engines=[engine_test]) == 0
+
+
+@pytest.mark.asyncio
+async def test_dispose_engines_closes_pool():
+    await warm_engine(engine_test, 1, [])
+    await dispose_engines([engine_test])
+    assert get_pool_stats(engine_test)["checkedout"] in (0, None)
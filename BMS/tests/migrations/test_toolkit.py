@@ -0,0 +1,42 @@
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.migrations.toolkit import CHECKPOINT_TABLE, batched_backfill, create_index_concurrently
+
+
+def _make_table(conn, rows):
+    conn.execute(sa.text("CREATE TABLE items (id INTEGER PRIMARY KEY, src INTEGER, dst INTEGER)"))
+    for i in range(1, rows + 1):
+        conn.execute(sa.text("INSERT INTO items (id, src) VALUES (:i, :i)"), {"i": i})
+
+
+def test_batched_backfill_and_resume():
+    engine = sa.create_engine("sqlite://", isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        _make_table(conn, 25)
+
+        updated = batched_backfill("items", "dst = src * 2", "items_dst", batch_size=10, pause=0, conn=conn)
+        assert updated == 25
+        assert conn.execute(sa.text("SELECT COUNT(*) FROM items WHERE dst = src * 2")).scalar() == 25
+
+        # повторный запуск завершённого backfill ничего не делает
+        assert batched_backfill("items", "dst = src * 2", "items_dst", batch_size=10, pause=0, conn=conn) == 0
+
+        # продолжение после прерывания: обработаны только строки после контрольной точки
+        conn.execute(sa.text("UPDATE items SET dst = NULL"))
+        conn.execute(sa.text(f"UPDATE {CHECKPOINT_TABLE} SET last_id = 20, done = FALSE"))
+        assert batched_backfill("items", "dst = src * 2", "items_dst", batch_size=10, pause=0, conn=conn) == 5
+        assert conn.execute(sa.text("SELECT MIN(id) FROM items WHERE dst IS NOT NULL")).scalar() == 21
+
+
+def test_create_index_concurrently_falls_back_outside_postgres():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        _make_table(conn, 1)
+        with Operations.context(MigrationContext.configure(conn)):
+            create_index_concurrently("ix_items_src", "items", ["src"])
+            create_index_concurrently("ix_items_src", "items", ["src"])  # идемпотентно
+
+        indexes = sa.inspect(conn).get_indexes("items")
+        assert [ix["name"] for ix in indexes] == ["ix_items_src"]
@@ -0,0 +1,178 @@
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.main import app
+from app.core.auth import current_active_user, current_user
+from app.core.etag import weak_etag
+from app.models.user import User, UserRole
+from app.models.team import Team
+from app.models.task import Task
+from app.models.comment import Comment
+
+
+async def _admin_with_team(db_session):
+    admin = User(email="etag@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(admin)
+    await db_session.commit()
+    team = Team(name="ETag", invite_code="ETAG0001", admin_id=admin.id)
+    db_session.add(team)
+    await db_session.commit()
+    admin.team_id = team.id
+    await db_session.commit()
+    await db_session.refresh(admin)
+    return admin, team
+
+
+def test_weak_etag_is_stable_and_weak():
+    assert weak_etag("tasks", 1, (2, 3)) == weak_etag("tasks", 1, (2, 3))
+    assert weak_etag("tasks", 1, (2, 3)) != weak_etag("tasks", 1, (2, 4))
+    assert weak_etag("x").startswith('W/"')
+
+
+@pytest.mark.asyncio
+async def test_tasks_not_modified_until_change(async_client: AsyncClient, db_session):
+    admin, _ = await _admin_with_team(db_session)
+    task = Task(title="T", creator_id=admin.id, assignee_id=admin.id)
+    db_session.add(task)
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: admin
+
+    first = await async_client.get("/tasks/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = await async_client.get("/tasks/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # сильная форма того же тега и список тегов тоже совпадают
+    strong = etag[2:]
+    assert (await async_client.get("/tasks/", headers={"If-None-Match": f'"x", {strong}'})).status_code == 304
+
+    # изменение строки через Core UPDATE повышает version
+    resp = await async_client.put(f"/tasks/{task.id}", json={"title": "T2"})
+    assert resp.status_code == 200
+    changed = await async_client.get("/tasks/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    etag = changed.headers["ETag"]
+
+    # новый комментарий меняет ETag списка задач
+    db_session.add(Comment(text="c", author_id=admin.id, task_id=task.id))
+    await db_session.commit()
+    changed = await async_client.get("/tasks/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    etag = changed.headers["ETag"]
+
+    # удаление задачи — тоже
+    assert (await async_client.delete(f"/tasks/{task.id}")).status_code == 204
+    changed = await async_client.get("/tasks/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json() == []
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_meetings_and_calendar_etags(async_client: AsyncClient, db_session):
+    admin, _ = await _admin_with_team(db_session)
+    admin.role = UserRole.MANAGER
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: admin
+
+    meetings = await async_client.get("/meetings/")
+    daily = await async_client.get("/calendar/daily/2030-01-10")
+    monthly = await async_client.get("/calendar/monthly/2030/1")
+    for resp, url in ((meetings, "/meetings/"), (daily, "/calendar/daily/2030-01-10"),
+                      (monthly, "/calendar/monthly/2030/1")):
+        assert resp.status_code == 200
+        cached = await async_client.get(url, headers={"If-None-Match": resp.headers["ETag"]})
+        assert cached.status_code == 304
+
+    start = datetime(2030, 1, 10, 9, 0)
+    resp = await async_client.post("/meetings/", json={
+        "title": "Sync", "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(), "participants": [],
+    })
+    assert resp.status_code == 201
+
+    for resp, url in ((meetings, "/meetings/"), (daily, "/calendar/daily/2030-01-10"),
+                      (monthly, "/calendar/monthly/2030/1")):
+        fresh = await async_client.get(url, headers={"If-None-Match": resp.headers["ETag"]})
+        assert fresh.status_code == 200
+
+    # встреча в другом месяце не меняет ETag января
+    january = (await async_client.get("/calendar/monthly/2030/1")).headers["ETag"]
+    march = datetime(2030, 3, 5, 9, 0)
+    resp = await async_client.post("/meetings/", json={
+        "title": "Later", "start_time": march.isoformat(),
+        "end_time": (march + timedelta(hours=1)).isoformat(), "participants": [],
+    })
+    assert resp.status_code == 201
+    cached = await async_client.get("/calendar/monthly/2030/1", headers={"If-None-Match": january})
+    assert cached.status_code == 304
+    assert (await async_client.get("/calendar/daily/bad")).status_code == 400
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_team_and_profile_etags(async_client: AsyncClient, db_session):
+    admin, team = await _admin_with_team(db_session)
+    app.dependency_overrides[current_active_user] = lambda: admin
+    app.dependency_overrides[current_user] = lambda: admin
+
+    resp = await async_client.get(f"/teams/{team.id}")
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert (await async_client.get(f"/teams/{team.id}", headers={"If-None-Match": etag})).status_code == 304
+    assert (await async_client.get("/teams/999", headers={"If-None-Match": etag})).status_code == 404
+
+    member = User(email="m@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True, team_id=team.id)
+    db_session.add(member)
+    await db_session.commit()
+    resp = await async_client.get(f"/teams/{team.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+    me = await async_client.get("/me/")
+    assert me.status_code == 200
+    assert (await async_client.get("/me/", headers={"If-None-Match": me.headers["ETag"]})).status_code == 304
+
+    app.dependency_overrides.pop(current_active_user)
+    app.dependency_overrides.pop(current_user)
+
+
+@pytest.mark.asyncio
+async def test_team_etag_changes_when_members_swapped(async_client: AsyncClient, db_session):
+    admin, team = await _admin_with_team(db_session)
+    users = [
+        User(email=f"s{i}@e.com", hashed_password="x", role=UserRole.USER,
+             is_active=True, is_superuser=False, is_verified=True)
+        for i in range(4)
+    ]
+    db_session.add_all(users)
+    await db_session.commit()
+    first, second, third, fourth = (user.id for user in users)
+    app.dependency_overrides[current_active_user] = lambda: admin
+
+    await db_session.execute(update(User).where(User.id.in_([first, fourth])).values(team_id=team.id))
+    await db_session.commit()
+    etag = (await async_client.get(f"/teams/{team.id}")).headers["ETag"]
+
+    # Тот же размер и та же сумма id, другой состав
+    assert first + fourth == second + third
+    await db_session.execute(update(User).where(User.id.in_([first, fourth])).values(team_id=None))
+    await db_session.execute(update(User).where(User.id.in_([second, third])).values(team_id=team.id))
+    await db_session.commit()
+    resp = await async_client.get(f"/teams/{team.id}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+    app.dependency_overrides.pop(current_active_user)
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.core.auth import current_active_user
+from app.models.evaluation import Evaluation
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+
+
+async def _seed(db_session):
+    manager = User(email="exp-m@e.com", hashed_password="x", role=UserRole.MANAGER, team_id=1,
+                   is_active=True, is_superuser=False, is_verified=True)
+    stranger = User(email="exp-s@e.com", hashed_password="x", role=UserRole.USER, team_id=2,
+                    is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, stranger])
+    await db_session.commit()
+
+    tasks = [
+        Task(title="jan", creator_id=manager.id, assignee_id=manager.id, status=TaskStatus.DONE,
+             created_at=datetime(2025, 1, 10)),
+        Task(title="feb", creator_id=manager.id, assignee_id=manager.id, status=TaskStatus.OPEN,
+             created_at=datetime(2025, 2, 10)),
+        Task(title="foreign", creator_id=stranger.id, assignee_id=stranger.id, status=TaskStatus.OPEN,
+             created_at=datetime(2025, 2, 10)),
+    ]
+    db_session.add_all(tasks)
+    await db_session.commit()
+    db_session.add(Evaluation(score=5, evaluator_id=manager.id, task_id=tasks[0].id,
+                              created_at=datetime(2025, 1, 11)))
+    await db_session.commit()
+    return manager, stranger
+
+
+@pytest.mark.asyncio
+async def test_export_tasks_ndjson_filtered_by_team_and_date(async_client: AsyncClient, db_session):
+    manager, _ = await _seed(db_session)
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    resp = await async_client.get("/export/tasks")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["title"] for r in rows] == ["jan", "feb"]
+
+    resp = await async_client.get("/export/tasks", params={"date_from": "2025-02-01", "date_to": "2025-02-28"})
+    assert [json.loads(line)["title"] for line in resp.text.splitlines()] == ["feb"]
+
+    resp = await async_client.get("/export/evaluations")
+    assert [json.loads(line)["score"] for line in resp.text.splitlines()] == [5]
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_export_csv_has_header_and_plain_values(async_client: AsyncClient, db_session):
+    manager, _ = await _seed(db_session)
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    resp = await async_client.get("/export/tasks", params={"format": "csv"})
+    assert resp.headers["content-disposition"] == 'attachment; filename="tasks.csv"'
+    table = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [(r["title"], r["status"]) for r in table] == [("jan", "done"), ("feb", "open")]
+    assert table[0]["description"] == ""
+
+    resp = await async_client.get("/export/meetings", params={"format": "csv"})
+    assert resp.text.strip() == "id,title,start_time,end_time,creator_id"
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_export_access(async_client: AsyncClient, db_session):
+    manager, stranger = await _seed(db_session)
+
+    app.dependency_overrides[current_active_user] = lambda: stranger
+    assert (await async_client.get("/export/tasks")).status_code == 403
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    assert (await async_client.get("/export/tasks", params={"team_id": 2})).status_code == 403
+    assert (await async_client.get("/export/users")).status_code == 422
+    assert (await async_client.get(
+        "/export/tasks", params={"date_from": "2025-03-01", "date_to": "2025-02-01"}
+    )).status_code == 400
+
+    app.dependency_overrides.pop(current_active_user)
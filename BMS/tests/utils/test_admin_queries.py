@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from starlette.datastructures import URL
+from starlette.requests import Request
+
+from app.admin import CacheInvalidatingView, CommentAdmin, KeysetPagination, SlowQueryAdmin, UserAdmin
+from app.models.comment import Comment
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.utils.admin_queries import contains, estimate_count
+from tests.conftest import TestSessionLocal
+
+
+def _request(query: str = "") -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/admin/comment/list",
+        "query_string": query.encode(), "headers": [],
+    })
+
+
+def _view(cls):
+    view = cls()
+    view.session_maker = TestSessionLocal
+    view.is_async = True
+    return view
+
+
+async def _comments(db_session, count):
+    user = User(email="adm@e.com", hashed_password="x", role=UserRole.ADMIN,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    task = Task(title="T", creator_id=user.id, assignee_id=user.id)
+    db_session.add(task)
+    await db_session.commit()
+    db_session.add_all(Comment(text=f"c{i}", author_id=user.id, task_id=task.id) for i in range(count))
+    await db_session.commit()
+
+
+def test_search_uses_column_without_cast():
+    compiled = contains(User.email, "5/0%_a").compile(dialect=postgresql.dialect())
+    assert str(compiled) == "users.email ILIKE %(email_1)s ESCAPE '/'"
+    assert compiled.params == {"email_1": "%5//0/%/_a%"}
+
+    view = UserAdmin()
+    stmt = view.search_query(select(User), "ivan")
+    assert "CAST" not in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_forward_and_back(db_session):
+    await _comments(db_session, 7)
+    view = _view(CommentAdmin)
+
+    first = await view.list(_request("pageSize=25"))
+    assert isinstance(first, KeysetPagination)
+    assert first.count == 7 and not first.estimated
+
+    view.page_size_options = [3]
+    pages, query = [], ""
+    while True:
+        page = await view.list(_request(query))
+        pages.append([row.id for row in page.rows])
+        if not page.has_next:
+            break
+        query = f"after={page.last_key}&page={page.page + 1}"
+    assert pages == [[7, 6, 5], [4, 3, 2], [1]]
+    assert page.page == 3 and page.has_previous
+
+    back = await view.list(_request(f"before={page.first_key}&page=2"))
+    assert [row.id for row in back.rows] == [4, 3, 2] and back.has_previous and back.has_next
+    back = await view.list(_request(f"before={back.first_key}&page=1"))
+    assert [row.id for row in back.rows] == [7, 6, 5] and not back.has_previous and back.page == 1
+
+    back.add_pagination_urls(URL("http://test/admin/comment/list?before=5&page=1"))
+    assert back.next_page.url == "http://test/admin/comment/list?after=5&page=2"
+
+
+@pytest.mark.asyncio
+async def test_other_sort_falls_back_to_offset(db_session):
+    await _comments(db_session, 4)
+    view = _view(CommentAdmin)
+    view.page_size_options = [3]
+
+    page = await view.list(_request("sortBy=text&sort=asc&page=2"))
+    assert not isinstance(page, KeysetPagination)
+    assert [row.text for row in page.rows] == ["c3"] and page.count == 4
+
+    # журнал медленных запросов: по умолчанию новые сверху, по курсору
+    assert isinstance(await _view(SlowQueryAdmin).list(_request()), KeysetPagination)
+
+
+@pytest.mark.asyncio
+async def test_estimate_count_is_exact_outside_postgres(db_session):
+    await _comments(db_session, 3)
+    async with TestSessionLocal() as session:
+        assert await estimate_count(session, select(Comment).order_by(Comment.id), exact_below=0) == (3, False)
+        assert await estimate_count(session, select(Comment).where(contains(Comment.text, "c1")), 0) == (1, False)
+
+
+def test_view_without_cache_invalidation_fails_at_class_creation():
+    with pytest.raises(TypeError, match="invalidate_cache"):
+        class BrokenCommentAdmin(CacheInvalidatingView, model=Comment):
+            pass
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.main import app
+from app.admin import TaskArchiveAdmin
+from app.core.auth import current_active_user, current_user
+from app.models.archive import CommentArchive, EvaluationArchive, TaskArchive
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.outbox import OutboxEvent
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.core.database import Base
+from app.utils.archival import _DONE_BATCH, archive_done_tasks, archive_shards
+from tests.conftest import TestSessionLocal
+
+
+async def _seed(db_session):
+    user = User(email="arch@e.com", hashed_password="x", role=UserRole.MANAGER, team_id=1,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+
+    old = datetime.utcnow() - timedelta(days=400)
+    done_old = [
+        Task(title=f"old-{i}", creator_id=user.id, assignee_id=user.id,
+             status=TaskStatus.DONE, created_at=old)
+        for i in range(5)
+    ]
+    fresh = Task(title="fresh", creator_id=user.id, assignee_id=user.id,
+                 status=TaskStatus.DONE)
+    open_old = Task(title="open", creator_id=user.id, assignee_id=user.id,
+                    status=TaskStatus.OPEN, created_at=old)
+    db_session.add_all(done_old + [fresh, open_old])
+    await db_session.commit()
+
+    db_session.add(Comment(text="c", author_id=user.id, task_id=done_old[0].id))
+    db_session.add(Evaluation(score=5, evaluator_id=user.id, task_id=done_old[0].id))
+    await db_session.commit()
+    return user, done_old[0].id
+
+
+async def _count(db_session, model):
+    return (await db_session.execute(select(func.count()).select_from(model))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_done_tasks_in_batches(db_session):
+    await _seed(db_session)
+
+    moved = await archive_done_tasks(db_session, timedelta(days=180), batch_size=2, max_batches=2)
+    assert moved == 4
+
+    moved = await archive_done_tasks(db_session, timedelta(days=180), batch_size=2)
+    assert moved == 1
+
+    assert await _count(db_session, Task) == 2
+    assert await _count(db_session, TaskArchive) == 5
+    assert await _count(db_session, Comment) == 0
+    assert await _count(db_session, CommentArchive) == 1
+    assert await _count(db_session, Evaluation) == 0
+    assert await _count(db_session, EvaluationArchive) == 1
+
+
+@pytest.mark.asyncio
+async def test_archive_emits_deleted_events_and_uses_partial_index(db_session):
+    user, _ = await _seed(db_session)
+    team_id = user.team_id
+    deadline = datetime(2026, 3, 1, 12)
+    await db_session.execute(update(Task).where(Task.title == "old-0").values(deadline=deadline))
+    await db_session.commit()
+
+    compiled = _DONE_BATCH.compile()
+    plan = await db_session.execute(
+        text(f"EXPLAIN QUERY PLAN {compiled}"), {"cutoff": datetime.utcnow(), "batch_size": 10},
+    )
+    assert "ix_tasks_done_created_at" in " ".join(str(row) for row in plan)
+
+    assert await archive_done_tasks(db_session, timedelta(days=180), batch_size=2) == 5
+    db_session.expire_all()
+    events = (await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()
+    assert [e.topic for e in events] == ["task.deleted"] * 5
+    assert events[0].payload == {"archived": True, "deadline": deadline.isoformat(), "team_ids": [team_id]}
+    assert events[1].payload == {"archived": True}
+
+
+@pytest.mark.asyncio
+async def test_archived_task_still_readable(async_client: AsyncClient, db_session):
+    user, task_id = await _seed(db_session)
+    await archive_done_tasks(db_session, timedelta(days=180))
+    app.dependency_overrides[current_active_user] = lambda: user
+
+    resp = await async_client.get(f"/tasks/{task_id}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["archived"] is True
+    assert [c["text"] for c in body["comments"]] == ["c"]
+
+    hot = await async_client.get("/tasks/")
+    assert {t["title"] for t in hot.json()} == {"fresh", "open"}
+
+    everything = await async_client.get("/tasks/", params={"include_archived": True})
+    assert len(everything.json()) == 7
+
+    app.dependency_overrides.pop(current_active_user)
+
+    # средняя оценка учитывает архивные задачи
+    app.dependency_overrides[current_user] = lambda: user
+    today = datetime.utcnow().date().isoformat()
+    resp = await async_client.get(f"/me/average_evaluation?from={today}&to={today}")
+    assert resp.json() == {"average_score": 5}
+    app.dependency_overrides.pop(current_user)
+
+
+@pytest.mark.asyncio
+async def test_archive_every_shard(tmp_path):
+    engines, factories = [], []
+    for name in ("shard0", "shard1"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(engine)
+        factories.append(sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+
+    for factory in factories:
+        async with factory() as db:
+            await _seed(db)
+
+    assert await archive_shards(factories, timedelta(days=180), batch_size=2) == 10
+    for factory in factories:
+        async with factory() as db:
+            assert await _count(db, TaskArchive) == 5
+            assert await _count(db, Task) == 2
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_archived_tasks_searchable_in_admin(db_session):
+    await _seed(db_session)
+    await archive_done_tasks(db_session, timedelta(days=180))
+
+    view = TaskArchiveAdmin()
+    view.session_maker = TestSessionLocal
+    view.is_async = True
+    request = Request({
+        "type": "http", "method": "GET", "path": "/admin/task-archive/list",
+        "query_string": b"search=old-3", "headers": [],
+    })
+    page = await view.list(request)
+    assert [row.title for row in page.rows] == ["old-3"]
@@ -0,0 +1,206 @@
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.sharding as sharding
+from app.admin import MeetingAdmin, TaskAdmin
+from app.core.config import settings
+from app.core.database import Base
+from app.core.sharding import ShardRouter
+from app.main import app
+from app.models.meeting import Meeting
+from app.models.outbox import OutboxEvent
+from app.models.task import Task, TaskStatus
+from app.models.team import Team
+from app.models.user import User, UserRole, meeting_participants_association
+from app.utils import bulk_admin
+from app.utils.bulk_admin import BulkJob, bulk_jobs, run_job
+from tests.conftest import TestSessionLocal
+
+
+async def _tasks(db_session, count):
+    user = User(email="bulk@e.com", hashed_password="x", role=UserRole.ADMIN,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    tasks = [Task(title=f"T{i}", creator_id=user.id, assignee_id=user.id) for i in range(count)]
+    db_session.add_all(tasks)
+    await db_session.commit()
+    return user, [task.id for task in tasks]
+
+
+async def _statuses(db_session):
+    db_session.expire_all()
+    return dict((await db_session.execute(select(Task.id, Task.status))).all())
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_batches_and_reports_progress(db_session):
+    _, ids = await _tasks(db_session, 5)
+    seen = []
+
+    async def invalidate(chunk):
+        seen.append(list(chunk))
+
+    job = BulkJob(id=1, action="tasks.set_status", label="x", total=4)
+    await run_job(job, ids[:4], bulk_admin.set_task_status(TaskStatus.DONE), invalidate, TestSessionLocal, 3)
+
+    assert (job.state, job.processed, job.affected, job.percent) == ("done", 4, 4, 100)
+    assert seen == [ids[:3], ids[3:4]]
+    statuses = await _statuses(db_session)
+    assert [statuses[i] for i in ids] == [TaskStatus.DONE] * 4 + [TaskStatus.OPEN]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_committed_progress(db_session):
+    _, ids = await _tasks(db_session, 4)
+    apply_done = bulk_admin.set_task_status(TaskStatus.DONE)
+
+    async def flaky(db, chunk):
+        if chunk[0] != ids[0]:
+            raise RuntimeError("lock timeout")
+        return await apply_done(db, chunk)
+
+    job = BulkJob(id=2, action="tasks.set_status", label="x", total=4)
+    await run_job(job, ids, flaky, bulk_admin.invalidate_tasks, TestSessionLocal, 2)
+
+    assert (job.state, job.processed) == ("failed", 2) and "lock timeout" in job.error
+    statuses = await _statuses(db_session)
+    assert [statuses[i] for i in ids] == [TaskStatus.DONE] * 2 + [TaskStatus.OPEN] * 2
+
+
+@pytest.mark.asyncio
+async def test_delete_old_meetings_with_participants(db_session):
+    user, _ = await _tasks(db_session, 0)
+    now = datetime.utcnow()
+    old = Meeting(title="old", start_time=now - timedelta(days=100), end_time=now - timedelta(days=100, hours=-1),
+                  creator_id=user.id, participants=[user])
+    fresh = Meeting(title="new", start_time=now - timedelta(days=1), end_time=now - timedelta(hours=23),
+                    creator_id=user.id, participants=[user])
+    db_session.add_all([old, fresh])
+    await db_session.commit()
+
+    async with TestSessionLocal() as db:
+        ids = await bulk_admin.ended_meeting_ids(db, now - timedelta(days=90), limit=10)
+        assert ids == [old.id]
+        assert await bulk_admin.delete_meetings(db, ids) == 1
+        await db.commit()
+        assert (await db.execute(select(Meeting.title))).scalars().all() == ["new"]
+        assert await db.scalar(select(func.count()).select_from(meeting_participants_association)) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_emit_event_per_row(db_session):
+    user, ids = await _tasks(db_session, 3)
+    deadline = datetime(2030, 1, 10, 12)
+    task = await db_session.get(Task, ids[2])
+    task.deadline = deadline
+    meeting = Meeting(title="m", start_time=deadline, end_time=deadline + timedelta(hours=1),
+                      creator_id=user.id, participants=[user])
+    db_session.add(meeting)
+    await db_session.commit()
+    user_id, meeting_id = user.id, meeting.id
+
+    async def noop(chunk):
+        pass
+
+    for action, chunk, apply in (
+        ("tasks.set_status", ids[:2], bulk_admin.set_task_status(TaskStatus.DONE)),
+        ("tasks.reassign", ids[2:], bulk_admin.reassign_tasks(user_id)),
+        ("meetings.delete", [meeting_id], bulk_admin.delete_meetings),
+        ("users.deactivate", [user_id], bulk_admin.deactivate_users),
+    ):
+        await run_job(BulkJob(id=1, action=action, label="x", total=len(chunk)), chunk, apply, noop, TestSessionLocal, 1)
+
+    db_session.expire_all()
+    events = (await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()
+    assert [(e.topic, e.aggregate_id) for e in events] == [
+        ("task.updated", ids[0]), ("task.updated", ids[1]), ("task.updated", ids[2]),
+        ("meeting.deleted", meeting_id), ("user.updated", user_id),
+    ]
+    assert events[0].payload == {"status": TaskStatus.DONE.value}
+    assert events[2].payload["assignee_id"] == user_id and "previous_deadline" in events[2].payload
+    assert events[3].payload == {"start_time": deadline.isoformat(), "participants": [user_id]}
+    assert events[4].payload == {"is_active": False}
+
+
+@pytest.mark.asyncio
+async def test_move_users_syncs_source_and_target_team_shards(tmp_path, monkeypatch):
+    engines, factories = [], []
+    for name in ("directory", "shard0", "shard1"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(engine)
+        factories.append(sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+    router = ShardRouter(factories[0], factories[1:], placement_ttl=0)
+    monkeypatch.setattr(sharding, "shard_router", router)
+
+    async with router.directory() as db:
+        users = [User(email=f"m{i}@e.com", hashed_password="x", role=UserRole.USER,
+                      is_active=True, is_superuser=False, is_verified=True) for i in range(3)]
+        db.add_all(users)
+        await db.commit()
+        # команда 1 → шард 1, команда 2 → шард 0
+        db.add_all([Team(id=1, name="A", invite_code="A", admin_id=users[0].id),
+                    Team(id=2, name="B", invite_code="B", admin_id=users[2].id)])
+        await db.commit()
+        for user, team_id in zip(users, (1, 1, 2)):
+            user.team_id = team_id
+        await db.commit()
+        moved = users[1].id
+    for team_id in (1, 2):
+        await router.sync_team(team_id)
+
+    apply, invalidate = bulk_admin.move_users(2)
+    job = BulkJob(id=1, action="users.move_team", label="x", total=1)
+    await run_job(job, [moved], apply, invalidate, router.directory, 10)
+    assert job.state == "done"
+
+    for index, team_id in ((1, None), (0, 2)):
+        async with router.shards[index]() as db:
+            assert await db.scalar(select(User.team_id).where(User.id == moved)) == team_id
+    async with router.directory() as db:
+        [event] = (await db.execute(select(OutboxEvent))).scalars().all()
+        assert (event.topic, event.payload) == ("user.updated", {"team_id": 2, "previous_team_id": 1})
+
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_admin_action_form_cap_and_job(async_client: AsyncClient, db_session, monkeypatch):
+    _, ids = await _tasks(db_session, 3)
+    app.state.admin.load()  # session_maker представлениям назначает сборка админки
+    monkeypatch.setattr(TaskAdmin, "session_maker", TestSessionLocal)
+    monkeypatch.setattr(MeetingAdmin, "session_maker", TestSessionLocal)
+    pks = ",".join(map(str, ids))
+
+    form = await async_client.get(f"/admin/task/action/set-status?pks={pks}")
+    assert form.status_code == 200
+    assert 'name="status"' in form.text and f'value="{pks}"' in form.text
+
+    monkeypatch.setattr(settings, "ADMIN_BULK_MAX_ROWS", 2)
+    capped = await async_client.get(f"/admin/task/action/set-status?pks={pks}&confirm=1&status=DONE")
+    assert capped.status_code == 200 and "не больше 2" in capped.text
+    monkeypatch.setattr(settings, "ADMIN_BULK_MAX_ROWS", 10_000)
+
+    invalid = await async_client.get(f"/admin/task/action/reassign?pks={pks}&confirm=1&assignee_id=999")
+    assert "не найден" in invalid.text
+
+    started = await async_client.get(f"/admin/task/action/set-status?pks={pks}&confirm=1&status=IN_PROGRESS")
+    assert started.status_code == 302
+    assert "/admin/bulk-jobs?job=" in started.headers["location"]
+    await bulk_jobs.wait()
+
+    statuses = await _statuses(db_session)
+    assert {statuses[i] for i in ids} == {TaskStatus.IN_PROGRESS}
+    progress = await async_client.get(started.headers["location"])
+    assert progress.status_code == 200 and "3 / 3" in progress.text and "done" in progress.text
+
+    # без выбора — все прошедшие встречи; удалять нечего
+    empty = await async_client.get("/admin/meeting/action/delete-old?pks=&confirm=1&days=90")
+    assert "Нет строк для изменения" in empty.text
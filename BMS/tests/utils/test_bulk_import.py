@@ -0,0 +1,164 @@
+import io
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.auth import current_active_user
+from app.core.database import Base
+from app.core.sharding import ShardRouter
+from app.models.comment import Comment
+from app.models.meeting import Meeting
+from app.models.outbox import OutboxEvent
+from app.models.task import Task, TaskStatus
+from app.models.team import Team
+from app.models.user import User, UserRole, meeting_participants_association
+from app.utils.bulk_import import import_records, read_records
+
+
+USERS_CSV = b"""email,role,team_name
+a@e.com,manager,Alpha
+b@e.com,,Alpha
+not-an-email,user,
+c@e.com,user,Missing
+a@e.com,user,
+"""
+
+TASKS_NDJSON = b"""{"id": 100, "title": "one", "creator_email": "a@e.com", "assignee_email": "b@e.com", "status": "done"}
+{"id": 101, "title": "two", "creator_email": "A@e.com", "assignee_email": "a@e.com"}
+{"title": "three", "creator_email": "ghost@e.com", "assignee_email": "a@e.com"}
+not json
+"""
+
+COMMENTS_CSV = b"""task_id,author_email,text
+100,b@e.com,first
+999,b@e.com,orphan
+"""
+
+MEETINGS_CSV = b"""title,start_time,end_time,creator_email,participant_emails
+Sync,2025-02-03T10:00:00,2025-02-03T11:00:00,a@e.com,b@e.com
+Broken,2025-02-03T10:00:00,2025-02-03T09:00:00,a@e.com,
+"""
+
+
+async def _count(db, model):
+    return (await db.execute(select(func.count()).select_from(model))).scalar()
+
+
+async def _import(db, entity, payload, fmt, chunk_size=2):
+    return await import_records(db, entity, read_records(io.BytesIO(payload), fmt), chunk_size)
+
+
+@pytest.mark.asyncio
+async def test_import_all_entities(db_session):
+    admin = User(email="root@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=True, is_verified=True)
+    db_session.add(admin)
+    await db_session.commit()
+    db_session.add(Team(name="Alpha", invite_code="ALPHA", admin_id=admin.id))
+    await db_session.commit()
+
+    users = await _import(db_session, "users", USERS_CSV, "csv")
+    assert (users.inserted, users.skipped) == (2, 3)
+    assert [line for line, _ in users.errors] == [4, 5, 6]
+    a = (await db_session.execute(select(User).where(User.email == "a@e.com"))).scalar_one()
+    assert a.role == UserRole.MANAGER and a.team_id is not None
+
+    tasks = await _import(db_session, "tasks", TASKS_NDJSON, "ndjson")
+    assert (tasks.inserted, tasks.skipped) == (2, 2)
+    statuses = dict((await db_session.execute(select(Task.id, Task.status))).all())
+    assert statuses == {100: TaskStatus.DONE, 101: TaskStatus.OPEN}
+
+    comments = await _import(db_session, "comments", COMMENTS_CSV, "csv")
+    assert (comments.inserted, comments.skipped) == (1, 1)
+    assert (await db_session.execute(select(Comment.task_id))).scalars().all() == [100]
+
+    meetings = await _import(db_session, "meetings", MEETINGS_CSV, "csv")
+    assert (meetings.inserted, meetings.skipped) == (1, 1)
+    assert await _count(db_session, Meeting) == 1
+    assert await _count(db_session, meeting_participants_association) == 2
+
+    # каждая импортированная строка — событие в outbox, как при создании через API
+    events = (await db_session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()
+    comment_id = (await db_session.execute(select(Comment.id))).scalar_one()
+    meeting_id = (await db_session.execute(select(Meeting.id))).scalar_one()
+    assert [(e.topic, e.aggregate_id) for e in events] == [
+        ("task.created", 100), ("task.created", 101), ("comment.created", comment_id), ("meeting.created", meeting_id),
+    ]
+    assert events[0].payload["title"] == "one" and events[0].payload["status"] == "done"
+    assert events[2].payload == {"task_id": 100, "author_id": events[0].payload["assignee_id"]}
+    assert events[3].payload["participants"] == sorted(events[3].payload["participants"]) != []
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_is_admin_only(async_client: AsyncClient, db_session):
+    admin = User(email="root@e.com", hashed_password="x", role=UserRole.ADMIN,
+                 is_active=True, is_superuser=True, is_verified=True)
+    manager = User(email="m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([admin, manager])
+    await db_session.commit()
+    files = {"file": ("users.csv", b"email\nnew@e.com\n", "text/csv")}
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    assert (await async_client.post("/import/users", files=files)).status_code == 403
+
+    app.dependency_overrides[current_active_user] = lambda: admin
+    resp = await async_client.post("/import/users", files=files)
+    assert resp.status_code == 200
+    assert resp.json() == {"entity": "users", "inserted": 1, "skipped": 0, "errors": []}
+    app.dependency_overrides.pop(current_active_user)
+
+
+SHARDED_USERS_CSV = b"""email,team_name
+a1@e.com,Alpha
+a2@e.com,Alpha
+b1@e.com,Beta
+"""
+
+SHARDED_TASKS_CSV = b"""title,creator_email,assignee_email
+alpha,a1@e.com,a2@e.com
+beta,b1@e.com,b1@e.com
+mixed,a1@e.com,b1@e.com
+"""
+
+
+@pytest.mark.asyncio
+async def test_import_routes_rows_to_team_shards(tmp_path):
+    engines, factories = [], []
+    for name in ("directory", "shard0", "shard1"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(engine)
+        factories.append(sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+    router = ShardRouter(factories[0], factories[1:], placement_ttl=0)
+
+    async with router.directory() as db:
+        root = User(email="root@e.com", hashed_password="x", role=UserRole.ADMIN,
+                    is_active=True, is_superuser=True, is_verified=True)
+        db.add(root)
+        await db.commit()
+        # Alpha (id 1) → шард 1, Beta (id 2) → шард 0
+        db.add_all([Team(id=1, name="Alpha", invite_code="A", admin_id=root.id),
+                    Team(id=2, name="Beta", invite_code="B", admin_id=root.id)])
+        await db.commit()
+
+        users = await import_records(db, "users", read_records(io.BytesIO(SHARDED_USERS_CSV), "csv"), router=router)
+        assert users.inserted == 3
+        tasks = await import_records(db, "tasks", read_records(io.BytesIO(SHARDED_TASKS_CSV), "csv"), router=router)
+        assert (tasks.inserted, tasks.skipped) == (2, 1)
+        assert tasks.errors == [(4, "пользователь b1@e.com не из команды автора")]
+        assert await _count(db, Task) == 0
+
+    for index, title, email in ((1, "alpha", "a2@e.com"), (0, "beta", "b1@e.com")):
+        async with router.shards[index]() as db:
+            assert (await db.execute(select(Task.title))).scalars().all() == [title]
+            # Справочная копия участника команды скопирована на шард
+            assert (await db.execute(select(User.id).where(User.email == email))).scalar() is not None
+
+    for engine in engines:
+        await engine.dispose()
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Index, Integer, MetaData, Table, text
+
+from app.utils.index_advisor import (
+    ACCEPTED_UNINDEXED,
+    QUERY_BUILDERS,
+    builder_statement_columns,
+    find_unindexed,
+    indexed_columns,
+    main,
+    sql_shape_columns,
+)
+
+
+def test_no_new_unindexed_columns():
+    new = [ref for ref, accepted in find_unindexed().items() if not accepted]
+    assert new == []
+    assert main([]) == 0
+
+
+def test_sql_shapes_report_unindexed_filter():
+    sql = "SELECT tasks.id FROM tasks WHERE tasks.status = $1 AND tasks.id IN ($2)"
+    assert sql_shape_columns(sql, {"tasks"}) == {("tasks", "status"), ("tasks", "id")}
+
+    report = find_unindexed(sql)
+    assert report[("tasks", "status")] is False
+
+
+def test_runtime_builders_scanned_and_partial_indexes_ignored():
+    columns = builder_statement_columns(QUERY_BUILDERS)
+    assert {("meetings", "creator_id"), ("tasks", "created_at")} <= columns
+    assert ("meetings", "creator_id") not in ACCEPTED_UNINDEXED
+
+    # частичный индекс покрывает только выполненные задачи
+    metadata = MetaData()
+    Table("t", metadata, Column("id", Integer, primary_key=True), Column("created_at", Integer),
+          Index("ix_t_done", "created_at", sqlite_where=text("status = 'DONE'")))
+    assert indexed_columns(metadata) == {("t", "id")}
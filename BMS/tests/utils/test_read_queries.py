@@ -0,0 +1,50 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.meeting import Meeting
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.utils.read_queries import (
+    MeetingRow,
+    TaskRow,
+    fetch_team_tasks_for_date,
+    fetch_user_meetings_for_date,
+    fetch_user_tasks,
+)
+
+
+def _user(email, team_id):
+    return User(email=email, hashed_password="x", role=UserRole.MANAGER, team_id=team_id,
+                is_active=True, is_superuser=False, is_verified=True)
+
+
+@pytest.mark.asyncio
+async def test_calendar_queries_return_plain_rows(db_session):
+    mine, stranger = _user("rq1@e.com", 1), _user("rq2@e.com", 2)
+    db_session.add_all([mine, stranger])
+    await db_session.commit()
+
+    day = datetime(2025, 2, 3, 10)
+    db_session.add_all([
+        Task(title="team", creator_id=mine.id, assignee_id=mine.id, status=TaskStatus.OPEN, deadline=day),
+        Task(title="other-day", creator_id=mine.id, assignee_id=mine.id, status=TaskStatus.OPEN,
+             deadline=day + timedelta(days=1)),
+        Task(title="other-team", creator_id=stranger.id, assignee_id=stranger.id, status=TaskStatus.OPEN,
+             deadline=day),
+        Meeting(title="sync", start_time=day, end_time=day + timedelta(hours=1),
+                creator_id=mine.id, participants=[mine]),
+    ])
+    await db_session.commit()
+    db_session.expunge_all()
+
+    tasks = await fetch_team_tasks_for_date(db_session, 1, date(2025, 2, 3))
+    meetings = await fetch_user_meetings_for_date(db_session, mine.id, date(2025, 2, 3))
+
+    assert [type(t) for t in tasks] == [TaskRow]
+    assert tasks[0].title == "team"
+    assert [(type(m), m.title) for m in meetings] == [(MeetingRow, "sync")]
+    # ORM-объекты не создаются и в identity map не попадают
+    assert len(db_session.identity_map) == 0
+
+    assert [t.title for t in await fetch_user_tasks(db_session, mine.id)] == ["team", "other-day"]
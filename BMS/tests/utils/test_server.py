@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.utils import server
+
+
+def _cgroup(tmp_path, **files):
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+
+def test_cpu_quota_cgroup_v2_and_v1(tmp_path):
+    assert server.cpu_quota(_cgroup(tmp_path / "a", **{"cpu.max": "150000 100000\n"})) == 1.5
+    assert server.cpu_quota(_cgroup(tmp_path / "b", **{"cpu.max": "max 100000\n"})) is None
+    v1 = _cgroup(tmp_path / "c", **{"cpu/cpu.cfs_quota_us": "200000", "cpu/cpu.cfs_period_us": "100000"})
+    assert server.cpu_quota(v1) == 2.0
+    unlimited = _cgroup(tmp_path / "d", **{"cpu/cpu.cfs_quota_us": "-1", "cpu/cpu.cfs_period_us": "100000"})
+    assert server.cpu_quota(unlimited) is None
+    assert server.cpu_quota(tmp_path / "missing") is None
+
+
+def test_worker_count_follows_quota(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 8)
+    config = settings.model_copy(update={"SERVER_WORKERS": None, "SERVER_MAX_WORKERS": 16})
+
+    assert server.worker_count(config, _cgroup(tmp_path / "a", **{"cpu.max": "150000 100000"})) == 2
+    assert server.worker_count(config, _cgroup(tmp_path / "b", **{"cpu.max": "max 100000"})) == 8
+    assert server.worker_count(config.model_copy(update={"SERVER_MAX_WORKERS": 4}), tmp_path / "none") == 4
+    assert server.worker_count(config.model_copy(update={"SERVER_WORKERS": 3}), tmp_path / "none") == 3
+
+
+def test_uvicorn_options_have_no_reload():
+    config = settings.model_copy(update={"SERVER_WORKERS": 2, "SERVER_KEEPALIVE_TIMEOUT": 90})
+    options = server.uvicorn_options(config, port=9000)
+
+    assert options["workers"] == 2
+    assert options["timeout_keep_alive"] == 90
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+    assert "reload" not in options
+
+
+def test_multiple_workers_need_shared_entity_cache(monkeypatch):
+    monkeypatch.setattr(settings, "ENTITY_CACHE_URL", None)
+    monkeypatch.setattr(settings, "ENTITY_CACHE_BACKEND", "memory")
+    server.check_entity_cache(settings, workers=1)
+    with pytest.raises(SystemExit, match="ENTITY_CACHE_BACKEND=memory"):
+        server.check_entity_cache(settings, workers=4)
+
+    monkeypatch.setattr(settings, "ENTITY_CACHE_BACKEND", "external")
+    with pytest.raises(SystemExit):
+        server.check_entity_cache(settings, workers=4)
+    monkeypatch.setattr(settings, "ENTITY_CACHE_URL", "redis://cache:6379/0")
+    server.check_entity_cache(settings, workers=4)
+
+    monkeypatch.setattr(settings, "ENTITY_CACHE_BACKEND", "off")
+    server.check_entity_cache(settings, workers=4)
+
+
+def test_multiple_workers_get_multiprocess_metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    assert server.prepare_metrics_dir(settings, workers=1) is None
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+    assert server.prepare_metrics_dir(settings, workers=4) == str(tmp_path)
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(tmp_path)
+    assert list(tmp_path.iterdir()) == []